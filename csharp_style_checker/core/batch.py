@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""批量检查：一份清单列出多个仓库根目录，每个根目录有自己的规则、选项和报告"""
+
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from csharp_style_checker.core.profiles import (
+    RuleProfile, default_rules, load_custom_rules, load_profiles, profile_output_path
+)
+from csharp_style_checker.core.style_checker import DEFAULT_PROFILE, CheckUnit
+from csharp_style_checker.utils.generated_code import GeneratedCodeClassifier
+
+
+class BatchRoot:
+    """批量清单中的一个根目录及其选项，选项名与命令行参数对应"""
+
+    # 清单中每个根目录可以设置的选项及默认值
+    OPTIONS = OrderedDict([
+        ('output', None),
+        ('profiles', None),
+        ('custom_rules', None),
+        ('report_format', 'html'),
+        ('compress', False),
+        ('include_generated', False),
+        ('max_file_size', 1024 * 1024),
+    ])
+
+    def __init__(self, name: str, path: str, **options):
+        """初始化根目录，未指定的选项使用 OPTIONS 中的默认值"""
+        self.name = name
+        self.path = path
+        for key, default in self.OPTIONS.items():
+            setattr(self, key, options.pop(key, default))
+        if options:
+            raise ValueError(f"批量清单中 {name} 的选项不存在: {', '.join(options)}")
+        if self.report_format not in ('html', 'data'):
+            raise ValueError(f"批量清单中 {name} 的报告格式无效: {self.report_format}")
+
+    def build_profiles(self) -> List[RuleProfile]:
+        """该根目录使用的规则配置方案"""
+        if self.profiles:
+            return load_profiles(self.profiles)
+        rules = default_rules()
+        if self.custom_rules:
+            rules.extend(load_custom_rules(self.custom_rules))
+        return [RuleProfile(DEFAULT_PROFILE, rules)]
+
+    def create_unit(self, file_paths: List[str]) -> CheckUnit:
+        """根目录对应的检查单元"""
+        classifier = None
+        if not self.include_generated:
+            classifier = GeneratedCodeClassifier(max_file_size=self.max_file_size or None)
+        return CheckUnit(file_paths, self.build_profiles(), generated_code_classifier=classifier)
+
+    def output_paths(self, profile_names: List[str]) -> Dict[str, str]:
+        """各配置方案的报告路径；使用多套配置方案时为 <报告名>.<配置名>.html"""
+        outputs = OrderedDict()  # type: Dict[str, str]
+        for name in profile_names:
+            path = self.output if name == DEFAULT_PROFILE else profile_output_path(self.output, name)
+            outputs[name] = path + '.gz' if self.compress and not path.endswith('.gz') else path
+        return outputs
+
+    def __repr__(self):
+        return f"BatchRoot({self.name!r}, {self.path!r})"
+
+
+def load_manifest(manifest_path: str, index_output: Optional[str] = None):
+    """读取批量清单，返回 (根目录列表, 汇总索引路径)
+
+    清单格式：
+        {
+          "index": "reports/index.html",
+          "defaults": {"report_format": "data", "compress": true},
+          "roots": [
+            {"name": "game", "path": "../game", "profiles": "game_profiles.json"},
+            {"path": "../tools", "output": "reports/tools.html", "include_generated": true}
+          ]
+        }
+
+    相对路径相对于清单文件所在目录；name 默认为目录名，output 默认为索引所在目录下的 <name>.html。
+    index_output: 命令行指定的索引路径，优先于清单中的 index。
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        config = json.load(f, object_pairs_hook=OrderedDict)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    def resolve(path: Optional[str]) -> Optional[str]:
+        return os.path.normpath(os.path.join(base_dir, path)) if path else path
+
+    roots_config = config.get('roots')
+    if not isinstance(roots_config, list) or not roots_config:
+        raise ValueError("批量清单中缺少 roots")
+    index_path = index_output or resolve(config.get('index')) or os.path.join(base_dir, 'index.html')
+    report_dir = os.path.dirname(os.path.abspath(index_path))
+    defaults = config.get('defaults', {})  # type: Dict[str, Any]
+
+    roots = []  # type: List[BatchRoot]
+    names = set()
+    for entry in roots_config:
+        options = OrderedDict(defaults)
+        options.update(entry)
+        path = options.pop('path', None)
+        if not path:
+            raise ValueError(f"批量清单中的根目录缺少 path: {json.dumps(entry, ensure_ascii=False)}")
+        path = resolve(path)
+        name = options.pop('name', None) or os.path.basename(path.rstrip(os.sep)) or path
+        if name in names:
+            raise ValueError(f"批量清单中的根目录名称重复: {name}")
+        names.add(name)
+        for key in ('output', 'profiles', 'custom_rules'):
+            options[key] = resolve(options.get(key))
+        options['output'] = options['output'] or os.path.join(report_dir, f"{name}.html")
+        roots.append(BatchRoot(name, path, **options))
+    return roots, index_path
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""声明提取器：每个文件只解析一次，生成供命名规则过滤的声明表"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from csharp_style_checker.core.line_memo import LineMemo
+from csharp_style_checker.models.declaration import Declaration
+
+
+# 类型表达式：标识符（可带命名空间）+ 至多两层泛型参数 + 可空标记 + 数组后缀。
+# 各部分的字符集互不重叠，同一输入只有一种切分方式，匹配不会发生指数/多项式回溯。
+TYPE_PATTERN = (
+    r'[a-zA-Z0-9_]+(?:\.[a-zA-Z0-9_]+)*'
+    r'(?:<[^<>;=(){}]*(?:<[^<>;=(){}]*>[^<>;=(){}]*)*>)?\??'
+    r'(?:\[[\s,]*\]\??)*'
+)
+
+# 声明前可能出现的修饰符
+MODIFIER_KEYWORDS = (
+    'public', 'private', 'protected', 'internal', 'static', 'readonly', 'const', 'volatile', 'new',
+    'unsafe', 'extern', 'abstract', 'sealed', 'partial', 'virtual', 'override', 'event', 'fixed', 'async',
+)
+
+# 类型声明关键字
+TYPE_DECLARATION_KINDS = ('class', 'interface', 'struct', 'enum')
+
+# 声明不能紧接在标识符、成员访问或引号之后（引号后是字符串字面量的内容）
+_DECLARATION_START = r'(?<![\w."\'])'
+
+# 修饰符串的长度有上限，保证每次匹配尝试只扫描有限个单词
+_MODIFIERS = r'((?:(?:' + '|'.join(MODIFIER_KEYWORDS) + r')\s+){0,6})'
+
+_TYPE_DECLARATION_PATTERN = re.compile(
+    _DECLARATION_START + _MODIFIERS + r'(' + '|'.join(TYPE_DECLARATION_KINDS) + r')\s+([a-zA-Z0-9_]+)'
+)
+
+_MEMBER_PATTERN = re.compile(
+    _DECLARATION_START + _MODIFIERS + r'(' + TYPE_PATTERN + r')\s+([a-zA-Z0-9_]+)\s*([;={])'
+)
+
+# 整个缓冲区中查找类型声明名称（用于项目级符号索引）
+_TYPE_NAME_PATTERN = re.compile(
+    _DECLARATION_START + r'(?:' + '|'.join(TYPE_DECLARATION_KINDS) + r')\s+([a-zA-Z_][a-zA-Z0-9_]*)'
+)
+
+# 局部变量只在没有访问修饰符、也不是类型声明的行上识别
+_ACCESS_PATTERN = re.compile(r'\b(public|private|protected|internal|static)\b')
+
+# 不可能是类型名或变量名的关键字
+_NON_DECLARATION_WORDS = frozenset([
+    'return', 'new', 'class', 'interface', 'struct', 'enum', 'namespace', 'using', 'throw', 'else', 'case',
+    'goto', 'yield', 'await', 'in', 'out', 'is', 'as', 'typeof', 'sizeof', 'default', 'delegate', 'operator',
+    'if', 'for', 'foreach', 'while', 'switch', 'try', 'catch', 'finally', 'do', 'lock', 'get', 'set',
+])
+
+
+class DeclarationTable:
+    """声明表，按种类建立索引"""
+
+    def __init__(self, declarations: List[Declaration]):
+        """初始化声明表"""
+        self.declarations = declarations
+        self._by_kind = {}  # type: Dict[str, List[Declaration]]
+        for declaration in declarations:
+            self._by_kind.setdefault(declaration.kind, []).append(declaration)
+
+    def __iter__(self) -> Iterator[Declaration]:
+        return iter(self.declarations)
+
+    def __len__(self) -> int:
+        return len(self.declarations)
+
+    def of_kind(self, *kinds: str) -> List[Declaration]:
+        """获取指定种类的声明，按出现位置排序"""
+        if len(kinds) == 1:
+            return self._by_kind.get(kinds[0], [])
+        selected = [d for kind in kinds for d in self._by_kind.get(kind, [])]
+        selected.sort(key=lambda d: (d.line, d.column))
+        return selected
+
+
+def _extract_line_records(line: str) -> Tuple[Tuple[str, Tuple[str, ...], str, str, int], ...]:
+    """提取单行中的声明，返回与行号无关的记录 (种类, 修饰符, 类型, 名称, 列号)，可按行文本缓存"""
+    records = []
+
+    has_type_keyword = False
+    for match in _TYPE_DECLARATION_PATTERN.finditer(line):
+        has_type_keyword = True
+        records.append((match.group(2), tuple(match.group(1).split()), match.group(2), match.group(3),
+                        match.start(3) + 1))
+
+    # 没有分号、等号或花括号的行不可能包含成员声明
+    if ';' not in line and '=' not in line and '{' not in line:
+        return tuple(records)
+
+    allow_local = None
+    for match in _MEMBER_PATTERN.finditer(line):
+        type_name = match.group(2)
+        name = match.group(3)
+        if type_name in _NON_DECLARATION_WORDS or name in _NON_DECLARATION_WORDS:
+            continue
+
+        modifiers = tuple(match.group(1).split())
+        if match.group(4) == '{':
+            kind = 'property'
+        elif modifiers:
+            kind = 'field'
+        else:
+            if allow_local is None:
+                allow_local = not has_type_keyword and not _ACCESS_PATTERN.search(line)
+            if not allow_local:
+                continue
+            kind = 'local'
+
+        records.append((kind, modifiers, type_name, name, match.start(3) + 1))
+
+    return tuple(records)
+
+
+def extract_line_declarations(line: str, line_number: int) -> List[Declaration]:
+    """提取单行中的声明"""
+    return [
+        Declaration(kind, modifiers, type_name, name, line_number, column)
+        for kind, modifiers, type_name, name, column in _extract_line_records(line)
+    ]
+
+
+def extract_declarations(lines: List[str], memo: Optional[LineMemo] = None) -> DeclarationTable:
+    """逐行提取整个文件的声明，生成声明表
+
+    memo: 可选的行缓存，重复出现的行（跨文件）直接复用提取结果
+    """
+    declarations = []
+    for i, line in enumerate(lines):
+        records = memo.get_or_compute(line, _extract_line_records) if memo is not None else _extract_line_records(line)
+        for kind, modifiers, type_name, name, column in records:
+            declarations.append(Declaration(kind, modifiers, type_name, name, i + 1, column))
+    return DeclarationTable(declarations)
+
+
+def find_type_names(source_code: str) -> List[str]:
+    """在整个源码中查找声明的类型名称（去重并保持出现顺序）"""
+    return list(dict.fromkeys(_TYPE_NAME_PATTERN.findall(source_code)))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""按行文本缓存分析结果的有界LRU，跨文件复用重复行的结果"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+
+class LineMemo:
+    """以行文本为键的有界LRU缓存"""
+
+    def __init__(self, max_size: int = 65536):
+        """初始化缓存
+
+        max_size: 最多缓存的不同行数，超出时淘汰最久未使用的行
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()  # type: OrderedDict
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, line: str, compute: Callable[[str], Any]) -> Any:
+        """获取该行的缓存结果，未命中时计算并缓存"""
+        entries = self._entries
+        try:
+            value = entries[line]
+        except KeyError:
+            self.misses += 1
+            value = compute(line)
+            entries[line] = value
+            if len(entries) > self.max_size:
+                entries.popitem(last=False)
+            return value
+
+        self.hits += 1
+        entries.move_to_end(line)
+        return value
+
+    def clear(self):
+        """清空缓存（计数器保留）"""
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+        }
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""规则配置方案：同一次扫描中按多套规则配置（例如严格/宽松）分别出具结果"""
+
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from csharp_style_checker.rules.base_rule import SEVERITIES, BaseRule
+from csharp_style_checker.rules.custom_rules import DeclarativeRule, compile_custom_rules
+from csharp_style_checker.rules.naming_rules import (
+    ClassNamePascalCaseRule,
+    PrivateFieldUnderscoreRule,
+    MethodNamePascalCaseRule, ConstantNameAllCapsRule, InterfaceNamingRule, StructNamingRule, StaticFieldNamingRule,
+    CollectionPluralNamingRule, VariableCamelCaseRule
+)
+from csharp_style_checker.rules.structure_rules import BraceOnNewLineRule
+from csharp_style_checker.rules.readability_rules import LineIsTooLongRule
+
+
+# 所有内置规则，按默认的执行顺序排列
+RULE_CLASSES = [
+    ClassNamePascalCaseRule,
+    PrivateFieldUnderscoreRule,
+    MethodNamePascalCaseRule,
+    BraceOnNewLineRule,
+    LineIsTooLongRule,
+    ConstantNameAllCapsRule,
+    InterfaceNamingRule,
+    StructNamingRule,
+    StaticFieldNamingRule,
+    CollectionPluralNamingRule,
+    VariableCamelCaseRule,
+]
+
+# 默认配置下未启用的规则
+DEFAULT_DISABLED_RULES = (VariableCamelCaseRule,)
+
+# 默认配置下的规则参数
+DEFAULT_RULE_PARAMETERS = {
+    LineIsTooLongRule: {'max_length': 200},
+}
+
+
+def default_rules() -> List[BaseRule]:
+    """默认规则列表"""
+    return [
+        rule_class(**DEFAULT_RULE_PARAMETERS.get(rule_class, {}))
+        for rule_class in RULE_CLASSES
+        if rule_class not in DEFAULT_DISABLED_RULES
+    ]
+
+
+class RuleProfile:
+    """一套命名的规则配置"""
+
+    def __init__(self, name: str, rules: List[BaseRule]):
+        """初始化规则配置"""
+        self.name = name
+        self.rules = rules
+
+    def __repr__(self):
+        return f"RuleProfile({self.name!r}, {len(self.rules)} rules)"
+
+
+def load_profiles(config_path: str) -> List[RuleProfile]:
+    """从JSON配置文件加载规则配置方案
+
+    配置格式：
+        {
+          "custom_rules": [...],
+          "profiles": {
+            "strict": {"rules": {"CSR001": {"max_length": 120}, "CSN008": {"enabled": true}}},
+            "legacy": {"rules": {"CS0009": {"enabled": false}, "CSN004": {"severity": "info"}}}
+          }
+        }
+
+    规则可以用规则ID或规则名称指定；enabled、severity 之外的键作为规则的构造参数，
+    未提及的规则使用默认配置。custom_rules 中声明的自定义规则（见 compile_custom_rules）
+    默认在所有配置方案中启用，同样可以按规则ID关闭或修改严重级别。
+    """
+    return build_profiles(_load_config(config_path))
+
+
+def profile_output_path(output: str, profile_name: str) -> str:
+    """配置方案对应的报告路径：report.html -> report.<配置名>.html"""
+    stem, ext = os.path.splitext(output)
+    return f"{stem}.{profile_name}{ext or '.html'}"
+
+
+def load_custom_rules(config_path: str) -> List[DeclarativeRule]:
+    """从JSON配置文件加载 custom_rules 中声明的自定义规则"""
+    return compile_custom_rules(_load_config(config_path).get('custom_rules', []))
+
+
+def _load_config(config_path: str) -> Dict[str, Any]:
+    """读取JSON配置文件"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+def build_profiles(config: Dict[str, Any]) -> List[RuleProfile]:
+    """根据配置字典创建规则配置方案
+
+    不同方案中配置完全相同的规则共用同一个实例，检查器对共用的规则只执行一次。
+    """
+    profiles_config = config.get('profiles')
+    if not isinstance(profiles_config, dict) or not profiles_config:
+        raise ValueError("配置中缺少 profiles")
+
+    custom_rules = compile_custom_rules(config.get('custom_rules', []))
+
+    # 规则ID和名称都可以用来引用规则（内置规则对应规则类，自定义规则对应规则实例）
+    known_rules = {}
+    for rule_class in RULE_CLASSES:
+        rule = rule_class()
+        known_rules[rule.rule_id] = rule_class
+        known_rules[rule.name] = rule_class
+    for rule in custom_rules:
+        known_rules[rule.rule_id] = rule
+        known_rules[rule.name] = rule
+
+    shared_rules = {}  # type: Dict[str, BaseRule]
+    profiles = []
+    for profile_name, profile_config in profiles_config.items():
+        overrides = {}
+        for key, options in (profile_config or {}).get('rules', {}).items():
+            target = known_rules.get(key)
+            if target is None:
+                raise ValueError(f"配置方案 {profile_name} 中的规则不存在: {key}")
+            overrides[target] = options or {}
+
+        rules = []
+        for rule_class in RULE_CLASSES:
+            options = dict(overrides.get(rule_class, {}))
+            enabled = options.pop('enabled', rule_class not in DEFAULT_DISABLED_RULES)
+            if not enabled:
+                continue
+            severity = _pop_severity(options, profile_name, rule_class.__name__)
+            parameters = dict(DEFAULT_RULE_PARAMETERS.get(rule_class, {}), **options)
+
+            key = json.dumps([rule_class.__name__, severity, parameters], sort_keys=True)
+            rule = shared_rules.get(key)
+            if rule is None:
+                try:
+                    rule = rule_class(**parameters)
+                except TypeError as e:
+                    raise ValueError(f"配置方案 {profile_name} 中规则 {rule_class.__name__} 的参数无效: {e}")
+                if severity is not None:
+                    rule.severity = severity
+                shared_rules[key] = rule
+            rules.append(rule)
+
+        # 自定义规则共用同一个组合匹配器，只能开关或修改严重级别
+        for custom_rule in custom_rules:
+            options = dict(overrides.get(custom_rule, {}))
+            if not options.pop('enabled', True):
+                continue
+            severity = _pop_severity(options, profile_name, custom_rule.rule_id)
+            if options:
+                raise ValueError(f"配置方案 {profile_name} 中自定义规则 {custom_rule.rule_id} 不支持参数: "
+                                 f"{', '.join(options)}")
+            if severity is None or severity == custom_rule.severity:
+                rules.append(custom_rule)
+                continue
+
+            key = json.dumps(['custom', custom_rule.rule_id, severity])
+            rule = shared_rules.get(key)
+            if rule is None:
+                rule = shared_rules[key] = custom_rule.with_severity(severity)
+            rules.append(rule)
+
+        profiles.append(RuleProfile(profile_name, rules))
+    return profiles
+
+
+def _pop_severity(options: Dict[str, Any], profile_name: str, rule_name: str):
+    """取出并校验规则配置中的严重级别"""
+    severity = options.pop('severity', None)
+    if severity is not None and severity not in SEVERITIES:
+        raise ValueError(f"配置方案 {profile_name} 中规则 {rule_name} 的严重级别无效: {severity}")
+    return severity
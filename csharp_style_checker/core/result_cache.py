@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""按内容哈希缓存单个文件的检查结果"""
+
+import json
+import os
+from collections import OrderedDict
+from typing import List, Optional
+
+from csharp_style_checker.models.code_issue import CodeIssue
+
+
+# 持久化缓存格式版本，格式变化时旧缓存自动失效
+CACHE_VERSION = 1
+
+
+class ResultCache:
+    """以内容哈希（例如git blob哈希）为键的检查结果缓存
+
+    fingerprint 描述规则配置，规则变化时整个缓存失效。
+    """
+
+    def __init__(self, cache_path: str, fingerprint: str, max_entries: int = 20000):
+        """初始化缓存并加载已有内容
+
+        max_entries: 最多保存的条目数，超出时淘汰最久未使用的条目
+        """
+        self.cache_path = cache_path
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # type: OrderedDict
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, file_path: str) -> Optional[List[CodeIssue]]:
+        """获取缓存的问题列表，未命中时返回None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return [CodeIssue.from_dict(data, file_path) for data in entry]
+
+    def put(self, key: str, issues: List[CodeIssue]):
+        """缓存一个文件的问题列表"""
+        self._entries[key] = [issue.to_dict() for issue in issues]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self):
+        """将缓存持久化到磁盘"""
+        data = {
+            'version': CACHE_VERSION,
+            'fingerprint': self.fingerprint,
+            'entries': self._entries,
+        }
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.cache_path)
+
+    def _load(self):
+        """读取持久化的缓存；缓存缺失、损坏、版本或规则配置不符时视为空"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return
+        if data.get('fingerprint') != self.fingerprint:
+            return
+        self._entries.update(data.get('entries', {}))
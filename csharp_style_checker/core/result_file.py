@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+"""紧凑的二进制检查结果文件：保存一次检查的结果，之后不重新扫描源文件即可生成报告
+
+文件结构（小端序）：
+    头部      魔数 b'CSCR'、版本号、段数，之后是段目录 [(段名, 偏移, 长度)]
+    STRS      字符串表：路径、文件名、规则ID、严重级别、消息模板和模板参数只保存一次
+    FILE      文件记录，每个文件 9 个 uint32（路径、文件名、所属程序集、源码、首个问题、问题数、错误/警告/提示数）
+    ISSU      问题记录，每个问题 (行, 列, 规则, 严重级别, 消息模板, 首个参数, 参数个数)
+    ARGS      消息模板参数（字符串表下标）
+    BIDX/BLOB 源码：内容相同的文件只保存一份，zlib压缩
+    META      汇总统计和抽样外推结果（JSON），打开文件时不需要扫描问题记录
+
+消息中用引号括起的名称和数字作为模板参数，"类名 'foo' 应该……" 与 "类名 'bar' 应该……" 共用同一个模板。
+读取时通过 mmap 按需解码，报告逐个文件读取问题和源码。
+"""
+
+import hashlib
+import json
+import mmap
+import re
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from csharp_style_checker.models.check_result import CheckResult
+from csharp_style_checker.models.code_file import CodeFile
+from csharp_style_checker.models.code_issue import CodeIssue
+from csharp_style_checker.utils.sampling import SampleEstimate
+
+
+MAGIC = b'CSCR'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHH')
+_SECTION = struct.Struct('<4sQQ')
+_FILE = struct.Struct('<9I')
+_ISSUE = struct.Struct('<IIIIIIH')
+_BLOB = struct.Struct('<QI')
+_UINT32 = struct.Struct('<I')
+
+# 文件属于多个程序集时，程序集名称以换行符连接保存为一个字符串
+_ASSEMBLY_SEPARATOR = '\n'
+
+# 没有对应字符串或源码时的下标
+NONE = 0xFFFFFFFF
+
+# 消息中作为模板参数的部分：引号括起的名称、数字
+_MESSAGE_ARGUMENT = re.compile(r"'[^'\n]*'|\d+")
+# 模板中参数的占位符
+_PLACEHOLDER = '\x1f'
+
+
+class _StringTable:
+    """写入时的字符串表：相同的字符串只保存一次"""
+
+    def __init__(self):
+        self.indexes = {}  # type: Dict[str, int]
+
+    def add(self, text: Optional[str]) -> int:
+        """字符串的下标，None 为 NONE"""
+        if text is None:
+            return NONE
+        index = self.indexes.get(text)
+        if index is None:
+            index = self.indexes[text] = len(self.indexes)
+        return index
+
+    def encode(self) -> bytes:
+        """字符串个数、各字符串的结束偏移和UTF-8内容"""
+        data = bytearray()
+        ends = []
+        for text in self.indexes:
+            data += text.encode('utf-8', 'surrogatepass')
+            ends.append(len(data))
+        return struct.pack(f'<I{len(ends)}I', len(ends), *ends) + bytes(data)
+
+
+def split_message(message: str) -> Tuple[str, List[str]]:
+    """把消息拆成模板和参数；消息本身含占位符时不拆分"""
+    if _PLACEHOLDER in message:
+        return message, []
+    arguments = _MESSAGE_ARGUMENT.findall(message)
+    if not arguments:
+        return message, []
+    return _MESSAGE_ARGUMENT.sub(_PLACEHOLDER, message), arguments
+
+
+def join_message(template: str, arguments: List[str]) -> str:
+    """由模板和参数还原消息"""
+    if not arguments:
+        return template
+    parts = template.split(_PLACEHOLDER)
+    pieces = [parts[0]]
+    for argument, part in zip(arguments, parts[1:]):
+        pieces.append(argument)
+        pieces.append(part)
+    return ''.join(pieces)
+
+
+def write_result_file(result: CheckResult, output_path: str, compresslevel: int = 6):
+    """把检查结果写入二进制结果文件
+
+    文件和问题通过 iter_code_files 逐个读取，结果保存在磁盘（SqliteCheckResult）时同样适用；
+    源码（如果结果中保留了源码）直接写入输出文件，其余各段在内存中以紧凑的二进制形式累积。
+    """
+    strings = _StringTable()
+    files = bytearray()
+    issues = bytearray()
+    arguments = bytearray()
+    blob_index = bytearray()
+    blobs = {}  # type: Dict[str, int]
+    issue_count = 0
+    argument_count = 0
+    # 最近使用的消息 -> (模板下标, 参数下标列表)，重复的消息不再做正则拆分
+    message_cache = {}  # type: Dict[str, Tuple[int, List[int]]]
+
+    with open(output_path, 'wb') as f:
+        section_names = (b'BLOB', b'STRS', b'FILE', b'ISSU', b'ARGS', b'BIDX', b'META')
+        header_size = _HEADER.size + _SECTION.size * len(section_names)
+        f.write(b'\0' * header_size)
+        blob_start = f.tell()
+
+        for code_file in result.iter_code_files():
+            content_index = NONE
+            if code_file.file_content is not None:
+                data = code_file.file_content.encode('utf-8', 'surrogatepass')
+                digest = hashlib.sha1(data).hexdigest()
+                content_index = blobs.get(digest, NONE)
+                if content_index == NONE:
+                    compressed = zlib.compress(data, compresslevel)
+                    content_index = blobs[digest] = len(blobs)
+                    blob_index += _BLOB.pack(f.tell() - blob_start, len(compressed))
+                    f.write(compressed)
+
+            counts = code_file.severity_counts()
+            assemblies = _ASSEMBLY_SEPARATOR.join(code_file.assemblies) or None
+            files += _FILE.pack(strings.add(code_file.file_path), strings.add(code_file.file_name),
+                                strings.add(assemblies), content_index, issue_count, len(code_file.issues),
+                                counts.get('error', 0), counts.get('warning', 0), counts.get('info', 0))
+
+            for issue in code_file.issues:
+                cached = message_cache.get(issue.message)
+                if cached is None:
+                    template, parts = split_message(issue.message)
+                    cached = (strings.add(template), [strings.add(part) for part in parts])
+                    if len(message_cache) >= 65536:
+                        message_cache.clear()
+                    message_cache[issue.message] = cached
+                template_index, argument_indexes = cached
+                issues += _ISSUE.pack(issue.line, issue.column, strings.add(issue.rule_id),
+                                      strings.add(issue.severity), template_index, argument_count,
+                                      len(argument_indexes))
+                for argument_index in argument_indexes:
+                    arguments += _UINT32.pack(argument_index)
+                argument_count += len(argument_indexes)
+                issue_count += 1
+
+        meta = {
+            'checked_at': result.checked_at,
+            'total_files': result.total_files,
+            'total_issues': result.total_issues,
+            'by_severity': result.by_severity,
+            'by_rule': result.by_rule,
+            'by_category': result.by_category,
+            'by_directory': result.by_directory,
+            'by_assembly': result.by_assembly,
+            'rule_categories': result.rule_categories,
+            'skipped_files': result.skipped_files,
+            'notes': result.notes,
+            'estimate': result.estimate.to_dict() if result.estimate is not None else None,
+        }
+        sections = [(b'BLOB', blob_start, f.tell() - blob_start)]
+        for name, data in ((b'STRS', strings.encode()), (b'FILE', files), (b'ISSU', issues), (b'ARGS', arguments),
+                           (b'BIDX', blob_index), (b'META', json.dumps(meta, ensure_ascii=False).encode('utf-8'))):
+            sections.append((name, f.tell(), len(data)))
+            f.write(data)
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, len(sections)))
+        for name, offset, length in sections:
+            f.write(_SECTION.pack(name, offset, length))
+
+
+class BinaryCheckResult(CheckResult):
+    """从二进制结果文件读取的检查结果
+
+    汇总统计在打开时从 META 段读取；文件、问题和源码通过 mmap 按需解码，code_files 始终为空。
+    """
+
+    def __init__(self, result_path: str):
+        """打开结果文件"""
+        self.result_path = result_path
+        self._file = open(result_path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._sections = self._read_header()
+        meta = json.loads(bytes(self._section(b'META')).decode('utf-8'))
+        super().__init__(meta['rule_categories'])
+
+        self.checked_at = meta['checked_at']
+        self.total_files = meta['total_files']
+        self.total_issues = meta['total_issues']
+        self.by_severity = meta['by_severity']
+        self.error_count = self.by_severity.get("error", 0)
+        self.warning_count = self.by_severity.get("warning", 0)
+        self.info_count = self.by_severity.get("info", 0)
+        self.by_rule = meta['by_rule']
+        self.by_category = meta['by_category']
+        self.by_directory = meta['by_directory']
+        self.by_assembly = meta['by_assembly']
+        self.skipped_files = [tuple(entry) for entry in meta['skipped_files']]
+        self.notes = meta['notes']
+        if meta.get('estimate') is not None:
+            self.estimate = SampleEstimate.from_dict(meta['estimate'])
+
+        strings = self._section(b'STRS')
+        (count,) = _UINT32.unpack_from(strings, 0)
+        self._string_ends = struct.unpack_from(f'<{count}I', strings, 4)
+        self._string_data = strings[4 + 4 * count:]
+        self._strings = {}  # type: Dict[int, str]
+        self._issues = self._section(b'ISSU')
+        self._arguments = self._section(b'ARGS')
+        self._blobs = self._section(b'BLOB')
+        self._blob_index = self._section(b'BIDX')
+        self._files = list(_FILE.iter_unpack(self._section(b'FILE')))
+
+    def _read_header(self) -> Dict[bytes, Tuple[int, int]]:
+        magic, version, count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是检查结果文件: {self.result_path}")
+        if version != VERSION:
+            raise ValueError(f"不支持的检查结果文件版本 {version}: {self.result_path}")
+        sections = {}
+        for index in range(count):
+            name, offset, length = _SECTION.unpack_from(self._map, _HEADER.size + index * _SECTION.size)
+            sections[name] = (offset, length)
+        return sections
+
+    def _section(self, name: bytes) -> memoryview:
+        offset, length = self._sections[name]
+        return memoryview(self._map)[offset:offset + length]
+
+    def _string(self, index: int) -> Optional[str]:
+        """按下标读取字符串，读过的字符串缓存在内存中"""
+        if index == NONE:
+            return None
+        text = self._strings.get(index)
+        if text is None:
+            start = self._string_ends[index - 1] if index else 0
+            text = self._strings[index] = bytes(self._string_data[start:self._string_ends[index]]).decode(
+                'utf-8', 'surrogatepass')
+        return text
+
+    def _content(self, index: int) -> Optional[str]:
+        if index == NONE:
+            return None
+        offset, length = _BLOB.unpack_from(self._blob_index, index * _BLOB.size)
+        return zlib.decompress(self._blobs[offset:offset + length]).decode('utf-8', 'surrogatepass')
+
+    def add_file(self, code_file: CodeFile):
+        raise TypeError("从结果文件读取的检查结果是只读的")
+
+    def iter_file_summaries(self) -> Iterator[Tuple[str, str, int, int, int, int]]:
+        """按问题数从多到少产生每个文件的统计，只读取文件记录"""
+        for record in sorted(self._files, key=lambda record: -record[5]):
+            path, name, _, _, _, issue_count, error_count, warning_count, info_count = record
+            yield self._string(path), self._string(name), issue_count, error_count, warning_count, info_count
+
+    def iter_code_files(self, with_issues_only: bool = False) -> Iterator[CodeFile]:
+        """按检查顺序逐个解码文件、问题和源码"""
+        string = self._string
+        for path, name, assembly, content, issue_start, issue_count, _, _, _ in self._files:
+            if with_issues_only and not issue_count:
+                continue
+            file_path = string(path)
+            code_file = CodeFile(file_path=file_path, file_name=string(name), file_content=self._content(content))
+            assemblies = string(assembly)
+            code_file.assemblies = assemblies.split(_ASSEMBLY_SEPARATOR) if assemblies else []
+            start = issue_start * _ISSUE.size
+            for line, column, rule, severity, template, argument_start, argument_count in _ISSUE.iter_unpack(
+                    self._issues[start:start + issue_count * _ISSUE.size]):
+                if argument_count:
+                    argument_indexes = struct.unpack_from(f'<{argument_count}I', self._arguments, argument_start * 4)
+                    message = join_message(string(template), [string(index) for index in argument_indexes])
+                else:
+                    message = string(template)
+                code_file.issues.append(CodeIssue(
+                    line=line,
+                    column=column,
+                    message=message,
+                    rule_id=string(rule),
+                    severity=string(severity),
+                    file_path=file_path
+                ))
+            yield code_file
+
+    def close(self):
+        """关闭结果文件"""
+        self._issues = self._arguments = self._blobs = self._blob_index = self._string_data = None
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+
+"""基于SQLite的检查结果存储：逐文件写入磁盘，内存占用只取决于批大小而不是仓库规模"""
+
+import os
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from csharp_style_checker.models.check_result import CheckResult
+from csharp_style_checker.models.code_file import CodeFile
+from csharp_style_checker.models.code_issue import CodeIssue
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    profile TEXT NOT NULL,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    content TEXT,
+    issue_count INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    warning_count INTEGER NOT NULL,
+    info_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS issues (
+    file_id INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    rule_id TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+"""
+
+# 本存储创建的表及其列，打开已有数据库时只替换列完全一致的表
+_TABLE_COLUMNS = {
+    'files': ['id', 'profile', 'path', 'name', 'content', 'issue_count', 'error_count', 'warning_count',
+              'info_count'],
+    'issues': ['file_id', 'line', 'col', 'rule_id', 'severity', 'message'],
+}
+
+# SQLite 数据库文件的头部
+_SQLITE_HEADER = b'SQLite format 3\x00'
+
+# 批量写入结束后再建索引，避免写入过程中逐行维护索引
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_files_path ON files (profile, path);
+CREATE INDEX IF NOT EXISTS idx_files_issue_count ON files (profile, issue_count DESC, id);
+CREATE INDEX IF NOT EXISTS idx_issues_file ON issues (file_id, line, col);
+CREATE INDEX IF NOT EXISTS idx_issues_rule ON issues (rule_id);
+CREATE INDEX IF NOT EXISTS idx_issues_severity ON issues (severity);
+"""
+
+
+class SqliteResultStore:
+    """检查结果数据库，一个数据库可以保存多个配置方案的结果"""
+
+    def __init__(self, db_path: str, batch_size: int = 500, store_content: bool = True):
+        """打开（新建）结果数据库
+
+        db_path 已经存在时必须是SQLite数据库：其中本存储的表（上一次的结果）被删除后重建，
+        其他表保持不变；不是SQLite数据库或者同名表的结构不同时拒绝打开，避免误删其他文件。
+        batch_size: 每个事务写入的文件数，也是内存中最多缓存的文件数
+        store_content: 是否保存源码用于报告中的代码预览
+        """
+        if os.path.isfile(db_path) and os.path.getsize(db_path) > 0:
+            with open(db_path, 'rb') as f:
+                if f.read(len(_SQLITE_HEADER)) != _SQLITE_HEADER:
+                    raise ValueError(f"{db_path} 不是SQLite数据库，拒绝覆盖；请指定新的结果数据库路径")
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.store_content = store_content
+        self.connection = sqlite3.connect(db_path)
+        try:
+            self._drop_previous_results()
+        except Exception:
+            self.connection.close()
+            raise
+        # 结果数据库可以随时重新生成，不需要写入时的持久性保证
+        self.connection.execute('PRAGMA journal_mode = OFF')
+        self.connection.execute('PRAGMA synchronous = OFF')
+        self.connection.executescript(_SCHEMA)
+        self._next_file_id = 1
+
+    def _drop_previous_results(self):
+        """删除上一次检查写入的表；同名但结构不同的表不属于本存储，拒绝覆盖"""
+        existing = [table for table in _TABLE_COLUMNS if self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()]
+        for table in existing:
+            columns = [row[1] for row in self.connection.execute(f'PRAGMA table_info({table})')]
+            if columns != _TABLE_COLUMNS[table]:
+                raise ValueError(f"{self.db_path} 中的表 {table} 不是检查结果表，拒绝覆盖；请指定新的结果数据库路径")
+        with self.connection:
+            for table in existing:
+                self.connection.execute(f'DROP TABLE {table}')
+
+    def create_result(self, profile: str, rule_categories: Optional[Dict[str, str]] = None) -> 'SqliteCheckResult':
+        """为一个配置方案创建写入该数据库的检查结果"""
+        return SqliteCheckResult(self, profile, rule_categories)
+
+    def allocate_file_id(self) -> int:
+        """分配文件编号（多个配置方案共用编号序列）"""
+        file_id = self._next_file_id
+        self._next_file_id += 1
+        return file_id
+
+    def write_batch(self, files: List[tuple], issues: List[tuple]):
+        """在一个事务中写入一批文件和问题"""
+        with self.connection:
+            self.connection.executemany('INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', files)
+            self.connection.executemany('INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?)', issues)
+
+    def create_indexes(self):
+        """创建查询用的索引"""
+        self.connection.executescript(_INDEXES)
+
+    def close(self):
+        """关闭数据库连接"""
+        self.connection.close()
+
+
+class SqliteCheckResult(CheckResult):
+    """写入SQLite的检查结果
+
+    汇总统计仍在内存中增量维护；文件和问题明细按批写入数据库，code_files 始终为空，
+    报告通过 iter_file_summaries、iter_code_files 等方法分页查询。
+    """
+
+    def __init__(self, store: SqliteResultStore, profile: str, rule_categories: Optional[Dict[str, str]] = None):
+        """初始化检查结果"""
+        super().__init__(rule_categories)
+        self.store = store
+        self.profile = profile
+        self._pending_files = []  # type: List[tuple]
+        self._pending_issues = []  # type: List[tuple]
+
+    def add_file(self, code_file: CodeFile):
+        """添加一个文件的检查结果：更新统计并缓存到当前批次，批次满时写入数据库"""
+        self._record(code_file)
+        self._write(code_file)
+
+    def _write(self, code_file: CodeFile):
+        """把一个文件加入当前批次，不更新统计"""
+        error_count = code_file.error_count()
+        warning_count = code_file.warning_count()
+        info_count = code_file.info_count()
+
+        file_id = self.store.allocate_file_id()
+        content = code_file.file_content if self.store.store_content else None
+        self._pending_files.append((file_id, self.profile, code_file.file_path, code_file.file_name, content,
+                                    len(code_file.issues), error_count, warning_count, info_count))
+        self._pending_issues.extend(
+            (file_id, issue.line, issue.column, issue.rule_id, issue.severity, issue.message)
+            for issue in code_file.issues
+        )
+        if len(self._pending_files) >= self.store.batch_size:
+            self._flush()
+
+    def _flush(self):
+        """写入当前批次"""
+        if self._pending_files:
+            self.store.write_batch(self._pending_files, self._pending_issues)
+            self._pending_files = []
+            self._pending_issues = []
+
+    def finish(self):
+        """写入剩余的结果并建立索引"""
+        self._flush()
+        self.store.create_indexes()
+
+    def iter_file_summaries(self) -> Iterator[Tuple[str, str, int, int, int, int]]:
+        """按问题数从多到少产生每个文件的统计"""
+        cursor = self.store.connection.execute(
+            'SELECT path, name, issue_count, error_count, warning_count, info_count FROM files '
+            'WHERE profile = ? ORDER BY issue_count DESC, id', (self.profile,))
+        yield from self._fetch_pages(cursor)
+
+    def iter_code_files(self, with_issues_only: bool = False, page_size: Optional[int] = None) -> Iterator[CodeFile]:
+        """按检查顺序分页读取文件及其问题，每次只在内存中保留一页"""
+        connection = self.store.connection
+        page_size = page_size or self.store.batch_size
+        condition = 'AND issue_count > 0' if with_issues_only else ''
+        last_id = 0
+        while True:
+            files = connection.execute(
+                f'SELECT id, path, name, content FROM files WHERE profile = ? AND id > ? {condition} '
+                f'ORDER BY id LIMIT ?', (self.profile, last_id, page_size)).fetchall()
+            if not files:
+                return
+
+            issues_by_file = {}  # type: Dict[int, List[CodeIssue]]
+            first_id, last_id = files[0][0], files[-1][0]
+            for file_id, line, column, rule_id, severity, message, path in connection.execute(
+                    'SELECT issues.file_id, line, col, rule_id, severity, message, files.path FROM issues '
+                    'JOIN files ON files.id = issues.file_id '
+                    'WHERE file_id BETWEEN ? AND ? AND files.profile = ? ORDER BY file_id, line, col',
+                    (first_id, last_id, self.profile)):
+                issues_by_file.setdefault(file_id, []).append(CodeIssue(
+                    line=line,
+                    column=column,
+                    message=message,
+                    rule_id=rule_id,
+                    severity=severity,
+                    file_path=path
+                ))
+
+            for file_id, path, name, content in files:
+                code_file = CodeFile(file_path=path, file_name=name, file_content=content)
+                code_file.issues = issues_by_file.get(file_id, [])
+                yield code_file
+
+    @staticmethod
+    def _fetch_pages(cursor, page_size: int = 1000) -> Iterator[tuple]:
+        """分页读取游标结果"""
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                return
+            yield from rows
+
+
+class SpillingCheckResult(CheckResult):
+    """受内存预算控制的检查结果
+
+    平时与 CheckResult 一样保存在内存中；内存预算要求时不再保留源码，
+    进一步要求时把已有的文件转存到预算提供的临时数据库，之后的文件直接写入数据库。
+    """
+
+    def __init__(self, budget, profile: str, rule_categories: Optional[Dict[str, str]] = None):
+        """初始化检查结果
+
+        budget: 内存预算（MemoryBudget）
+        """
+        super().__init__(rule_categories)
+        self.budget = budget
+        self.profile = profile
+        self._contents_dropped = False
+        self._disk = None  # type: Optional[SqliteCheckResult]
+
+    def add_file(self, code_file: CodeFile):
+        """添加一个文件的检查结果，按内存预算的要求降级"""
+        self._record(code_file)
+        if not self.budget.keep_contents:
+            if not self._contents_dropped:
+                self._drop_contents()
+            code_file.file_content = None
+        if self._disk is None and self.budget.should_spill:
+            self._spill()
+
+        if self._disk is not None:
+            self._disk._write(code_file)
+        else:
+            self.code_files.append(code_file)
+
+    def _drop_contents(self):
+        """释放已保存的源码"""
+        self._contents_dropped = True
+        for code_file in self.code_files:
+            code_file.file_content = None
+        self.notes.append(f"为控制内存，从第 {self.total_files} 个文件起不再保留源码，之前的代码预览也已释放")
+        self.budget.release()
+
+    def _spill(self):
+        """把内存中的文件转存到临时数据库"""
+        self._disk = SqliteCheckResult(self.budget.spill_store(), self.profile, self.rule_categories)
+        for code_file in self.code_files:
+            self._disk._write(code_file)
+        self.code_files = []
+        self.notes.append(f"为控制内存，检查到第 {self.total_files} 个文件时结果已转存到临时数据库")
+        self.budget.release()
+
+    def finish(self):
+        """写入剩余的结果"""
+        if self._disk is not None:
+            self._disk.finish()
+
+    def iter_file_summaries(self) -> Iterator[Tuple[str, str, int, int, int, int]]:
+        """按问题数从多到少产生每个文件的统计"""
+        if self._disk is not None:
+            return self._disk.iter_file_summaries()
+        return super().iter_file_summaries()
+
+    def iter_code_files(self, with_issues_only: bool = False) -> Iterator[CodeFile]:
+        """按检查顺序产生每个文件的结果"""
+        if self._disk is not None:
+            return self._disk.iter_code_files(with_issues_only)
+        return super().iter_code_files(with_issues_only)
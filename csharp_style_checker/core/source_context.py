@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""单个文件分析过程中共享的源码上下文"""
+
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from csharp_style_checker.core.declaration_extractor import DeclarationTable, extract_declarations
+from csharp_style_checker.core.line_memo import LineMemo
+
+
+class AnalysisTimeout(Exception):
+    """规则执行过程中超出了文件的时间预算"""
+
+
+class SourceContext:
+    """源码上下文，按需生成各条规则共享的中间结果"""
+
+    def __init__(self, source_code: str, file_path: str, lines: Optional[List[str]] = None, symbol_index=None,
+                 declaration_memo: Optional[LineMemo] = None, deadline: Optional[float] = None):
+        """初始化源码上下文
+
+        symbol_index: 本次检查的项目级符号索引（SymbolIndex），没有时为None
+        declaration_memo: 声明提取的行缓存，跨文件复用重复行的提取结果
+        deadline: 分析的截止时间（time.perf_counter()），逐行执行的规则每行之前检查一次；None表示不限制
+        """
+        self.source_code = source_code
+        self.file_path = file_path
+        self.symbol_index = symbol_index
+        self.declaration_memo = declaration_memo
+        self.deadline = deadline
+        self._lines = lines
+        self._declarations = None  # type: Optional[DeclarationTable]
+
+    @property
+    def lines(self) -> List[str]:
+        """按行拆分后的代码，首次访问时才生成"""
+        if self._lines is None:
+            self._lines = self.source_code.splitlines()
+        return self._lines
+
+    def iter_lines(self) -> Iterator[Tuple[int, str]]:
+        """逐行产生 (行号, 行)；设置了截止时间时每行之前检查一次，超时抛出 AnalysisTimeout"""
+        deadline = self.deadline
+        if deadline is None:
+            yield from enumerate(self.lines, 1)
+            return
+        for number, line in enumerate(self.lines, 1):
+            if time.perf_counter() > deadline:
+                raise AnalysisTimeout()
+            yield number, line
+
+    @property
+    def has_lines(self) -> bool:
+        """行列表是否已经生成"""
+        return self._lines is not None
+
+    @property
+    def declarations(self) -> DeclarationTable:
+        """声明表，整个文件只解析一次，供所有命名规则共享"""
+        if self._declarations is None:
+            self._declarations = extract_declarations(self.lines, self.declaration_memo)
+        return self._declarations
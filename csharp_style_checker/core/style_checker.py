@@ -2,127 +2,889 @@
 
 """C# 代码风格检查器核心实现"""
 
+import hashlib
+import json
 import os
-from typing import List
+import pickle
+import sys
+import tempfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from csharp_style_checker.models.assembly import Assembly
 from csharp_style_checker.models.code_file import CodeFile
 from csharp_style_checker.models.check_result import CheckResult
 from csharp_style_checker.models.code_issue import CodeIssue
-from csharp_style_checker.rules.naming_rules import (
-    ClassNamePascalCaseRule,
-    PrivateFieldUnderscoreRule,
-    MethodNamePascalCaseRule, ConstantNameAllCapsRule, InterfaceNamingRule, StructNamingRule, StaticFieldNamingRule,
-    CollectionPluralNamingRule
-)
-from csharp_style_checker.rules.structure_rules import BraceOnNewLineRule
-from csharp_style_checker.rules.readability_rules import LineIsTooLongRule
+from csharp_style_checker.models.result_sink import ResultSink
+from csharp_style_checker.core.source_context import AnalysisTimeout, SourceContext
+from csharp_style_checker.core.symbol_index import PARALLEL_THRESHOLD, SymbolIndex
+from csharp_style_checker.core.line_memo import LineMemo
+from csharp_style_checker.core.result_cache import ResultCache
+from csharp_style_checker.core.result_store import SpillingCheckResult
+from csharp_style_checker.core.profiles import RuleProfile, default_rules
+from csharp_style_checker.rules.base_rule import BaseRule, DeclarationRule
+from csharp_style_checker.utils.dedup import DuplicateIndex
+from csharp_style_checker.utils.generated_code import GeneratedCodeClassifier
+from csharp_style_checker.utils.git_index import GitBlobReader, git_dir, list_staged_blobs
+from csharp_style_checker.utils.memory_budget import current_rss_bytes
+from csharp_style_checker.utils.metrics import CheckMetrics, measure_phase
+
+
+# 未使用多套规则配置时，self.rules 对应的配置名称
+DEFAULT_PROFILE = 'default'
+
+# 并行分析时每个工作进程中的检查器，以及各检查单元的 (规则配置方案, 符号索引)
+_worker_checker = None
+_worker_units = {}  # type: Dict[Any, Tuple[List[RuleProfile], Optional[SymbolIndex]]]
+
+
+def _init_worker(state):
+    """初始化工作进程：规则和符号索引只在启动时传入一次"""
+    global _worker_checker, _worker_units
+    time_budget, line_memo_size, collect_metrics, units = state
+    _worker_checker = StyleChecker(time_budget=time_budget, line_memo_size=line_memo_size)
+    if collect_metrics:
+        _worker_checker.metrics = CheckMetrics()
+    _worker_units = dict(units)
+
+
+def _worker_unit(unit_key):
+    """工作进程中检查单元的规则和符号索引
+
+    启动时没有传入的单元（批量检查共用进程池）从主进程写出的临时文件读取，unit_key 为文件路径；
+    只保留最近一个这样的单元，工作进程的内存不随根目录数量增长。
+    """
+    unit = _worker_units.get(unit_key)
+    if unit is None:
+        with open(unit_key, 'rb') as f:
+            unit = pickle.load(f)
+        _worker_units.clear()
+        _worker_units[unit_key] = unit
+    return unit
+
+
+def _analyze_in_worker(unit_key, file_path: str, keep_contents: bool):
+    """在工作进程中分析一个文件，同时报告工作进程当前的内存占用
+
+    收集性能指标时，分析这个文件产生的指标（CheckMetrics）随结果返回，由主进程合并；
+    行缓存的命中计数同样以增量返回。
+    """
+    profiles, symbol_index = _worker_unit(unit_key)
+    _worker_checker.symbol_index = symbol_index
+    code_files, size = _worker_checker._analyze_file(file_path, profiles)
+    if not keep_contents:
+        for code_file in code_files.values():
+            code_file.file_content = None
+    metrics = _worker_checker.metrics
+    if metrics is not None:
+        _worker_checker.metrics = CheckMetrics()
+    return code_files, size, os.getpid(), current_rss_bytes(), metrics, _worker_checker._take_memo_counts()
+
+
+class CheckUnit:
+    """一批使用同一组规则配置和符号索引的文件
+
+    普通检查只有一个单元；批量检查中每个根目录是一个单元，各单元依次检查，共用一个进程池。
+    """
+
+    def __init__(self, file_paths: Iterable[str], profiles: List[RuleProfile],
+                 sinks: Optional[Dict[str, ResultSink]] = None,
+                 generated_code_classifier: Optional[GeneratedCodeClassifier] = None):
+        """初始化检查单元
+
+        sinks: {配置名称: ResultSink}，为None时由检查器为每个配置方案创建检查结果
+        generated_code_classifier: 用于跳过生成代码的分类器，为None时不跳过
+        """
+        self.file_paths = file_paths
+        self.profiles = profiles
+        self.sinks = sinks
+        self.generated_code_classifier = generated_code_classifier
+        self.streaming = not isinstance(file_paths, (list, tuple))
+        self.duplicates = None  # type: Optional[DuplicateIndex]
+        self.symbol_index = None  # type: Optional[SymbolIndex]
+        # 并行分析时工作进程用来查找该单元规则和符号索引的键
+        self.worker_key = None  # type: Any
 
 
 class StyleChecker:
     """C# 代码风格检查器"""
 
-    def __init__(self):
-        """初始化检查器"""
-        self.rules = [
-            ClassNamePascalCaseRule(),
-            PrivateFieldUnderscoreRule(),
-            MethodNamePascalCaseRule(),
-            BraceOnNewLineRule(),
-            LineIsTooLongRule(200),
-            ConstantNameAllCapsRule(),
-            InterfaceNamingRule(),
-            StructNamingRule(),
-            StaticFieldNamingRule(),
-            CollectionPluralNamingRule(),
-        ]
+    def __init__(self, time_budget: Optional[float] = None, workers: Optional[int] = None,
+                 symbol_index_cache: Optional[str] = None, skip_generated: bool = True,
+                 max_file_size: Optional[int] = 1024 * 1024, line_memo_size: int = 65536):
+        """初始化检查器
+
+        time_budget: 单个文件的分析时间预算（秒），超出后停止剩余规则并报告TIMEOUT问题；None表示不限制。
+            预算是协作式的：在规则之间、以及逐行规则和自定义规则的每一行之前检查，
+            单行上的一次正则匹配无法中断，极端的模式仍可能在这一行上超出预算
+        workers: 并行任务使用的进程数，None表示使用CPU核数
+        symbol_index_cache: 项目级符号索引的持久化路径，内容未变的文件在下次检查时直接复用
+        skip_generated: 是否在分析前跳过生成代码（文件名模式、文件头标记）
+        max_file_size: 文件大小上限（字节），超过时跳过；None表示不限制
+        line_memo_size: 按行文本缓存逐行规则结果的LRU容量，0表示不缓存
+        """
+        self.rules = default_rules()
         self.file_extensions = ['.cs']
+        self.time_budget = time_budget
+        self.workers = workers
+        self.use_symbol_index = True
+        self.symbol_index_cache = symbol_index_cache
+        self.symbol_index = None
+        self.skip_generated = skip_generated
+        self.generated_code_classifier = GeneratedCodeClassifier(max_file_size=max_file_size)
+
+        # 跨文件的行缓存：重复行（using、花括号、常见字段声明等）只需一次字典查找
+        self.line_memo = LineMemo(line_memo_size) if line_memo_size > 0 else None
+        self.declaration_memo = LineMemo(line_memo_size) if line_memo_size > 0 else None
+        self._line_memo_signature = None
+        # 并行分析时各工作进程报告的行缓存命中计数：{缓存名称: [命中, 未命中]}
+        self._worker_memo_counts = {}  # type: Dict[str, List[int]]
+
+        # 可选的进度显示（ProgressReporter）和性能指标收集（CheckMetrics）
+        self.progress = None
+        self.metrics = None
+
+        # 可选的磁盘结果存储（SqliteResultStore），为None时结果保存在内存中
+        self.result_store = None
+        # 可选的内存预算（MemoryBudget），接近上限时减少并行度、释放源码、把结果转存到磁盘
+        self.memory_budget = None
+
+        # 是否合并重复文件（硬链接、符号链接、内容相同的副本），每种内容只分析一次
+        self.deduplicate = False
+        # 最近一次检查的重复文件（DuplicateIndex），未合并时为None
+        self.duplicate_index = None
 
     def check_directory(self, directory_path: str) -> CheckResult:
         """检查目录下的所有C#文件"""
+        return self.check_files(self.find_source_files(directory_path))
+
+    def find_source_files(self, directory_path: str) -> List[str]:
+        """查找目录下的所有C#文件"""
         if not os.path.exists(directory_path):
             raise FileNotFoundError(f"目录不存在: {directory_path}")
 
-        # 查找所有C#文件
         file_paths = []
         for root, _, files in os.walk(directory_path):
             for file in files:
                 if any(file.endswith(ext) for ext in self.file_extensions):
                     file_paths.append(os.path.join(root, file))
+        return file_paths
 
-        return self.check_files(file_paths)
+    def check_files(self, file_paths: Iterable[str], sink: Optional[ResultSink] = None):
+        """检查指定的C#文件列表
 
-    def check_files(self, file_paths: List[str]) -> CheckResult:
-        """检查指定的C#文件列表"""
-        result = CheckResult()
-        result.total_files = len(file_paths)
+        file_paths 可以是列表，也可以是逐个产生路径的迭代器（例如从标准输入流式读取），
+        迭代器不会被提前展开。
+        sink: 接收结果的 ResultSink，每完成一个文件回调一次；默认收集到新的 CheckResult 中。
+        返回 sink。
+        """
+        profiles = self._default_profiles()
+        if sink is None:
+            sink = self._new_result(profiles[0])
+        return self._check_files(file_paths, profiles, {DEFAULT_PROFILE: sink})[DEFAULT_PROFILE]
+
+    def check_profiles(self, profiles: List[RuleProfile], file_paths: Iterable[str],
+                       sinks: Optional[Dict[str, ResultSink]] = None) -> Dict[str, CheckResult]:
+        """按多套规则配置检查同一批文件，返回 {配置名称: 检查结果}
+
+        每个文件只读取、拆分行和提取声明一次，各配置方案共用；配置相同的规则实例只执行一次。
+        sinks: {配置名称: ResultSink}，默认为每个配置方案创建 CheckResult。
+        """
+        if sinks is None:
+            sinks = OrderedDict((profile.name, self._new_result(profile)) for profile in profiles)
+        return self._check_files(file_paths, profiles, sinks)
+
+    def iter_files(self, file_paths: Iterable[str]) -> Iterator[CodeFile]:
+        """逐个产生文件的检查结果（CodeFile），不构建 CheckResult
+
+        检查与消费交替进行，调用方可以随时停止迭代，剩余的文件不会再被检查。
+        被跳过的生成代码不会产生结果。
+        """
+        for code_files in self._iter_analyzed(file_paths, self._default_profiles()):
+            if code_files is not None:
+                yield code_files[DEFAULT_PROFILE]
+
+    def iter_issues(self, file_paths: Iterable[str]) -> Iterator[CodeIssue]:
+        """逐个产生检查发现的问题（CodeIssue.file_path 为所在文件）"""
+        for code_file in self.iter_files(file_paths):
+            yield from code_file.issues
+
+    def check_assemblies(self, assemblies: List[Assembly], profiles: Optional[List[RuleProfile]] = None,
+                         sinks: Optional[Dict[str, ResultSink]] = None) -> Dict[str, ResultSink]:
+        """按程序集检查参与编译的文件，返回 {配置名称: 检查结果}
+
+        所有程序集的文件合并为一个检查单元：共用同一组配置方案，符号索引覆盖全部程序集，
+        引用其他程序集中声明的类型时也能识别。同一文件被多个项目包含时只分析一次，
+        结果计入包含它的每一个程序集的汇总（与 --dedup 把结果复制给副本的方式相同）。
+        profiles 默认为 self.rules 构成的单一配置方案。
+        """
+        profiles = profiles or self._default_profiles()
+        if sinks is None:
+            sinks = OrderedDict((profile.name, self._new_result(profile)) for profile in profiles)
+        file_assemblies = OrderedDict()  # type: Dict[str, List[str]]
+        for assembly in assemblies:
+            for file_path in assembly.files:
+                names = file_assemblies.setdefault(file_path, [])
+                if assembly.name not in names:
+                    names.append(assembly.name)
+        return self._check_files(list(file_assemblies), profiles, sinks, file_assemblies)
+
+    def check_units(self, units: List[CheckUnit]) -> List[Dict[str, ResultSink]]:
+        """依次检查多个单元（批量检查时每个根目录一个单元），返回各单元的 {配置名称: 检查结果}
+
+        workers 大于1时所有单元共用一个进程池：符号索引扫描和文件分析都提交到同一个池，
+        不会为每个单元重新启动工作进程，前一个单元的最后几个文件与下一个单元的文件同时分析。
+        """
+        for unit in units:
+            if unit.sinks is None:
+                unit.sinks = OrderedDict((profile.name, self._new_result(profile)) for profile in unit.profiles)
+        if self.workers is not None and self.workers > 1:
+            state = (self.time_budget, self._line_memo_size(), self.metrics is not None, {})
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(state,)) as executor:
+                self._check_units(units, executor)
+        else:
+            self._check_units(units)
+        return [unit.sinks for unit in units]
+
+    def _check_files(self, file_paths: Iterable[str], profiles: List[RuleProfile],
+                     sinks: Dict[str, ResultSink],
+                     file_assemblies: Optional[Dict[str, List[str]]] = None) -> Dict[str, ResultSink]:
+        """检查文件列表，把每个配置方案的结果交给对应的接收器
+
+        file_assemblies: {文件路径: [程序集名称]}，用于标记每个文件所属的程序集
+        """
+        self._check_units([CheckUnit(file_paths, profiles, sinks, self._generated_classifier())],
+                          file_assemblies=file_assemblies)
+        return sinks
+
+    def _check_units(self, units: List[CheckUnit], executor: Optional[Executor] = None,
+                     file_assemblies: Optional[Dict[str, List[str]]] = None):
+        """检查各单元的文件，把结果交给单元的接收器"""
+        for unit, code_files in self._iter_units(units, executor):
+            if code_files is not None:
+                for name, sink in unit.sinks.items():
+                    code_file = code_files[name]
+                    if file_assemblies is not None:
+                        code_file.assemblies = list(file_assemblies.get(code_file.file_path, ()))
+                    sink.add_file(code_file)
+
+        for unit in units:
+            for sink in unit.sinks.values():
+                sink.finish()
+
+    def _generated_classifier(self) -> Optional[GeneratedCodeClassifier]:
+        """跳过生成代码时使用的分类器，不跳过时为None"""
+        return self.generated_code_classifier if self.skip_generated else None
+
+    def _line_memo_size(self) -> int:
+        """行缓存容量，传给并行分析的工作进程"""
+        return self.line_memo.max_size if self.line_memo is not None else 0
+
+    def _iter_analyzed(self, file_paths: Iterable[str], profiles: List[RuleProfile],
+                       sinks: Optional[Dict[str, ResultSink]] = None) -> Iterator[Optional[Dict[str, CodeFile]]]:
+        """逐个检查文件，产生 {配置名称: 代码文件}；被跳过的文件产生None并记录到各接收器"""
+        analyzed = self._iter_units([CheckUnit(file_paths, profiles, sinks or {}, self._generated_classifier())])
+        try:
+            for _, code_files in analyzed:
+                yield code_files
+        finally:
+            analyzed.close()
+
+    def _iter_units(self, units: List[CheckUnit], executor: Optional[Executor] = None
+                    ) -> Iterator[Tuple[CheckUnit, Optional[Dict[str, CodeFile]]]]:
+        """逐个检查各单元的文件，产生 (单元, {配置名称: 代码文件})；被跳过的文件产生 (单元, None)
+
+        executor: 共用的进程池（批量检查），为None时按文件数决定是否为本次检查创建进程池
+        """
+        metrics = self.metrics
+        progress = self.progress
+        try:
+            for unit in units:
+                self._prepare_unit(unit, executor)
+            self.duplicate_index = units[0].duplicates if len(units) == 1 else None
+
+            streaming = any(unit.streaming for unit in units)
+            total = None if streaming else sum(
+                len(unit.file_paths) + (unit.duplicates.duplicate_files if unit.duplicates else 0) for unit in units)
+            if progress is not None:
+                progress.start(total)
+
+            budget = self.memory_budget
+            if budget is not None:
+                budget.sample('symbol_index')
+
+            candidates = self._iter_candidates(units)
+            if executor is not None or (self.workers is not None and self.workers > 1
+                                        and (streaming or total >= PARALLEL_THRESHOLD)):
+                analyzed = self._analyze_parallel(candidates, units, executor)
+            else:
+                analyzed = self._analyze_serial(candidates)
 
-        for file_path in file_paths:
             try:
-                file_result = self.check_file(file_path)
-                result.code_files.append(file_result)
-                result.total_issues += len(file_result.issues)
-
-                # 更新问题统计
-                result.error_count += file_result.error_count()
-                result.warning_count += file_result.warning_count()
-                result.info_count += file_result.info_count()
-
-            except Exception as e:
-                print(f"检查文件出错: {file_path}, 错误: {str(e)}")
-
-                # 记录解析失败的文件
-                error_file = CodeFile(
-                    file_path=file_path,
-                    file_name=os.path.basename(file_path)
+                for unit, item in analyzed:
+                    if item is None:
+                        if progress is not None:
+                            progress.advance()
+                        yield unit, None
+                        continue
+
+                    code_files, size = item
+                    if metrics is not None:
+                        metrics.add_file(size)
+                    if budget is not None:
+                        budget.sample('analyze')
+                    if progress is not None:
+                        progress.advance(size)
+                    yield unit, code_files
+
+                    duplicates = unit.duplicates
+                    copies = duplicates.copies.get(next(iter(code_files.values())).file_path) if duplicates else None
+                    for copy_path in copies or ():
+                        if progress is not None:
+                            progress.advance()
+                        yield unit, OrderedDict(
+                            (name, code_file.copy_for(copy_path)) for name, code_file in code_files.items())
+            finally:
+                # 调用方提前停止迭代时同样结束进度显示
+                analyzed.close()
+                if progress is not None:
+                    progress.finish()
+        finally:
+            for unit in units:
+                if executor is not None and unit.worker_key is not None:
+                    try:
+                        os.remove(unit.worker_key)
+                    except OSError:
+                        pass
+
+    def _prepare_unit(self, unit: CheckUnit, executor: Optional[Executor] = None):
+        """分析前的准备：跳过生成代码、合并重复文件、构建符号索引
+
+        使用共用进程池时，单元的规则和符号索引写入临时文件，由工作进程按需读取，主进程不再保留符号索引。
+        """
+        metrics = self.metrics
+        sinks = unit.sinks
+        if not unit.streaming:
+            # 分析前先跳过生成代码，只读取文件头，不解码整个文件
+            if unit.generated_code_classifier is not None:
+                with measure_phase(metrics, 'generated_filter'):
+                    unit.file_paths = self._filter_generated_files(unit.file_paths, sinks,
+                                                                   unit.generated_code_classifier)
+
+            # 内容相同的文件只分析代表文件，结果复制给各个副本
+            if self.deduplicate:
+                with measure_phase(metrics, 'dedup'):
+                    unit.duplicates = DuplicateIndex(unit.file_paths)
+                if unit.duplicates.duplicate_files:
+                    for sink in sinks.values():
+                        sink.add_note(unit.duplicates.summary())
+                unit.file_paths = unit.duplicates.unique_paths
+
+            # 每次检查只构建一次项目级符号索引，规则通过上下文查询
+            if self.use_symbol_index:
+                with measure_phase(metrics, 'symbol_index'):
+                    unit.symbol_index = self.build_symbol_index(unit.file_paths, executor)
+        elif self.use_symbol_index:
+            # 流式输入无法预先得到完整文件列表，只使用上次持久化的索引
+            with measure_phase(metrics, 'symbol_index'):
+                unit.symbol_index = self.load_symbol_index()
+        self.symbol_index = unit.symbol_index
+
+        if executor is not None:
+            fd, unit.worker_key = tempfile.mkstemp(prefix='csharp_style_checker_unit_', suffix='.pickle')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((unit.profiles, unit.symbol_index), f, protocol=pickle.HIGHEST_PROTOCOL)
+            unit.symbol_index = self.symbol_index = None
+
+    def _iter_candidates(self, units: List[CheckUnit]) -> Iterator[Tuple[CheckUnit, Optional[str]]]:
+        """产生待分析的 (单元, 文件路径)；流式输入在这里跳过生成代码，被跳过的文件路径为None"""
+        metrics = self.metrics
+        for unit in units:
+            classifier = unit.generated_code_classifier if unit.streaming else None
+            for file_path in unit.file_paths:
+                if classifier is not None:
+                    with measure_phase(metrics, 'generated_filter'):
+                        reason = classifier.classify(file_path)
+                    if reason:
+                        for sink in unit.sinks.values():
+                            sink.add_skipped(file_path, reason)
+                        yield unit, None
+                        continue
+                yield unit, file_path
+
+    def _analyze_serial(self, candidates: Iterator[Tuple[CheckUnit, Optional[str]]]
+                        ) -> Iterator[Tuple[CheckUnit, Optional[Tuple[Dict[str, CodeFile], int]]]]:
+        """在当前进程中逐个分析文件"""
+        for unit, file_path in candidates:
+            if file_path is None:
+                yield unit, None
+                continue
+            self.symbol_index = unit.symbol_index
+            yield unit, self._analyze_file(file_path, unit.profiles)
+
+    def _analyze_file(self, file_path: str, profiles: List[RuleProfile]) -> Tuple[Dict[str, CodeFile], int]:
+        """读取并分析一个文件，返回 ({配置名称: 代码文件}, 文件字节数)；读取失败时报告PARSE_ERROR"""
+        metrics = self.metrics
+        size = 0
+        try:
+            with measure_phase(metrics, 'read'):
+                code, size = self._read_file(file_path)
+            # 声明表是 analyze 中的内层阶段，耗时单独计入 declarations
+            with measure_phase(metrics, 'analyze'):
+                code_files = self._analyze(code, file_path, profiles)
+
+        except Exception as e:
+            print(f"检查文件出错: {file_path}, 错误: {str(e)}")
+
+            # 记录解析失败的文件
+            error_file = CodeFile(
+                file_path=file_path,
+                file_name=os.path.basename(file_path)
+            )
+            error_file.issues = [
+                CodeIssue(
+                    line=0,
+                    column=0,
+                    message=f"文件解析失败: {str(e)}",
+                    rule_id="PARSE_ERROR",
+                    severity="error",
+                    file_path=file_path
                 )
-                error_file.issues = [
-                    CodeIssue(
-                        line=0,
-                        column=0,
-                        message=f"文件解析失败: {str(e)}",
-                        rule_id="PARSE_ERROR",
-                        severity="error"
-                    )
-                ]
+            ]
+            code_files = {profile.name: error_file for profile in profiles}
+        return code_files, size
+
+    def _analyze_parallel(self, candidates: Iterator[Tuple[CheckUnit, Optional[str]]], units: List[CheckUnit],
+                          executor: Optional[Executor] = None
+                          ) -> Iterator[Tuple[CheckUnit, Optional[Tuple[Dict[str, CodeFile], int]]]]:
+        """在进程池中分析文件，按输入顺序产生结果
+
+        同时提交给进程池的文件数有上限（每个工作进程两个），读取和分析的结果不会在内存中堆积；
+        设置了内存预算时，上限随降级级别减小，工作进程报告的内存计入预算。
+        executor 为None时为本次检查创建进程池，各单元的规则和符号索引在工作进程启动时传入。
+        """
+        if executor is not None:
+            yield from self._submit_all(candidates, executor)
+            return
+
+        for index, unit in enumerate(units):
+            unit.worker_key = index
+        state = (self.time_budget, self._line_memo_size(), self.metrics is not None,
+                 {unit.worker_key: (unit.profiles, unit.symbol_index) for unit in units})
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(state,)) as executor:
+            yield from self._submit_all(candidates, executor)
+
+    def _submit_all(self, candidates: Iterator[Tuple[CheckUnit, Optional[str]]], executor: Executor
+                    ) -> Iterator[Tuple[CheckUnit, Optional[Tuple[Dict[str, CodeFile], int]]]]:
+        """把文件依次提交给进程池，保持有限的提交窗口"""
+        budget = self.memory_budget
+        base_window = self.workers * 2
+        pending = deque()  # type: deque
+        try:
+            for unit, file_path in candidates:
+                window = budget.window(base_window) if budget is not None else base_window
+                while len(pending) >= window:
+                    yield self._parallel_result(*pending.popleft())
+                if file_path is None:
+                    pending.append((unit, None))
+                else:
+                    keep_contents = budget.keep_contents if budget is not None else True
+                    pending.append((unit, executor.submit(_analyze_in_worker, unit.worker_key, file_path,
+                                                          keep_contents)))
+            while pending:
+                yield self._parallel_result(*pending.popleft())
+        finally:
+            for _, future in pending:
+                if future is not None:
+                    future.cancel()
+            if budget is not None:
+                budget.forget_workers()
+
+    def _parallel_result(self, unit: CheckUnit, future
+                         ) -> Tuple[CheckUnit, Optional[Tuple[Dict[str, CodeFile], int]]]:
+        """等待一个工作进程的结果"""
+        if future is None:
+            return unit, None
+        code_files, size, pid, rss, metrics, memo_counts = future.result()
+        if self.memory_budget is not None:
+            self.memory_budget.record_worker(pid, rss)
+        if metrics is not None and self.metrics is not None:
+            self.metrics.merge(metrics)
+        for name, (hits, misses) in memo_counts.items():
+            counts = self._worker_memo_counts.setdefault(name, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+        return unit, (code_files, size)
+
+    def check_source(self, source_code: str, file_path: str) -> CheckResult:
+        """检查内存中的一段源码（例如来自标准输入），不读取磁盘"""
+        result = self._new_result(self._default_profiles()[0])
+        result.add_file(self.analyze_source(source_code, file_path))
+        result.finish()
+        return result
+
+    def _new_result(self, profile: RuleProfile) -> CheckResult:
+        """创建一个配置方案的检查结果"""
+        rule_categories = {rule.rule_id: rule.category for rule in profile.rules}
+        if self.result_store is not None:
+            return self.result_store.create_result(profile.name, rule_categories)
+        if self.memory_budget is not None:
+            return SpillingCheckResult(self.memory_budget, profile.name, rule_categories)
+        return CheckResult(rule_categories)
+
+    def check_git_index(self, repo_dir: str = '.', cache_path: Optional[str] = None) -> CheckResult:
+        """检查git暂存区中新增或修改的文件（用于pre-commit钩子）
+
+        文件内容直接从git对象库读取，而不是工作区：一次git调用列出暂存的blob，
+        再通过单个 git cat-file --batch 进程读取全部内容。检查结果按blob哈希缓存，
+        内容未变的blob不再读取和分析。cache_path 默认位于仓库的.git目录下。
+        """
+        result = self._new_result(self._default_profiles()[0])
+        staged = list_staged_blobs(repo_dir, self.file_extensions)
 
-                result.code_files.append(error_file)
-                result.total_issues += 1
-                result.error_count += 1
+        if cache_path is None:
+            cache_path = os.path.join(git_dir(repo_dir), 'csharp_style_checker', 'blob_results.json')
+        cache = ResultCache(cache_path, self.rules_fingerprint())
 
+        if self.use_symbol_index:
+            self.symbol_index = self.load_symbol_index()
+
+        metrics = self.metrics
+        progress = self.progress
+        if progress is not None:
+            progress.start(len(staged))
+
+        with GitBlobReader(repo_dir) as reader:
+            for file_path, blob in staged:
+                size = 0
+                try:
+                    # 缓存命中的blob已经通过了生成代码判断，无需再读取内容
+                    issues = cache.get(blob, file_path)
+                    if issues is not None:
+                        code_file = CodeFile(file_path=file_path)
+                        code_file.issues = issues
+                        result.add_file(code_file)
+                        continue
+
+                    with measure_phase(metrics, 'read'):
+                        data = reader.read(blob)
+                    size = len(data)
+                    if metrics is not None:
+                        metrics.add_file(size)
+                    if self.skip_generated:
+                        reason = self.generated_code_classifier.classify_content(file_path, data)
+                        if reason:
+                            result.add_skipped(file_path, reason)
+                            continue
+
+                    try:
+                        code = data.decode('utf-8')
+                    except UnicodeDecodeError as e:
+                        print(f"检查文件出错: {file_path}, 错误: {str(e)}")
+                        code_file = CodeFile(file_path=file_path)
+                        code_file.issues = [
+                            CodeIssue(
+                                line=0,
+                                column=0,
+                                message=f"文件解析失败: {str(e)}",
+                                rule_id="PARSE_ERROR",
+                                severity="error",
+                                file_path=file_path
+                            )
+                        ]
+                        result.add_file(code_file)
+                        continue
+
+                    with measure_phase(metrics, 'analyze'):
+                        code_file = self.analyze_source(code, file_path)
+                    # 超时结果取决于机器负载，不写入缓存
+                    if not any(issue.rule_id == "TIMEOUT" for issue in code_file.issues):
+                        cache.put(blob, code_file.issues)
+                    result.add_file(code_file)
+                finally:
+                    if progress is not None:
+                        progress.advance(size)
+
+        if progress is not None:
+            progress.finish()
+        cache.save()
+        result.finish()
         return result
 
+    def rules_fingerprint(self) -> str:
+        """规则配置和规则实现的指纹，用于判断缓存的检查结果是否仍然有效"""
+        digest = hashlib.sha1()
+        config = [[type(rule).__name__, vars(rule)] for rule in self.rules]
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode('utf-8'))
+
+        # 规则实现变化（升级工具）时同样需要失效
+        module_names = {type(rule).__module__ for rule in self.rules}
+        module_names.add('csharp_style_checker.core.declaration_extractor')
+        module_files = sorted(sys.modules[name].__file__ for name in module_names)
+        for module_file in module_files:
+            with open(module_file, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def _filter_generated_files(self, file_paths: List[str], sinks: Dict[str, ResultSink],
+                                classifier: GeneratedCodeClassifier) -> List[str]:
+        """过滤生成代码，被跳过的文件及原因记录到每个接收器中"""
+        remaining = []
+        for file_path in file_paths:
+            reason = classifier.classify(file_path)
+            if reason:
+                for sink in sinks.values():
+                    sink.add_skipped(file_path, reason)
+            else:
+                remaining.append(file_path)
+        return remaining
+
+    def build_symbol_index(self, file_paths: List[str], executor: Optional[Executor] = None) -> SymbolIndex:
+        """并行构建项目级符号索引；executor 为共用的进程池（批量检查）"""
+        symbol_index = SymbolIndex()
+        symbol_index.build(file_paths, workers=self.workers, cache_path=self.symbol_index_cache, executor=executor)
+        return symbol_index
+
+    def load_symbol_index(self) -> Optional[SymbolIndex]:
+        """读取持久化的符号索引，没有缓存时返回None"""
+        if not self.symbol_index_cache:
+            return None
+        symbol_index = SymbolIndex()
+        symbol_index.load(self.symbol_index_cache)
+        return symbol_index
+
     def check_file(self, file_path: str) -> CodeFile:
         """检查单个C#文件"""
+        return self.analyze_source(self._read_file(file_path)[0], file_path)
+
+    def _read_file(self, file_path: str) -> Tuple[str, int]:
+        """读取源文件，返回 (源码, 文件字节数)"""
         with open(file_path, 'r', encoding='utf-8') as f:
-            code = f.read()
+            return f.read(), os.fstat(f.fileno()).st_size
+
+    def analyze_source(self, code: str, file_path: str, rules: Optional[List[BaseRule]] = None,
+                       lines: Optional[List[str]] = None) -> CodeFile:
+        """对一段源码应用所有规则
+
+        rules: 只应用这些规则，默认为 self.rules
+        lines: 调用方已经按行拆分好的代码，避免重复拆分
+        """
+        profiles = [RuleProfile(DEFAULT_PROFILE, rules)] if rules is not None else self._default_profiles()
+        return self._analyze(code, file_path, profiles, lines)[DEFAULT_PROFILE]
+
+    def _default_profiles(self) -> List[RuleProfile]:
+        """由 self.rules 构成的单一配置方案"""
+        return [RuleProfile(DEFAULT_PROFILE, self.rules)]
 
-        code_file = CodeFile(
-            file_path=file_path,
-            file_name=os.path.basename(file_path),
-            file_content=code
+    def _analyze(self, code: str, file_path: str, profiles: List[RuleProfile],
+                 lines: Optional[List[str]] = None) -> Dict[str, CodeFile]:
+        """对一段源码应用各配置方案的规则，返回 {配置名称: 代码文件}"""
+        code_files = OrderedDict(
+            (profile.name, CodeFile(file_path=file_path, file_name=os.path.basename(file_path), file_content=code))
+            for profile in profiles
         )
 
         try:
-            # 将代码拆分为行
-            lines = code.splitlines()
+            # 行列表由上下文按需生成，只有需要行的规则才会触发拆分
+            deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+            context = SourceContext(code, file_path, lines, symbol_index=self.symbol_index,
+                                    declaration_memo=self.declaration_memo, deadline=deadline)
+
+            # 多个配置方案共用的规则实例只执行一次
+            enabled_rules = []
+            seen = set()
+            for profile in profiles:
+                for rule in profile.rules:
+                    if rule.is_enabled and id(rule) not in seen:
+                        seen.add(id(rule))
+                        enabled_rules.append(rule)
+
+            rule_issues = {}  # type: Dict[int, List[CodeIssue]]
+            timeout_issue = None
+
+            # 启用行缓存时，逐行规则合并为一次按行遍历
+            if self.line_memo is not None:
+                line_rules = [rule for rule in enabled_rules if rule.line_local]
+                enabled_rules = [rule for rule in enabled_rules if not rule.line_local]
+                if line_rules:
+                    rule_ids = ', '.join(rule.rule_id for rule in line_rules)
+                    try:
+                        rule_issues.update(self._check_line_rules(line_rules, context))
+                    except AnalysisTimeout:
+                        timeout_issue = self._timeout_issue(file_path, rule_ids, interrupted=True)
+                        enabled_rules = []
+                    else:
+                        if deadline is not None and time.perf_counter() > deadline:
+                            timeout_issue = self._timeout_issue(file_path, rule_ids)
+                            enabled_rules = []
+
+            metrics = self.metrics
+            # 文件中没有出现规则所需字面量的规则不会产生问题，直接跳过
+            enabled_rules = self._applicable_rules(enabled_rules, code)
+            if metrics is not None and any(isinstance(rule, DeclarationRule) for rule in enabled_rules):
+                # 声明表单独计时，不计入第一条用到它的规则
+                with metrics.phase('declarations'):
+                    context.declarations
 
             # 应用每条规则
-            for rule in self.rules:
-                if rule.is_enabled:
-                    rule_issues = rule.analyze(lines, code, file_path)
-                    code_file.issues.extend(rule_issues)
+            for rule in enabled_rules:
+                try:
+                    if metrics is None:
+                        rule_issues[id(rule)] = rule.check(context)
+                    else:
+                        start = time.perf_counter()
+                        rule_issues[id(rule)] = rule.check(context)
+                        metrics.add_rule_time(rule.rule_id, time.perf_counter() - start)
+                except AnalysisTimeout:
+                    # 逐行执行的规则在行之间发现超时，该规则的部分结果不报告
+                    timeout_issue = self._timeout_issue(file_path, rule.rule_id, interrupted=True)
+                    break
+
+                # 超出时间预算时放弃剩余规则，避免单个文件拖住整个检查
+                if deadline is not None and time.perf_counter() > deadline:
+                    timeout_issue = self._timeout_issue(file_path, rule.rule_id)
+                    break
+
+            # 按配置方案分发各规则的结果
+            for profile in profiles:
+                issues = code_files[profile.name].issues
+                for rule in profile.rules:
+                    issues.extend(rule_issues.get(id(rule), ()))
+                if timeout_issue is not None:
+                    issues.append(timeout_issue)
 
         except Exception as e:
             # 捕获处理错误
-            code_file.issues = [
-                CodeIssue(
-                    line=0,
-                    column=0,
-                    message=f"分析错误: {str(e)}",
-                    rule_id="ANALYSIS_ERROR",
-                    severity="error"
-                )
-            ]
+            for code_file in code_files.values():
+                code_file.issues = [
+                    CodeIssue(
+                        line=0,
+                        column=0,
+                        message=f"分析错误: {str(e)}",
+                        rule_id="ANALYSIS_ERROR",
+                        severity="error",
+                        file_path=file_path
+                    )
+                ]
+
+        return code_files
+
+    def _applicable_rules(self, rules: List[BaseRule], code: str) -> List[BaseRule]:
+        """过滤掉所需字面量（required_literals）都没有在源码中出现的规则
+
+        多条规则共用的字面量只在源码中查找一次；跳过的规则计入性能指标。
+        """
+        literals = {literal for rule in rules for literal in rule.required_literals}
+        if not literals:
+            return rules
+        present = {literal for literal in literals if literal in code}
+        applicable = []
+        for rule in rules:
+            if not rule.required_literals or any(literal in present for literal in rule.required_literals):
+                applicable.append(rule)
+            elif self.metrics is not None:
+                self.metrics.add_rule_skip(rule.rule_id)
+        return applicable
+
+    def _check_line_rules(self, line_rules: List[BaseRule], context: SourceContext) -> Dict[int, List[CodeIssue]]:
+        """批量执行逐行规则，重复出现的行直接复用缓存的相对结果；返回 {id(规则): 问题列表}"""
+        analyze_line = self.line_analyzer(line_rules)
+        issues = [[] for _ in line_rules]
+        file_path = context.file_path
+        for number, line in context.iter_lines():
+            for index, column, message, severity in analyze_line(line):
+                issues[index].append(CodeIssue(
+                    line=number,
+                    column=column,
+                    message=message,
+                    rule_id=line_rules[index].rule_id,
+                    severity=severity,
+                    file_path=file_path
+                ))
+        return {id(rule): rule_issues for rule, rule_issues in zip(line_rules, issues)}
+
+    def line_analyzer(self, line_rules: List[BaseRule]) -> Callable[[str], Tuple[Tuple[int, int, str, str], ...]]:
+        """返回对单行执行一组逐行规则的函数，结果为 ((规则序号, 列号, 消息, 严重级别), ...)
+
+        启用行缓存时重复出现的行直接复用缓存的结果。
+        """
+        metrics = self.metrics
+
+        def analyze_line(line: str):
+            return tuple(
+                (index, column, message, severity)
+                for index, rule in enumerate(line_rules)
+                for column, message, severity in rule.analyze_line(line)
+            )
+
+        def analyze_line_timed(line: str):
+            # 只有缓存未命中的行才会执行规则，命中的行不计入规则耗时
+            results = []
+            for index, rule in enumerate(line_rules):
+                start = time.perf_counter()
+                for column, message, severity in rule.analyze_line(line):
+                    results.append((index, column, message, severity))
+                metrics.add_rule_time(rule.rule_id, time.perf_counter() - start)
+            return tuple(results)
+
+        compute = analyze_line if metrics is None else analyze_line_timed
+        if self.line_memo is None:
+            return compute
+
+        # 规则组合变化时缓存的结果不再有效
+        signature = tuple((id(rule), rule.severity) for rule in line_rules)
+        if signature != self._line_memo_signature:
+            self.line_memo.clear()
+            self._line_memo_signature = signature
+        line_memo = self.line_memo
+        return lambda line: line_memo.get_or_compute(line, compute)
+
+    def _timeout_issue(self, file_path: str, rule_id: str, interrupted: bool = False) -> CodeIssue:
+        """超出时间预算时报告的问题
+
+        interrupted: 是否在规则执行过程中（逐行检查的行之间）中断，此时该规则本身的结果也不报告
+        """
+        if interrupted:
+            skipped = f"规则 {rule_id} 执行中超时，该规则及之后的检查已跳过"
+        else:
+            skipped = f"规则 {rule_id} 之后的检查已跳过"
+        return CodeIssue(
+            line=0,
+            column=0,
+            message=f"分析超时: 超过 {self.time_budget} 秒的时间预算，{skipped}",
+            rule_id="TIMEOUT",
+            severity="warning",
+            file_path=file_path
+        )
+
+    def _memos(self) -> Iterator[Tuple[str, LineMemo]]:
+        """启用的行缓存：(名称, 缓存)"""
+        if self.line_memo is not None:
+            yield 'line_rules', self.line_memo
+        if self.declaration_memo is not None:
+            yield 'declarations', self.declaration_memo
+
+    def memo_stats(self) -> Dict[str, Dict[str, Any]]:
+        """行缓存的命中统计
 
-        return code_file
+        命中和未命中次数包括并行分析时各工作进程中的缓存；size 只是当前进程中缓存的行数。
+        """
+        stats = OrderedDict()
+        for name, memo in self._memos():
+            stats[name] = memo.stats()
+            worker_hits, worker_misses = self._worker_memo_counts.get(name, (0, 0))
+            if worker_hits or worker_misses:
+                hits = stats[name]['hits'] = memo.hits + worker_hits
+                misses = stats[name]['misses'] = memo.misses + worker_misses
+                stats[name]['hit_rate'] = hits / (hits + misses)
+        return stats
 
+    def _take_memo_counts(self) -> Dict[str, Tuple[int, int]]:
+        """取出上次调用以来的行缓存命中计数并清零（工作进程随每个文件的结果返回）"""
+        counts = {}
+        for name, memo in self._memos():
+            counts[name] = (memo.hits, memo.misses)
+            memo.hits = memo.misses = 0
+        return counts
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""项目级符号索引：记录每个类型名在哪些文件中声明"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from csharp_style_checker.core.declaration_extractor import find_type_names
+
+
+# 文件数少于该值时直接在当前进程扫描，避免进程池的启动开销
+PARALLEL_THRESHOLD = 64
+
+# 持久化缓存格式版本，格式变化时旧缓存自动失效
+CACHE_VERSION = 1
+
+
+def content_hash(data: bytes) -> str:
+    """计算文件内容的哈希值"""
+    return hashlib.sha1(data).hexdigest()
+
+
+def _scan_file(task: Tuple[str, Optional[str]]) -> Tuple[str, Optional[str], Optional[List[str]]]:
+    """扫描单个文件的类型声明；内容哈希与缓存一致时不再解析"""
+    file_path, cached_hash = task
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return file_path, None, None
+
+    digest = content_hash(data)
+    if digest == cached_hash:
+        return file_path, digest, None
+    return file_path, digest, find_type_names(data.decode('utf-8', errors='replace'))
+
+
+class SymbolIndex:
+    """项目级符号索引"""
+
+    def __init__(self):
+        """初始化符号索引"""
+        self._types = {}  # type: Dict[str, Set[str]]
+        self._files = {}  # type: Dict[str, Tuple[str, List[str]]]
+        self.reused_files = 0
+        self.scanned_files = 0
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def has_type(self, type_name: str) -> bool:
+        """项目中是否声明了该类型"""
+        return type_name in self._types
+
+    def files_for(self, type_name: str) -> FrozenSet[str]:
+        """获取声明了该类型的所有文件（partial类可能分布在多个文件中）"""
+        return frozenset(self._types.get(type_name, ()))
+
+    def add_file(self, file_path: str, file_hash: str, type_names: List[str]):
+        """添加或替换一个文件的类型声明"""
+        self.remove_file(file_path)
+        self._files[file_path] = (file_hash, list(type_names))
+        for type_name in type_names:
+            self._types.setdefault(type_name, set()).add(file_path)
+
+    def remove_file(self, file_path: str):
+        """移除一个文件的类型声明"""
+        entry = self._files.pop(file_path, None)
+        if entry is None:
+            return
+        for type_name in entry[1]:
+            paths = self._types.get(type_name)
+            if paths is not None:
+                paths.discard(file_path)
+                if not paths:
+                    del self._types[type_name]
+
+    def build(self, file_paths: Iterable[str], workers: Optional[int] = None, cache_path: Optional[str] = None,
+              executor: Optional[Executor] = None):
+        """为一次检查构建索引；内容哈希未变的文件直接复用缓存中的结果
+
+        executor: 调用方已经创建的进程池，文件较多时在其中扫描，不再单独创建
+        """
+        cached = self._load_cache(cache_path) if cache_path else {}
+
+        tasks = []
+        for file_path in file_paths:
+            key = os.path.abspath(file_path)
+            entry = cached.get(key)
+            tasks.append((file_path, entry[0] if entry else None))
+
+        if workers == 1 or len(tasks) < PARALLEL_THRESHOLD:
+            results = map(_scan_file, tasks)
+            self._collect(results, cached)
+        elif executor is not None:
+            self._collect(executor.map(_scan_file, tasks, chunksize=32), cached)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                self._collect(executor.map(_scan_file, tasks, chunksize=32), cached)
+
+        if cache_path:
+            self.save(cache_path)
+
+    def _collect(self, results, cached: Dict[str, Tuple[str, List[str]]]):
+        """汇总扫描结果"""
+        for file_path, digest, type_names in results:
+            if digest is None:
+                continue
+            if type_names is None:
+                type_names = cached[os.path.abspath(file_path)][1]
+                self.reused_files += 1
+            else:
+                self.scanned_files += 1
+            self.add_file(file_path, digest, type_names)
+
+    def load(self, cache_path: str):
+        """直接从持久化缓存加载索引，不校验文件内容（用于无法预先列出全部文件的场景）"""
+        for file_path, (file_hash, type_names) in self._load_cache(cache_path).items():
+            self.add_file(file_path, file_hash, type_names)
+            self.reused_files += 1
+
+    def save(self, cache_path: str):
+        """将索引持久化到磁盘"""
+        data = {
+            'version': CACHE_VERSION,
+            'files': {
+                os.path.abspath(file_path): {'hash': file_hash, 'types': type_names}
+                for file_path, (file_hash, type_names) in self._files.items()
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = cache_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, cache_path)
+
+    def _load_cache(self, cache_path: str) -> Dict[str, Tuple[str, List[str]]]:
+        """读取持久化的索引；缓存缺失、损坏或版本不符时视为空"""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return {}
+        return {
+            path: (entry['hash'], entry['types'])
+            for path, entry in data.get('files', {}).items()
+        }
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""编辑器中打开的文档：按行保存文本和逐行规则的结果，增量编辑只使受影响的行失效"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from csharp_style_checker.models.code_issue import CodeIssue
+
+
+# LSP 只把 \r\n、\r、\n 视为换行
+_LINE_BREAK = re.compile(r'\r\n|\r|\n')
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+
+def split_lines(text: str) -> List[str]:
+    """按 LSP 的换行规则拆分文本，结果与编辑器中的行号一一对应"""
+    return _LINE_BREAK.split(text)
+
+
+def utf16_to_index(line: str, character: int) -> int:
+    """LSP 位置（UTF-16 码元）转换为字符串下标"""
+    if not _NON_ASCII.search(line):
+        return min(character, len(line))
+    units = 0
+    for index, char in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(char) > 0xFFFF else 1
+    return len(line)
+
+
+def index_to_utf16(line: str, index: int) -> int:
+    """字符串下标转换为 LSP 位置（UTF-16 码元）"""
+    if not _NON_ASCII.search(line):
+        return min(index, len(line))
+    return len(line[:index].encode('utf-16-le')) // 2
+
+
+class TextDocument:
+    """打开的文档
+
+    line_results 与 lines 一一对应，保存逐行规则在该行的结果（与行号无关），None 表示尚未计算；
+    编辑时只有被替换的行需要重新计算，其余行的结果随行一起移动。
+    file_issues 是非逐行规则最近一次的结果，编辑后按行号平移，等到文件级分析重新执行时再更新。
+    """
+
+    def __init__(self, uri: str, file_path: str, text: str, version: Optional[int] = None):
+        """初始化文档"""
+        self.uri = uri
+        self.file_path = file_path
+        self.version = version
+        self.lines = split_lines(text)
+        self.line_results = [None] * len(self.lines)  # type: List[Optional[Tuple]]
+        self.file_issues = []  # type: List[CodeIssue]
+        self.file_issues_stale = True
+
+    @property
+    def text(self) -> str:
+        """当前完整文本（换行统一为 \\n）"""
+        return '\n'.join(self.lines)
+
+    def apply_change(self, change: Dict[str, Any]):
+        """应用一次 textDocument/didChange 中的内容变化（增量或全量）"""
+        self.file_issues_stale = True
+        change_range = change.get('range')
+        if change_range is None:
+            self.lines = split_lines(change['text'])
+            self.line_results = [None] * len(self.lines)
+            self.file_issues = []
+            return
+
+        start_line, start_index = self._locate(change_range['start'])
+        end_line, end_index = self._locate(change_range['end'])
+        prefix = self.lines[start_line][:start_index]
+        suffix = self.lines[end_line][end_index:]
+
+        new_lines = split_lines(change['text'])
+        new_lines[0] = prefix + new_lines[0]
+        new_lines[-1] = new_lines[-1] + suffix
+        self.lines[start_line:end_line + 1] = new_lines
+        self.line_results[start_line:end_line + 1] = [None] * len(new_lines)
+        self._shift_file_issues(start_line, end_line, len(new_lines))
+
+    def _locate(self, position: Dict[str, int]) -> Tuple[int, int]:
+        """LSP 位置转换为 (行下标, 字符串下标)；最后一行之后的位置（编辑器用它表示文件末尾）落在文件末尾"""
+        last_line = len(self.lines) - 1
+        if position['line'] > last_line:
+            return last_line, len(self.lines[last_line])
+        line = self.lines[position['line']]
+        return position['line'], utf16_to_index(line, position['character'])
+
+    def _shift_file_issues(self, start_line: int, end_line: int, new_count: int):
+        """编辑后平移文件级问题：被替换范围内的问题丢弃，之后的问题按行数变化平移"""
+        delta = new_count - (end_line - start_line + 1)
+        shifted = []
+        for issue in self.file_issues:
+            line_index = issue.line - 1
+            if line_index < start_line:
+                shifted.append(issue)
+            elif line_index > end_line:
+                shifted.append(CodeIssue(line=issue.line + delta, column=issue.column, message=issue.message,
+                                         rule_id=issue.rule_id, severity=issue.severity, file_path=issue.file_path))
+        self.file_issues = shifted
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""基于标准输入输出的 LSP 服务：规则常驻内存，编辑时只重新检查变化的行"""
+
+import json
+import queue
+import re
+import sys
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+from urllib.parse import unquote, urlparse
+
+from csharp_style_checker.core.style_checker import StyleChecker
+from csharp_style_checker.lsp.document import TextDocument, index_to_utf16
+
+
+# LSP DiagnosticSeverity
+_DIAGNOSTIC_SEVERITY = {'error': 1, 'warning': 2, 'info': 3}
+
+# JSON-RPC 错误码
+_INVALID_REQUEST = -32600
+_METHOD_NOT_FOUND = -32601
+_INTERNAL_ERROR = -32603
+
+# TextDocumentSyncKind.Incremental
+_SYNC_INCREMENTAL = 2
+
+_SERVER_NAME = 'csharp_style_checker'
+
+
+def uri_to_path(uri: str) -> str:
+    """file URI 转换为本地路径，其他协议的 URI 原样返回"""
+    parsed = urlparse(uri)
+    if parsed.scheme != 'file':
+        return uri
+    path = unquote(parsed.path)
+    # file:///C:/x.cs -> C:/x.cs
+    if re.match(r'^/[A-Za-z]:', path):
+        path = path[1:]
+    return path
+
+
+class JsonRpcStream:
+    """以 Content-Length 分帧的 JSON-RPC 消息流"""
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO, chunk_size: int = 64 * 1024):
+        """初始化消息流
+
+        reader 最好是无缓冲的原始流（如 sys.stdin.buffer.raw）：读取线程阻塞在原始流上时，
+        解释器退出不会因为等待缓冲流的锁而失败。
+        """
+        self.writer = writer
+        self.chunk_size = chunk_size
+        # read1 / 原始流的 read 只返回当前可用的数据，不会等到读满 chunk_size
+        self._read = getattr(reader, 'read1', reader.read)
+        self._buffer = bytearray()
+
+    def _fill(self) -> bool:
+        """读取更多数据，输入结束时返回False"""
+        chunk = self._read(self.chunk_size)
+        if not chunk:
+            return False
+        self._buffer += chunk
+        return True
+
+    def read_message(self) -> Optional[Dict[str, Any]]:
+        """读取一条消息，输入结束时返回None"""
+        while True:
+            header_end = self._buffer.find(b'\r\n\r\n')
+            if header_end >= 0:
+                break
+            if not self._fill():
+                return None
+
+        content_length = None
+        for header in bytes(self._buffer[:header_end]).decode('ascii').split('\r\n'):
+            name, _, value = header.partition(':')
+            if name.strip().lower() == 'content-length':
+                content_length = int(value.strip())
+        del self._buffer[:header_end + 4]
+        if content_length is None:
+            raise ValueError("LSP 消息缺少 Content-Length 头")
+
+        while len(self._buffer) < content_length:
+            if not self._fill():
+                return None
+        body = bytes(self._buffer[:content_length])
+        del self._buffer[:content_length]
+        return json.loads(body.decode('utf-8'))
+
+    def write_message(self, message: Dict[str, Any]):
+        """写出一条消息"""
+        body = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.writer.write(f'Content-Length: {len(body)}\r\n\r\n'.encode('ascii') + body)
+        self.writer.flush()
+
+
+class LanguageServer:
+    """C# 代码风格检查的 LSP 服务
+
+    - 文档以增量方式同步，每行缓存逐行规则的结果，编辑后只有变化的行需要重新检查；
+    - 非逐行规则（依赖声明表等整个文件的状态）推迟到编辑停顿 file_debounce 秒后才重新执行，
+      在此之前沿用上一次的结果并按行号平移；
+    - 诊断在最后一次编辑 debounce 秒后发布，连续输入只发布一次。
+
+    所有分析都在主线程中执行，读取线程只负责解析消息。
+    """
+
+    def __init__(self, checker: StyleChecker, stream: JsonRpcStream, debounce: float = 0.05,
+                 file_debounce: float = 0.5):
+        """初始化服务
+
+        debounce: 最后一次编辑后多久发布诊断（秒）
+        file_debounce: 最后一次编辑后多久重新执行非逐行规则（秒）
+        """
+        self.checker = checker
+        self.stream = stream
+        self.debounce = debounce
+        self.file_debounce = file_debounce
+        self.documents = {}  # type: Dict[str, TextDocument]
+
+        enabled_rules = [rule for rule in checker.rules if rule.is_enabled]
+        self.line_rules = [rule for rule in enabled_rules if rule.line_local]
+        self.file_rules = [rule for rule in enabled_rules if not rule.line_local]
+        self._analyze_line = checker.line_analyzer(self.line_rules)
+
+        # URI -> 计划执行的时间
+        self._publish_due = {}  # type: Dict[str, float]
+        self._analyze_due = {}  # type: Dict[str, float]
+        self._messages = queue.Queue()  # type: queue.Queue
+        self._shutdown_requested = False
+        self._exit_requested = False
+
+        self._requests = {
+            'initialize': self._initialize,
+            'shutdown': self._shutdown,
+        }  # type: Dict[str, Callable[[Dict[str, Any]], Any]]
+        self._notifications = {
+            'exit': self._exit,
+            'textDocument/didOpen': self._did_open,
+            'textDocument/didChange': self._did_change,
+            'textDocument/didSave': self._did_save,
+            'textDocument/didClose': self._did_close,
+        }  # type: Dict[str, Callable[[Dict[str, Any]], None]]
+
+    def serve(self) -> int:
+        """处理消息直到客户端退出，返回进程退出码"""
+        reader = threading.Thread(target=self._read_messages, name='lsp-reader', daemon=True)
+        reader.start()
+
+        while not self._exit_requested:
+            timeout = self._next_timeout()
+            try:
+                message = self._messages.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            else:
+                if message is None:
+                    break
+                self.handle_message(message)
+                # 先处理完已经到达的消息，连续的编辑合并为一次分析
+                if not self._messages.empty():
+                    continue
+            self.run_due_tasks()
+
+        return 0 if self._shutdown_requested else 1
+
+    def _read_messages(self):
+        """读取线程：解析消息放入队列，输入结束时放入None"""
+        try:
+            while True:
+                message = self.stream.read_message()
+                self._messages.put(message)
+                if message is None:
+                    return
+        except Exception as e:
+            print(f"LSP 消息读取失败: {e}", file=sys.stderr)
+            self._messages.put(None)
+
+    def _next_timeout(self) -> Optional[float]:
+        """距离最近一个计划任务的时间，没有计划任务时为None（一直等待消息）"""
+        deadlines = list(self._publish_due.values()) + list(self._analyze_due.values())
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def handle_message(self, message: Dict[str, Any]):
+        """处理一条请求或通知"""
+        method = message.get('method')
+        if method is None:
+            # 客户端对服务端请求的响应，本服务不发送请求
+            return
+        params = message.get('params') or {}
+        request_id = message.get('id')
+
+        if request_id is None:
+            handler = self._notifications.get(method)
+            if handler is not None:
+                try:
+                    handler(params)
+                except Exception as e:
+                    print(f"LSP 通知 {method} 处理失败: {e}", file=sys.stderr)
+            return
+
+        if self._shutdown_requested:
+            self._send_error(request_id, _INVALID_REQUEST, "服务已关闭")
+            return
+        handler = self._requests.get(method)
+        if handler is None:
+            self._send_error(request_id, _METHOD_NOT_FOUND, f"不支持的方法: {method}")
+            return
+        try:
+            result = handler(params)
+        except Exception as e:
+            self._send_error(request_id, _INTERNAL_ERROR, str(e))
+            return
+        self.stream.write_message({'jsonrpc': '2.0', 'id': request_id, 'result': result})
+
+    def _send_error(self, request_id, code: int, message: str):
+        self.stream.write_message({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}})
+
+    def run_due_tasks(self):
+        """执行已经到期的文件级分析和诊断发布"""
+        now = time.monotonic()
+        for uri, due in list(self._analyze_due.items()):
+            if due <= now:
+                del self._analyze_due[uri]
+                self._analyze_file(self.documents[uri])
+                # 分析后立即发布
+                self._publish_due[uri] = now
+
+        for uri, due in list(self._publish_due.items()):
+            if due <= now:
+                del self._publish_due[uri]
+                self.publish_diagnostics(self.documents[uri])
+
+    def _schedule(self, uri: str, publish_delay: float, analyze_delay: Optional[float]):
+        """计划发布诊断；analyze_delay 不为None时同时计划文件级分析"""
+        now = time.monotonic()
+        self._publish_due[uri] = now + publish_delay
+        if analyze_delay is not None and self.file_rules:
+            self._analyze_due[uri] = now + analyze_delay
+
+    # 请求和通知
+
+    def _initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'capabilities': {
+                'textDocumentSync': {'openClose': True, 'change': _SYNC_INCREMENTAL, 'save': {'includeText': False}},
+            },
+            'serverInfo': {'name': _SERVER_NAME},
+        }
+
+    def _shutdown(self, params: Dict[str, Any]):
+        self._shutdown_requested = True
+        return None
+
+    def _exit(self, params: Dict[str, Any]):
+        self._exit_requested = True
+
+    def _did_open(self, params: Dict[str, Any]):
+        item = params['textDocument']
+        uri = item['uri']
+        file_path = uri_to_path(uri)
+        # 生成代码不检查，与命令行模式一致
+        if self.checker.skip_generated and self.checker.generated_code_classifier.classify_name(file_path):
+            return
+        self.documents[uri] = TextDocument(uri, file_path, item.get('text', ''), item.get('version'))
+        self._schedule(uri, 0.0, 0.0)
+
+    def _did_change(self, params: Dict[str, Any]):
+        item = params['textDocument']
+        document = self.documents.get(item['uri'])
+        if document is None:
+            return
+        document.version = item.get('version')
+        for change in params.get('contentChanges', ()):
+            document.apply_change(change)
+        self._schedule(document.uri, self.debounce, self.file_debounce)
+
+    def _did_save(self, params: Dict[str, Any]):
+        uri = params['textDocument']['uri']
+        if uri in self.documents and self.documents[uri].file_issues_stale:
+            self._schedule(uri, 0.0, 0.0)
+
+    def _did_close(self, params: Dict[str, Any]):
+        uri = params['textDocument']['uri']
+        self._publish_due.pop(uri, None)
+        self._analyze_due.pop(uri, None)
+        if self.documents.pop(uri, None) is not None:
+            self._send_diagnostics(uri, None, [])
+
+    # 分析
+
+    def _analyze_file(self, document: TextDocument):
+        """重新执行非逐行规则"""
+        code_file = self.checker.analyze_source(document.text, document.file_path, self.file_rules, document.lines)
+        document.file_issues = code_file.issues
+        document.file_issues_stale = False
+
+    def publish_diagnostics(self, document: TextDocument):
+        """计算尚未缓存的行的逐行规则结果，与文件级问题一起发布"""
+        diagnostics = []
+        lines = document.lines
+        line_results = document.line_results
+        analyze_line = self._analyze_line
+        line_rules = self.line_rules
+        for i, results in enumerate(line_results):
+            if results is None:
+                results = line_results[i] = analyze_line(lines[i])
+            for index, column, message, severity in results:
+                diagnostics.append(self._diagnostic(lines, i, column, message, line_rules[index].rule_id, severity))
+
+        for issue in document.file_issues:
+            diagnostics.append(self._diagnostic(lines, max(issue.line - 1, 0), issue.column, issue.message,
+                                                issue.rule_id, issue.severity))
+        self._send_diagnostics(document.uri, document.version, diagnostics)
+
+    @staticmethod
+    def _diagnostic(lines: List[str], line_index: int, column: int, message: str, rule_id: str,
+                    severity: str) -> Dict[str, Any]:
+        """问题转换为 LSP Diagnostic，范围从问题所在列到行尾"""
+        line = lines[line_index] if line_index < len(lines) else ''
+        start = index_to_utf16(line, max(column - 1, 0))
+        end = max(index_to_utf16(line, len(line)), start)
+        return {
+            'range': {'start': {'line': line_index, 'character': start}, 'end': {'line': line_index, 'character': end}},
+            'severity': _DIAGNOSTIC_SEVERITY.get(severity, 2),
+            'code': rule_id,
+            'source': _SERVER_NAME,
+            'message': message,
+        }
+
+    def _send_diagnostics(self, uri: str, version: Optional[int], diagnostics: List[Dict[str, Any]]):
+        params = {'uri': uri, 'diagnostics': diagnostics}
+        if version is not None:
+            params['version'] = version
+        self.stream.write_message({'jsonrpc': '2.0', 'method': 'textDocument/publishDiagnostics', 'params': params})
@@ -5,6 +5,9 @@
 from csharp_style_checker.models.code_issue import CodeIssue
 from csharp_style_checker.models.code_file import CodeFile
 from csharp_style_checker.models.check_result import CheckResult
+from csharp_style_checker.models.declaration import Declaration
+from csharp_style_checker.models.result_sink import ResultSink, CallbackSink
+from csharp_style_checker.models.assembly import Assembly
 
-__all__ = ['CodeIssue', 'CodeFile', 'CheckResult']
+__all__ = ['CodeIssue', 'CodeFile', 'CheckResult', 'Declaration', 'ResultSink', 'CallbackSink', 'Assembly']
 
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+"""程序集模型定义"""
+
+from typing import List, Optional
+
+
+class Assembly:
+    """一个编译单元（.csproj 项目或 Unity .asmdef 程序集）及其参与编译的源文件"""
+
+    # 程序集类型
+    KIND_RUNTIME = "runtime"
+    KIND_EDITOR = "editor"
+    KIND_TEST = "test"
+
+    def __init__(self, name: str, source: Optional[str] = None, kind: str = KIND_RUNTIME,
+                 files: Optional[List[str]] = None):
+        """初始化程序集
+
+        source: 定义该程序集的文件（.csproj / .asmdef），Unity 预定义程序集为None
+        """
+        self.name = name
+        self.source = source
+        self.kind = kind
+        self.files = files if files is not None else []
+
+    def __repr__(self):
+        return f"Assembly({self.name!r}, kind={self.kind!r}, files={len(self.files)})"
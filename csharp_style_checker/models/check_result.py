@@ -2,14 +2,29 @@
 
 """检查结果模型定义"""
 
+import os
 import time
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from csharp_style_checker.models.result_sink import ResultSink
 
-class CheckResult:
-    """检查结果模型"""
 
-    def __init__(self):
-        """初始化检查结果"""
+# 检查器自身产生的问题（解析失败、分析错误、超时）所属的类别
+SYSTEM_CATEGORY = "system"
+SYSTEM_RULE_IDS = ("PARSE_ERROR", "ANALYSIS_ERROR", "TIMEOUT")
+
+
+class CheckResult(ResultSink):
+    """检查结果模型
+
+    添加文件时增量维护按严重级别、规则、类别和目录前缀的汇总，查询汇总不需要重新扫描问题列表。
+    """
+
+    def __init__(self, rule_categories: Optional[Dict[str, str]] = None):
+        """初始化检查结果
+
+        rule_categories: {规则ID: 类别}，用于按类别汇总；未知规则归入 "other"
+        """
         self.checked_at = time.time()
         self.total_files = 0
         self.total_issues = 0
@@ -17,4 +32,102 @@ class CheckResult:
         self.warning_count = 0
         self.info_count = 0
         self.code_files = []
+        # 分析前被跳过的文件：(文件路径, 跳过原因)
+        self.skipped_files = []
+        # 检查过程中需要在报告中说明的情况（例如为控制内存不再保留源码）
+        self.notes = []  # type: List[str]
+
+        self.rule_categories = dict(rule_categories or {})
+        for rule_id in SYSTEM_RULE_IDS:
+            self.rule_categories.setdefault(rule_id, SYSTEM_CATEGORY)
+        # 增量汇总
+        self.by_severity = {}  # type: Dict[str, int]
+        self.by_rule = {}  # type: Dict[str, int]
+        self.by_category = {}  # type: Dict[str, int]
+        # 目录前缀 -> 该目录（含子目录）下的问题数
+        self.by_directory = {}  # type: Dict[str, int]
+        # 程序集名称 -> {"files", "issues", "error", "warning", "info"}，按项目文件选择文件时才有；
+        # 被多个项目包含的文件计入每一个程序集，各程序集的文件数之和可能大于 total_files
+        self.by_assembly = {}  # type: Dict[str, Dict[str, int]]
+        # 抽样检查时外推到全部文件的问题数量（utils.sampling.SampleEstimate），完整检查时为None
+        self.estimate = None
+
+    def add_file(self, code_file):
+        """添加一个文件的检查结果并更新文件数和问题统计"""
+        self.code_files.append(code_file)
+        self._record(code_file)
+
+    def _record(self, code_file):
+        """把一个文件的问题计入各项汇总"""
+        self.total_files += 1
+        issue_count = len(code_file.issues)
+        for assembly in code_file.assemblies:
+            self._record_assembly(assembly, code_file)
+        if not issue_count:
+            return
+
+        self.total_issues += issue_count
+        for severity, count in code_file.severity_counts().items():
+            self.by_severity[severity] = self.by_severity.get(severity, 0) + count
+        self.error_count = self.by_severity.get("error", 0)
+        self.warning_count = self.by_severity.get("warning", 0)
+        self.info_count = self.by_severity.get("info", 0)
+
+        for rule_id, count in code_file.rule_counts().items():
+            self.by_rule[rule_id] = self.by_rule.get(rule_id, 0) + count
+            category = self.rule_categories.get(rule_id, "other")
+            self.by_category[category] = self.by_category.get(category, 0) + count
+
+        directory = os.path.dirname(os.path.normpath(code_file.file_path))
+        while True:
+            self.by_directory[directory] = self.by_directory.get(directory, 0) + issue_count
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+
+    def _record_assembly(self, assembly: str, code_file):
+        """把一个文件计入所属程序集的汇总"""
+        summary = self.by_assembly.get(assembly)
+        if summary is None:
+            summary = self.by_assembly[assembly] = {"files": 0, "issues": 0, "error": 0, "warning": 0, "info": 0}
+        summary["files"] += 1
+        summary["issues"] += len(code_file.issues)
+        for severity, count in code_file.severity_counts().items():
+            summary[severity] = summary.get(severity, 0) + count
+
+    def add_skipped(self, file_path: str, reason: str):
+        """记录一个在分析前被跳过的文件"""
+        self.skipped_files.append((file_path, reason))
+
+    def add_note(self, note: str):
+        """记录一条需要在报告中说明的检查情况"""
+        self.notes.append(note)
+
+    @property
+    def skipped_count(self) -> int:
+        """被跳过的文件数量"""
+        return len(self.skipped_files)
+
+    def finish(self):
+        """检查结束时调用，之后结果只读；内存中的结果无需处理"""
+
+    def iter_file_summaries(self) -> Iterator[Tuple[str, str, int, int, int, int]]:
+        """按问题数从多到少产生每个文件的统计：(路径, 文件名, 问题数, 错误数, 警告数, 提示数)"""
+        for code_file in sorted(self.code_files, key=lambda f: len(f.issues), reverse=True):
+            yield (code_file.file_path, code_file.file_name, len(code_file.issues),
+                   code_file.error_count(), code_file.warning_count(), code_file.info_count())
+
+    def iter_code_files(self, with_issues_only: bool = False) -> Iterator:
+        """按检查顺序产生每个文件的结果（CodeFile）"""
+        for code_file in self.code_files:
+            if code_file.issues or not with_issues_only:
+                yield code_file
+
+    def rule_counts(self) -> Dict[str, int]:
+        """每条规则的问题数量"""
+        return dict(self.by_rule)
 
+    def issues_under(self, directory: str) -> int:
+        """目录（含子目录）下的问题数量"""
+        return self.by_directory.get(os.path.normpath(directory), 0)
@@ -3,7 +3,7 @@
 """代码文件模型定义"""
 
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class CodeFile:
@@ -15,20 +15,56 @@ class CodeFile:
         self.file_name = file_name if file_name else os.path.basename(file_path)
         self.file_content = file_content
         self.issues = []
+        # 所属程序集名称，按项目文件选择文件时设置；被多个项目包含的文件属于其中每一个程序集
+        self.assemblies = []  # type: List[str]
+        # 问题统计缓存：(统计时的问题列表, 统计时的问题数, 按严重级别, 按规则)
+        self._counts = None
+
+    def copy_for(self, file_path: str) -> 'CodeFile':
+        """为内容相同的另一个路径创建检查结果的副本，源码字符串共用"""
+        copy = CodeFile(file_path=file_path, file_content=self.file_content)
+        copy.assemblies = list(self.assemblies)
+        copy.issues = [issue.copy_for(file_path) for issue in self.issues]
+        return copy
+
+    @property
+    def assembly(self) -> Optional[str]:
+        """第一个所属的程序集，不属于任何程序集时为None"""
+        return self.assemblies[0] if self.assemblies else None
 
     def has_issues(self) -> bool:
         """检查是否有问题"""
         return len(self.issues) > 0
 
+    def _get_counts(self):
+        """一次遍历统计问题；问题列表被替换或长度变化后重新统计"""
+        counts = self._counts
+        if counts is None or counts[0] is not self.issues or counts[1] != len(self.issues):
+            by_severity = {}  # type: Dict[str, int]
+            by_rule = {}  # type: Dict[str, int]
+            for issue in self.issues:
+                by_severity[issue.severity] = by_severity.get(issue.severity, 0) + 1
+                by_rule[issue.rule_id] = by_rule.get(issue.rule_id, 0) + 1
+            counts = self._counts = (self.issues, len(self.issues), by_severity, by_rule)
+        return counts
+
+    def severity_counts(self) -> Dict[str, int]:
+        """按严重级别统计问题数量"""
+        return self._get_counts()[2]
+
+    def rule_counts(self) -> Dict[str, int]:
+        """按规则统计问题数量"""
+        return self._get_counts()[3]
+
     def error_count(self) -> int:
         """获取错误数量"""
-        return sum(1 for issue in self.issues if issue.severity == "error")
+        return self.severity_counts().get("error", 0)
 
     def warning_count(self) -> int:
         """获取警告数量"""
-        return sum(1 for issue in self.issues if issue.severity == "warning")
+        return self.severity_counts().get("warning", 0)
 
     def info_count(self) -> int:
         """获取提示数量"""
-        return sum(1 for issue in self.issues if issue.severity == "info")
+        return self.severity_counts().get("info", 0)
 
@@ -14,3 +14,29 @@ class CodeIssue:
         self.severity = severity
         self.file_path = file_path
 
+
+    def copy_for(self, file_path):
+        """同一问题在另一个文件中的副本"""
+        return CodeIssue(self.line, self.column, self.message, self.rule_id, self.severity, file_path)
+
+    def to_dict(self):
+        """转换为可序列化的字典（不含文件路径）"""
+        return {
+            'line': self.line,
+            'column': self.column,
+            'message': self.message,
+            'rule_id': self.rule_id,
+            'severity': self.severity,
+        }
+
+    @classmethod
+    def from_dict(cls, data, file_path=None):
+        """从字典恢复问题对象"""
+        return cls(
+            line=data['line'],
+            column=data['column'],
+            message=data['message'],
+            rule_id=data['rule_id'],
+            severity=data['severity'],
+            file_path=file_path
+        )
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+"""声明模型定义"""
+
+from typing import Tuple
+
+
+class Declaration:
+    """源码中的一条声明（类型、字段、属性或局部变量）"""
+
+    __slots__ = ('kind', 'modifiers', 'type_name', 'name', 'line', 'column')
+
+    def __init__(self, kind: str, modifiers: Tuple[str, ...], type_name: str, name: str, line: int, column: int):
+        """初始化声明"""
+        self.kind = kind
+        self.modifiers = modifiers
+        self.type_name = type_name
+        self.name = name
+        self.line = line
+        self.column = column
+
+    def has_modifier(self, modifier: str) -> bool:
+        """检查声明是否带有指定修饰符"""
+        return modifier in self.modifiers
+
+    def __repr__(self):
+        return (f"Declaration({self.kind!r}, {self.modifiers!r}, {self.type_name!r}, {self.name!r}, "
+                f"{self.line}, {self.column})")
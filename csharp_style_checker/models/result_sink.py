@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""检查结果接收器接口"""
+
+from typing import Callable, Optional
+
+
+class ResultSink:
+    """检查结果接收器：检查器每完成一个文件回调一次，不要求保留任何结果
+
+    CheckResult 是保存全部结果的接收器；调用方也可以实现自己的接收器，
+    边检查边处理结果（写入数据库、实时展示等）。
+    """
+
+    def add_file(self, code_file):
+        """接收一个文件的检查结果（CodeFile）"""
+
+    def add_skipped(self, file_path: str, reason: str):
+        """接收一个在分析前被跳过的文件"""
+
+    def add_note(self, note: str):
+        """接收一条需要在报告中说明的检查情况"""
+
+    def finish(self):
+        """检查结束"""
+
+
+class CallbackSink(ResultSink):
+    """把检查结果转发给回调函数的接收器"""
+
+    def __init__(self, on_file: Callable, on_skipped: Optional[Callable] = None,
+                 on_finish: Optional[Callable] = None):
+        """初始化接收器
+
+        on_file(code_file): 每完成一个文件调用一次
+        on_skipped(file_path, reason): 每跳过一个文件调用一次
+        on_finish(): 检查结束时调用
+        """
+        self.on_file = on_file
+        self.on_skipped = on_skipped
+        self.on_finish = on_finish
+
+    def add_file(self, code_file):
+        self.on_file(code_file)
+
+    def add_skipped(self, file_path: str, reason: str):
+        if self.on_skipped is not None:
+            self.on_skipped(file_path, reason)
+
+    def finish(self):
+        if self.on_finish is not None:
+            self.on_finish()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""批量检查的汇总索引：每个根目录一行，链接到各自的报告"""
+
+import os
+import time
+from typing import Dict, List, Tuple
+
+from csharp_style_checker.models.check_result import CheckResult
+from csharp_style_checker.utils.file_utils import open_text_output
+
+
+class BatchIndexReporter:
+    """批量检查汇总索引生成器"""
+
+    def generate_index(self, entries: List[Tuple[str, str, Dict[str, Tuple[CheckResult, str]]]], output_path: str):
+        """生成汇总索引
+
+        entries: [(根目录名称, 根目录路径, {配置名称: (检查结果, 报告路径)})]，报告链接写为相对于索引的路径
+        """
+        index_dir = os.path.dirname(os.path.abspath(output_path))
+        rows = []
+        totals = [0, 0, 0, 0, 0]
+        multiple_profiles = False
+        for name, root_path, reports in entries:
+            multiple_profiles = multiple_profiles or len(reports) > 1
+            for position, (profile_name, (result, report_path)) in enumerate(reports.items()):
+                counts = [result.total_files, result.total_issues, result.error_count, result.warning_count,
+                          result.info_count]
+                # 同一根目录的多个配置方案检查的是相同的文件，合计只计入第一个配置方案
+                if position == 0:
+                    totals = [total + count for total, count in zip(totals, counts)]
+                if result.error_count:
+                    row_class = "error-row"
+                elif result.warning_count:
+                    row_class = "warning-row"
+                elif result.info_count:
+                    row_class = "info-row"
+                else:
+                    row_class = "clean-row"
+                label = name if len(reports) == 1 else f"{name} [{profile_name}]"
+                link = os.path.relpath(os.path.abspath(report_path), index_dir).replace(os.sep, '/')
+                cells = ''.join(f'<td>{count}</td>' for count in counts)
+                rows.append(f'<tr class="{row_class}"><td><a href="{_escape(link)}">{_escape(label)}</a></td>'
+                            f'<td class="path">{_escape(root_path)}</td>{cells}</tr>')
+
+        html = _INDEX_TEMPLATE
+        html = html.replace('{{REPORT_DATE}}', time.strftime('%Y-%m-%d %H:%M:%S'))
+        html = html.replace('{{ROOT_COUNT}}', str(len(entries)))
+        html = html.replace('{{ROWS}}', '\n'.join(rows))
+        html = html.replace('{{TOTAL_LABEL}}', '合计（每个根目录的第一个配置方案）' if multiple_profiles else '合计')
+        html = html.replace('{{TOTALS}}', ''.join(f'<td>{total}</td>' for total in totals))
+        with open_text_output(output_path) as f:
+            f.write(html)
+
+        print(f"汇总索引已生成: {output_path}")
+
+
+def _escape(text: str) -> str:
+    """转义HTML特殊字符"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+_INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>C#代码风格检查汇总</title>
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333; background-color: #f5f5f5; }
+        .container { max-width: 1200px; margin: 0 auto; padding: 20px; }
+        header { background-color: #2c3e50; color: white; padding: 20px; border-radius: 5px; margin-bottom: 20px; }
+        h1 { margin-bottom: 15px; }
+        table { width: 100%; border-collapse: collapse; background-color: white; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+        th, td { padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background-color: #f2f2f2; }
+        td.path { color: #7f8c8d; font-size: 0.9em; word-break: break-all; }
+        tr.total-row td { font-weight: bold; background-color: #f2f2f2; }
+        .error-row { background-color: #fadbd8; }
+        .warning-row { background-color: #fef9e7; }
+        .info-row { background-color: #eaf2f8; }
+        .clean-row { background-color: #eafaf1; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>C#代码风格检查汇总</h1>
+            <p>生成时间: {{REPORT_DATE}}，共 {{ROOT_COUNT}} 个根目录</p>
+        </header>
+        <table>
+            <tr><th>根目录</th><th>路径</th><th>文件数</th><th>问题数</th><th>错误</th><th>警告</th><th>提示</th></tr>
+{{ROWS}}
+            <tr class="total-row"><td>{{TOTAL_LABEL}}</td><td></td>{{TOTALS}}</tr>
+        </table>
+    </div>
+</body>
+</html>
+"""
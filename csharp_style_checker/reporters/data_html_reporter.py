@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+
+"""数据驱动的HTML报告生成器：问题和文件信息以紧凑的JSON内嵌，由页面内的脚本按需渲染"""
+
+import hashlib
+import json
+import time
+from typing import Dict, Set
+
+from csharp_style_checker.models.check_result import CheckResult
+from csharp_style_checker.utils.file_utils import open_text_output
+from csharp_style_checker.utils.sampling import iter_estimate_rows
+
+
+SEVERITIES = ['error', 'warning', 'info']
+
+
+# 嵌入 <script> 的JSON中需要转义的字符：只转义 '</' 不够，'<!--<script>' 会让HTML解析器进入
+# 双重转义状态，之后的 </script> 不再结束元素。这些字符在JSON中只会出现在字符串里，\uXXXX 解析结果不变
+_SCRIPT_ESCAPES = str.maketrans({'<': '\\u003c', '>': '\\u003e', '&': '\\u0026'})
+
+
+def _json(value) -> str:
+    """紧凑的JSON，转义 '<'、'>'、'&' 以便安全地嵌入 <script> 元素"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).translate(_SCRIPT_ESCAPES)
+
+
+class _StringTable:
+    """字符串表：重复的规则ID、消息只保存一次，问题记录中只保存编号"""
+
+    def __init__(self):
+        self.strings = []
+        self._index = {}  # type: Dict[str, int]
+
+    def add(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+class DataHtmlReporter:
+    """数据驱动的HTML报告生成器
+
+    不预先生成每一行问题和每一行代码预览的HTML元素，而是把数据以JSON内嵌在页面中：
+    - 文件和问题记录写在一个JSON数组里，问题记录为 [行, 列, 规则编号, 严重级别编号, 消息编号]；
+    - 每个文件的源码单独放在一个 <script type="application/json"> 元素里，打开预览时才解析，
+      内容相同的文件按内容哈希共用同一个元素；
+    - 页面脚本只渲染可见范围内的行，支持按规则、严重级别和路径过滤。
+    """
+
+    def generate_report(self, result: CheckResult, output_path: str):
+        """生成HTML报告，output_path 以 .gz 结尾时写入gzip压缩的报告"""
+        with open_text_output(output_path) as f:
+            self.write_report(result, f)
+
+        print(f"HTML报告已生成: {output_path}")
+
+    def write_report(self, result: CheckResult, f):
+        """把报告写入文本流"""
+        report_date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(result.checked_at))
+        meta = {
+            'date': report_date,
+            'totalFiles': result.total_files,
+            'totalIssues': result.total_issues,
+            'errors': result.error_count,
+            'warnings': result.warning_count,
+            'infos': result.info_count,
+            'skipped': result.skipped_count,
+            'notes': result.notes,
+            'byAssembly': sorted(([name, summary['files'], summary['issues'], summary['error'], summary['warning'],
+                                   summary['info']] for name, summary in result.by_assembly.items()),
+                                 key=lambda row: (-row[2], row[0])),
+            'estimate': None if result.estimate is None else {
+                'description': result.estimate.description(),
+                'rows': [[name, value.observed, round(value.total), round(value.low), round(value.high)]
+                         for name, value in iter_estimate_rows(result.estimate)],
+            },
+            'byRule': sorted(([rule_id, result.rule_categories.get(rule_id, 'other'), count]
+                              for rule_id, count in result.by_rule.items()), key=lambda row: (-row[2], row[0])),
+        }
+
+        head, tail = _HTML_TEMPLATE.split('{{REPORT_DATA}}')
+        f.write(head)
+        f.write(f'<script type="application/json" id="report-meta">{_json(meta)}</script>\n')
+
+        # 文件和问题记录：逐个文件写出，不在内存中拼接整个数组
+        rules = _StringTable()
+        messages = _StringTable()
+        f.write('<script type="application/json" id="report-files">[')
+        for index, code_file in enumerate(result.iter_code_files()):
+            records = []
+            for issue in sorted(code_file.issues, key=lambda i: (i.line, i.column)):
+                records.extend((issue.line, issue.column, rules.add(issue.rule_id),
+                                SEVERITIES.index(issue.severity), messages.add(issue.message)))
+            # 与原报告一致，只为有问题的文件提供代码预览
+            source_id = self._content_hash(code_file.file_content) if code_file.file_content and code_file.issues else ''
+            record = [code_file.file_path, code_file.file_name, len(code_file.issues), code_file.error_count(),
+                      code_file.warning_count(), code_file.info_count(), source_id, records]
+            f.write((',' if index else '') + _json(record))
+        f.write(']</script>\n')
+
+        strings = {'rules': rules.strings, 'severities': SEVERITIES, 'messages': messages.strings}
+        f.write(f'<script type="application/json" id="report-strings">{_json(strings)}</script>\n')
+
+        # 源码：每种内容一个元素，页面只在打开预览时解析对应的元素
+        written = set()  # type: Set[str]
+        for code_file in result.iter_code_files(with_issues_only=True):
+            if not code_file.file_content:
+                continue
+            content_hash = self._content_hash(code_file.file_content)
+            if content_hash not in written:
+                written.add(content_hash)
+                f.write(f'<script type="application/json" id="src-{content_hash}">{_json(code_file.file_content)}'
+                        f'</script>\n')
+
+        f.write(tail)
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        """源码的内容哈希，用作源码元素的编号"""
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>C#代码风格检查报告</title>
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333;
+               background-color: #f5f5f5; }
+        .container { max-width: 1200px; margin: 0 auto; padding: 20px; }
+        header { background-color: #2c3e50; color: white; padding: 20px; border-radius: 5px; margin-bottom: 20px; }
+        h1, h2, h3 { margin-bottom: 15px; }
+        .report-info { display: flex; justify-content: space-between; margin-top: 10px; }
+        .report-note { margin-top: 10px; color: #f9e79f; }
+        .summary-cards { display: flex; justify-content: space-between; margin-bottom: 20px; }
+        .card { background-color: white; border-radius: 5px; padding: 15px; width: 23%;
+                box-shadow: 0 2px 5px rgba(0,0,0,0.1); text-align: center; }
+        .card-title { font-size: 1.1em; margin-bottom: 10px; }
+        .card-value { font-size: 2em; font-weight: bold; }
+        .card-total { border-top: 4px solid #3498db; }
+        .card-error { border-top: 4px solid #e74c3c; }
+        .card-warning { border-top: 4px solid #f39c12; }
+        .card-info { border-top: 4px solid #2ecc71; }
+        section { margin-bottom: 30px; }
+        .filters { display: flex; gap: 10px; margin-bottom: 10px; }
+        .filters select, .filters input { padding: 4px 8px; }
+        .grid-header, .row { display: grid; align-items: center; padding: 0 10px; white-space: nowrap; }
+        .grid-header { background-color: #f8f9fa; font-weight: 600; height: 36px;
+                       border-bottom: 1px solid #ddd; }
+        .row { height: 28px; border-bottom: 1px solid #eee; cursor: pointer; overflow: hidden; }
+        .row > span, .grid-header > span { overflow: hidden; text-overflow: ellipsis; padding-right: 8px; }
+        .row:hover { background-color: #eef5fb; }
+        .issues-grid { grid-template-columns: 3fr 60px 50px 80px 80px 5fr; }
+        .files-grid { grid-template-columns: 5fr 80px 80px 80px 80px; }
+        .rules-grid { grid-template-columns: 2fr 2fr 1fr; }
+        .assembly-grid { grid-template-columns: 3fr 1fr 1fr 1fr 1fr 1fr; }
+        .estimate-grid { grid-template-columns: 3fr 1fr 1fr 2fr; }
+        .viewport { position: relative; overflow-y: auto; background-color: white;
+                    box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+        .viewport .rows { position: absolute; left: 0; right: 0; top: 0; }
+        .error-row { background-color: rgba(231, 76, 60, 0.1); }
+        .warning-row { background-color: rgba(243, 156, 18, 0.1); }
+        .info-row { background-color: rgba(46, 204, 113, 0.1); }
+        #preview { display: none; position: fixed; top: 5%; left: 5%; right: 5%; bottom: 5%; background: white;
+                   box-shadow: 0 4px 20px rgba(0,0,0,0.3); border-radius: 5px; padding: 15px; flex-direction: column; }
+        #preview.open { display: flex; }
+        #preview-title { display: flex; justify-content: space-between; margin-bottom: 10px; }
+        #preview-lines { flex: 1; background-color: #f8f9fa; }
+        .code-line { height: 20px; font-family: Consolas, Monaco, 'Andale Mono', monospace; font-size: 14px;
+                     line-height: 20px; white-space: pre; }
+        .line-number { display: inline-block; width: 60px; color: #999; text-align: right; padding-right: 10px;
+                       margin-right: 10px; border-right: 1px solid #ddd; user-select: none; }
+        .line-error { background-color: rgba(231, 76, 60, 0.2); }
+        .line-warning { background-color: rgba(243, 156, 18, 0.2); }
+        .line-info { background-color: rgba(46, 204, 113, 0.2); }
+        .line-current { outline: 2px solid #3498db; }
+        footer { text-align: center; margin-top: 50px; padding: 20px; color: #777; border-top: 1px solid #ddd; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>C# 代码风格检查报告</h1>
+            <div class="report-info">
+                <p>生成时间: <span id="report-date"></span></p>
+                <p>检查文件: <span id="total-files"></span> 个</p>
+                <p>跳过生成代码: <span id="skipped-files"></span> 个</p>
+            </div>
+            <div id="report-notes"></div>
+        </header>
+
+        <section>
+            <h2>问题摘要</h2>
+            <div class="summary-cards">
+                <div class="card card-total"><div class="card-title">总问题数</div><div class="card-value" id="total-issues"></div></div>
+                <div class="card card-error"><div class="card-title">错误</div><div class="card-value" id="error-count"></div></div>
+                <div class="card card-warning"><div class="card-title">警告</div><div class="card-value" id="warning-count"></div></div>
+                <div class="card card-info"><div class="card-title">提示</div><div class="card-value" id="info-count"></div></div>
+            </div>
+
+            <h2>规则统计</h2>
+            <div class="grid-header rules-grid"><span>规则</span><span>类别</span><span>问题数</span></div>
+            <div id="rules-table"></div>
+
+            <div id="assembly-section" style="display: none">
+                <h2>程序集统计</h2>
+                <div class="grid-header assembly-grid"><span>程序集</span><span>文件数</span><span>问题数</span><span>错误</span><span>警告</span><span>提示</span></div>
+                <div id="assembly-table"></div>
+            </div>
+
+            <div id="estimate-section" style="display: none">
+                <h2>抽样估计</h2>
+                <p id="estimate-description"></p>
+                <div class="grid-header estimate-grid"><span>项目</span><span>样本中</span><span>估计总数</span><span>置信区间</span></div>
+                <div id="estimate-table"></div>
+            </div>
+        </section>
+
+        <section>
+            <h2>文件摘要</h2>
+            <div class="grid-header files-grid"><span>文件</span><span>问题数</span><span>错误</span><span>警告</span><span>提示</span></div>
+            <div class="viewport" id="files-view" style="height: 300px"></div>
+        </section>
+
+        <section>
+            <h2>问题详情 (<span id="issue-match-count"></span>)</h2>
+            <div class="filters">
+                <select id="rule-filter"><option value="">全部规则</option></select>
+                <select id="severity-filter"><option value="">全部严重级别</option></select>
+                <input id="path-filter" type="search" placeholder="按文件路径过滤">
+            </div>
+            <div class="grid-header issues-grid"><span>文件</span><span>行</span><span>列</span><span>规则</span><span>严重性</span><span>消息</span></div>
+            <div class="viewport" id="issues-view" style="height: 500px"></div>
+        </section>
+
+        <footer>
+            <p>C# 代码风格检查工具 &copy; 2025</p>
+        </footer>
+    </div>
+
+    <div id="preview">
+        <div id="preview-title"><h3 id="preview-path"></h3><button id="preview-close">关闭</button></div>
+        <div class="viewport" id="preview-lines"></div>
+    </div>
+
+{{REPORT_DATA}}
+<script>
+(function () {
+    'use strict';
+    var byId = function (id) { return document.getElementById(id); };
+    var meta = JSON.parse(byId('report-meta').textContent);
+    var files = JSON.parse(byId('report-files').textContent);
+    var strings = JSON.parse(byId('report-strings').textContent);
+    var SEVERITY_RANK = { error: 0, warning: 1, info: 2 };
+    // 与Python的 str.splitlines() 使用相同的换行符，预览中的行号与规则报告的行号一致
+    var LINE_BREAK = /\\r\\n|[\\n\\r\\x0b\\x0c\\x1c-\\x1e\\x85\\u2028\\u2029]/;
+
+    function escapeHtml(text) {
+        return String(text).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+    }
+
+    // 只渲染可见范围内的行
+    function VirtualList(container, rowHeight, renderRow) {
+        this.container = container;
+        this.rowHeight = rowHeight;
+        this.renderRow = renderRow;
+        this.count = 0;
+        this.spacer = document.createElement('div');
+        this.rows = document.createElement('div');
+        this.rows.className = 'rows';
+        container.appendChild(this.spacer);
+        container.appendChild(this.rows);
+        var self = this;
+        var pending = false;
+        container.addEventListener('scroll', function () {
+            if (!pending) {
+                pending = true;
+                window.requestAnimationFrame(function () { pending = false; self.update(); });
+            }
+        });
+    }
+    VirtualList.prototype.setCount = function (count) {
+        this.count = count;
+        this.spacer.style.height = (count * this.rowHeight) + 'px';
+        this.update();
+    };
+    VirtualList.prototype.scrollTo = function (index) {
+        this.container.scrollTop = Math.max(0, index * this.rowHeight - this.container.clientHeight / 2);
+        this.update();
+    };
+    VirtualList.prototype.update = function () {
+        var top = this.container.scrollTop;
+        var height = this.container.clientHeight || 500;
+        var first = Math.max(0, Math.floor(top / this.rowHeight) - 10);
+        var last = Math.min(this.count, Math.ceil((top + height) / this.rowHeight) + 10);
+        var html = [];
+        for (var i = first; i < last; i++) {
+            html.push(this.renderRow(i));
+        }
+        this.rows.style.transform = 'translateY(' + (first * this.rowHeight) + 'px)';
+        this.rows.innerHTML = html.join('');
+    };
+
+    // 概览
+    byId('report-date').textContent = meta.date;
+    byId('total-files').textContent = meta.totalFiles;
+    byId('skipped-files').textContent = meta.skipped;
+    byId('total-issues').textContent = meta.totalIssues;
+    byId('error-count').textContent = meta.errors;
+    byId('warning-count').textContent = meta.warnings;
+    byId('info-count').textContent = meta.infos;
+    byId('report-notes').innerHTML = meta.notes.map(function (note) {
+        return '<p class="report-note">' + escapeHtml(note) + '</p>';
+    }).join('');
+    byId('rules-table').innerHTML = meta.byRule.map(function (row) {
+        return '<div class="row rules-grid"><span>' + escapeHtml(row[0]) + '</span><span>' + escapeHtml(row[1]) +
+            '</span><span>' + row[2] + '</span></div>';
+    }).join('');
+
+    if (meta.byAssembly.length) {
+        byId('assembly-section').style.display = '';
+        byId('assembly-table').innerHTML = meta.byAssembly.map(function (row) {
+            return '<div class="row assembly-grid"><span>' + escapeHtml(row[0]) + '</span><span>' +
+                row.slice(1).join('</span><span>') + '</span></div>';
+        }).join('');
+    }
+
+    if (meta.estimate) {
+        byId('estimate-section').style.display = '';
+        byId('estimate-description').textContent = meta.estimate.description;
+        byId('estimate-table').innerHTML = meta.estimate.rows.map(function (row) {
+            return '<div class="row estimate-grid"><span>' + escapeHtml(row[0]) + '</span><span>' + row[1] +
+                '</span><span>' + row[2] + '</span><span>' + row[3] + ' - ' + row[4] + '</span></div>';
+        }).join('');
+    }
+
+    // 文件摘要：按问题数从多到少
+    var fileOrder = files.map(function (file, index) { return index; });
+    fileOrder.sort(function (a, b) { return files[b][2] - files[a][2] || a - b; });
+    var filesView = new VirtualList(byId('files-view'), 28, function (i) {
+        var index = fileOrder[i];
+        var file = files[index];
+        var rowClass = file[3] ? 'error-row' : file[4] ? 'warning-row' : file[5] ? 'info-row' : '';
+        return '<div class="row files-grid ' + rowClass + '" data-file="' + index + '"><span title="' +
+            escapeHtml(file[0]) + '">' + escapeHtml(file[1]) + '</span><span>' + file[2] + '</span><span>' +
+            file[3] + '</span><span>' + file[4] + '</span><span>' + file[5] + '</span></div>';
+    });
+    filesView.setCount(fileOrder.length);
+
+    // 所有问题展开为 (文件编号, 记录偏移) 两个定长数组
+    var total = 0;
+    files.forEach(function (file) { total += file[7].length / 5; });
+    var issueFile = new Uint32Array(total);
+    var issueOffset = new Uint32Array(total);
+    var k = 0;
+    files.forEach(function (file, index) {
+        for (var j = 0; j < file[7].length; j += 5) {
+            issueFile[k] = index;
+            issueOffset[k] = j;
+            k++;
+        }
+    });
+
+    var ruleFilter = byId('rule-filter');
+    var severityFilter = byId('severity-filter');
+    var pathFilter = byId('path-filter');
+    strings.rules.forEach(function (rule, index) {
+        ruleFilter.insertAdjacentHTML('beforeend', '<option value="' + index + '">' + escapeHtml(rule) + '</option>');
+    });
+    strings.severities.forEach(function (severity, index) {
+        severityFilter.insertAdjacentHTML('beforeend', '<option value="' + index + '">' + severity + '</option>');
+    });
+
+    var visible = null;
+    var issuesView = new VirtualList(byId('issues-view'), 28, function (i) {
+        var n = visible ? visible[i] : i;
+        var file = files[issueFile[n]];
+        var records = file[7];
+        var o = issueOffset[n];
+        var severity = strings.severities[records[o + 3]];
+        return '<div class="row issues-grid ' + severity + '-row" data-file="' + issueFile[n] + '" data-line="' +
+            records[o] + '"><span title="' + escapeHtml(file[0]) + '">' + escapeHtml(file[1]) + '</span><span>' +
+            records[o] + '</span><span>' + records[o + 1] + '</span><span>' + escapeHtml(strings.rules[records[o + 2]]) +
+            '</span><span>' + severity + '</span><span>' + escapeHtml(strings.messages[records[o + 4]]) + '</span></div>';
+    });
+
+    function applyFilter() {
+        var rule = ruleFilter.value === '' ? -1 : Number(ruleFilter.value);
+        var severity = severityFilter.value === '' ? -1 : Number(severityFilter.value);
+        var path = pathFilter.value.toLowerCase();
+        if (rule < 0 && severity < 0 && !path) {
+            visible = null;
+        } else {
+            var matches = [];
+            for (var n = 0; n < total; n++) {
+                var file = files[issueFile[n]];
+                var o = issueOffset[n];
+                if ((rule < 0 || file[7][o + 2] === rule) && (severity < 0 || file[7][o + 3] === severity) &&
+                        (!path || file[0].toLowerCase().indexOf(path) >= 0)) {
+                    matches.push(n);
+                }
+            }
+            visible = Uint32Array.from(matches);
+        }
+        var count = visible ? visible.length : total;
+        byId('issue-match-count').textContent = count;
+        issuesView.container.scrollTop = 0;
+        issuesView.setCount(count);
+    }
+    ruleFilter.addEventListener('change', applyFilter);
+    severityFilter.addEventListener('change', applyFilter);
+    pathFilter.addEventListener('input', applyFilter);
+    applyFilter();
+
+    // 代码预览：打开时才解析对应文件的源码
+    var sourceCache = {};
+    var preview = byId('preview');
+    var previewLines = null;
+    var previewSeverity = null;
+    var previewCurrent = 0;
+    var linesView = new VirtualList(byId('preview-lines'), 20, function (i) {
+        var lineNumber = i + 1;
+        var severity = previewSeverity[lineNumber];
+        var classes = 'code-line' + (severity !== undefined ? ' line-' + strings.severities[severity] : '') +
+            (lineNumber === previewCurrent ? ' line-current' : '');
+        return '<div class="' + classes + '"><span class="line-number">' + lineNumber + '</span>' +
+            escapeHtml(previewLines[i]) + '</div>';
+    });
+
+    function openPreview(fileIndex, line) {
+        var file = files[fileIndex];
+        if (!file[6]) {
+            return;
+        }
+        if (!sourceCache[file[6]]) {
+            sourceCache[file[6]] = JSON.parse(byId('src-' + file[6]).textContent).split(LINE_BREAK);
+        }
+        previewLines = sourceCache[file[6]];
+        previewSeverity = {};
+        var records = file[7];
+        for (var j = 0; j < records.length; j += 5) {
+            var current = previewSeverity[records[j]];
+            if (current === undefined || records[j + 3] < current) {
+                previewSeverity[records[j]] = records[j + 3];
+            }
+        }
+        previewCurrent = line || (records.length ? records[0] : 0);
+        byId('preview-path').textContent = file[0];
+        preview.className = 'open';
+        linesView.setCount(previewLines.length);
+        linesView.scrollTo(Math.max(previewCurrent - 1, 0));
+    }
+
+    function onRowClick(event) {
+        var row = event.target.closest('.row');
+        if (row && row.hasAttribute('data-file')) {
+            openPreview(Number(row.getAttribute('data-file')), Number(row.getAttribute('data-line') || 0));
+        }
+    }
+    byId('issues-view').addEventListener('click', onRowClick);
+    byId('files-view').addEventListener('click', onRowClick);
+    byId('preview-close').addEventListener('click', function () { preview.className = ''; });
+    document.addEventListener('keydown', function (event) {
+        if (event.key === 'Escape') {
+            preview.className = '';
+        }
+    });
+})();
+</script>
+</body>
+</html>
+"""
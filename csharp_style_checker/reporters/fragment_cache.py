@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""HTML报告片段缓存：未变化文件的报告片段直接复用，不再重新渲染"""
+
+import os
+import re
+import shutil
+from typing import Optional, Set
+
+
+# 缓存子目录名：渲染方式指纹的前16位
+_FINGERPRINT_DIR = re.compile(r'^[0-9a-f]{16}$')
+
+
+class FragmentCache:
+    """以内容哈希为键、每个片段一个文件的报告片段缓存
+
+    fingerprint 描述报告的渲染方式（报告生成器的实现），变化时换用新的子目录，旧片段全部失效。
+    片段逐个读写，缓存大小不占用内存。
+    """
+
+    def __init__(self, cache_dir: str, fingerprint: str):
+        """初始化缓存目录"""
+        self.cache_dir = cache_dir
+        self.fingerprint = fingerprint
+        self.directory = os.path.join(cache_dir, fingerprint[:16])
+        os.makedirs(self.directory, exist_ok=True)
+        # 本次运行用到的片段，清理时保留
+        self._used = set()  # type: Set[str]
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.html')
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存的片段，未命中时返回None"""
+        self._used.add(key)
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                fragment = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return fragment
+
+    def put(self, key: str, fragment: str):
+        """保存一个片段"""
+        self._used.add(key)
+        path = self._path(key)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(fragment)
+        os.replace(temp_path, path)
+
+    def prune(self):
+        """删除本次运行没有用到的片段和其他渲染方式的旧缓存"""
+        for entry in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, entry)
+            if path != self.directory and _FINGERPRINT_DIR.match(entry) and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+        for entry in os.listdir(self.directory):
+            key, ext = os.path.splitext(entry)
+            if ext != '.html' or key not in self._used:
+                try:
+                    os.remove(os.path.join(self.directory, entry))
+                except OSError:
+                    pass
@@ -2,16 +2,39 @@
 
 """HTML报告生成器"""
 
+import hashlib
 import time
 import os
+from typing import Dict, Optional
 from csharp_style_checker.models.check_result import CheckResult
+from csharp_style_checker.reporters.fragment_cache import FragmentCache
+from csharp_style_checker.utils.file_utils import open_text_output
+from csharp_style_checker.utils.sampling import iter_estimate_rows
 
 
 class HtmlReporter:
     """HTML报告生成器"""
 
+    def __init__(self, fragment_cache: Optional[FragmentCache] = None):
+        """初始化报告生成器
+
+        fragment_cache: 报告片段缓存，重新生成报告时只渲染变化的文件
+        """
+        self.fragment_cache = fragment_cache
+
+    @staticmethod
+    def fragment_fingerprint() -> str:
+        """报告渲染方式的指纹：报告生成器的实现变化时片段缓存失效"""
+        with open(__file__, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
     def generate_report(self, result: CheckResult, output_path: str):
-        """生成HTML报告"""
+        """生成HTML报告
+
+        报告边生成边写入文件，文件和问题从检查结果中逐个读取，
+        结果保存在磁盘（SqliteCheckResult）时内存占用不随问题数量增长。
+        output_path 以 .gz 结尾时写入gzip压缩的报告。
+        """
         html = self._get_html_template()
 
         # 基本信息
@@ -22,14 +45,61 @@ class HtmlReporter:
         html = html.replace('{{ERROR_COUNT}}', str(result.error_count))
         html = html.replace('{{WARNING_COUNT}}', str(result.warning_count))
         html = html.replace('{{INFO_COUNT}}', str(result.info_count))
+        html = html.replace('{{SKIPPED_FILES}}', str(result.skipped_count))
+        html = html.replace('{{NOTES}}', '\n'.join(
+            f'<p class="report-note">{self._html_escape(note)}</p>' for note in result.notes))
+
+        # 按规则统计，直接读取检查结果中增量维护的汇总
+        rule_summary = []
+        for rule_id, count in sorted(result.by_rule.items(), key=lambda item: (-item[1], item[0])):
+            category = result.rule_categories.get(rule_id, "other")
+            rule_summary.append(f'<tr><td>{rule_id}</td><td>{category}</td><td>{count}</td></tr>')
+        html = html.replace('{{RULE_SUMMARY}}', '\n'.join(rule_summary))
+
+        # 按程序集统计，只有按项目文件选择文件时才有
+        assembly_summary = []
+        if result.by_assembly:
+            assembly_summary.append('<h2>程序集统计</h2>')
+            assembly_summary.append('<table class="summary-table">')
+            assembly_summary.append('    <tr><th>程序集</th><th>文件数</th><th>问题数</th><th>错误</th><th>警告</th><th>提示</th></tr>')
+            for name, summary in sorted(result.by_assembly.items(), key=lambda item: (-item[1]["issues"], item[0])):
+                assembly_summary.append(
+                    f'    <tr><td>{self._html_escape(name)}</td><td>{summary["files"]}</td><td>{summary["issues"]}</td>'
+                    f'<td>{summary["error"]}</td><td>{summary["warning"]}</td><td>{summary["info"]}</td></tr>')
+            assembly_summary.append('</table>')
+        html = html.replace('{{ASSEMBLY_SUMMARY}}', '\n'.join(assembly_summary))
+
+        # 抽样检查的外推结果
+        estimate_summary = []
+        if result.estimate is not None:
+            estimate_summary.append('<h2>抽样估计</h2>')
+            estimate_summary.append(f'<p>{self._html_escape(result.estimate.description())}</p>')
+            estimate_summary.append('<table class="summary-table">')
+            estimate_summary.append('    <tr><th>项目</th><th>样本中</th><th>估计总数</th><th>置信区间</th></tr>')
+            for name, value in iter_estimate_rows(result.estimate):
+                estimate_summary.append(
+                    f'    <tr><td>{self._html_escape(name)}</td><td>{value.observed}</td><td>{value.total:.0f}</td>'
+                    f'<td>{value.low:.0f} - {value.high:.0f}</td></tr>')
+            estimate_summary.append('</table>')
+        html = html.replace('{{ESTIMATE_SUMMARY}}', '\n'.join(estimate_summary))
+
+        head, rest = html.split('{{FILE_SUMMARY}}')
+        middle, tail = rest.split('{{ISSUE_DETAILS}}')
+
+        with open_text_output(output_path) as f:
+            f.write(head)
+            # 生成文件摘要表格
+            self._write_file_summary(f, result)
+            f.write(middle)
+            # 生成详细问题列表
+            self._write_issue_details(f, result)
+            f.write(tail)
 
-        # 生成文件摘要表格
-        file_summary = []
-        for code_file in sorted(result.code_files, key=lambda f: len(f.issues), reverse=True):
-            error_count = code_file.error_count()
-            warning_count = code_file.warning_count()
-            info_count = code_file.info_count()
+        print(f"HTML报告已生成: {output_path}")
 
+    def _write_file_summary(self, f, result: CheckResult):
+        """写出文件摘要表格的各行"""
+        for file_path, file_name, issue_count, error_count, warning_count, info_count in result.iter_file_summaries():
             if error_count > 0:
                 row_class = "error-row"
             elif warning_count > 0:
@@ -39,83 +109,134 @@ class HtmlReporter:
             else:
                 row_class = "clean-row"
 
-            file_hash = hash(code_file.file_path)
-
-            file_summary.append(f'<tr class="{row_class}">')
-            file_summary.append(f'  <td><a href="#file-{file_hash}">{code_file.file_name}</a></td>')
-            file_summary.append(f'  <td>{len(code_file.issues)}</td>')
-            file_summary.append(f'  <td>{error_count}</td>')
-            file_summary.append(f'  <td>{warning_count}</td>')
-            file_summary.append(f'  <td>{info_count}</td>')
-            file_summary.append('</tr>')
-
-        html = html.replace('{{FILE_SUMMARY}}', '\n'.join(file_summary))
-
-        # 生成详细问题列表
-        issue_details = []
-        for code_file in result.code_files:
-            if not code_file.issues:
-                continue
-
-            file_hash = hash(code_file.file_path)
-
-            issue_details.append(f'<div class="file-section" id="file-{file_hash}">')
-            issue_details.append(f'  <h3>{code_file.file_name}</h3>')
-            issue_details.append(f'  <div class="file-path">{code_file.file_path}</div>')
-
-            # 添加问题表格
-            if code_file.issues:
-                issue_details.append('  <table class="issues-table">')
-                issue_details.append('    <tr><th>行</th><th>列</th><th>规则</th><th>严重性</th><th>消息</th></tr>')
-
-                for issue in sorted(code_file.issues, key=lambda i: (i.line, i.column)):
-                    severity_class = issue.severity.lower()
-                    issue_details.append(f'    <tr class="{severity_class}-row">')
-                    issue_details.append(f'      <td>{issue.line}</td>')
-                    issue_details.append(f'      <td>{issue.column}</td>')
-                    issue_details.append(f'      <td>{issue.rule_id}</td>')
-                    issue_details.append(f'      <td>{issue.severity}</td>')
-                    issue_details.append(f'      <td>{issue.message}</td>')
-                    issue_details.append('    </tr>')
-
-                issue_details.append('  </table>')
+            file_summary = [
+                f'<tr class="{row_class}">',
+                f'  <td><a href="#file-{self._anchor(file_path)}">{file_name}</a></td>',
+                f'  <td>{issue_count}</td>',
+                f'  <td>{error_count}</td>',
+                f'  <td>{warning_count}</td>',
+                f'  <td>{info_count}</td>',
+                '</tr>',
+            ]
+            f.write('\n'.join(file_summary) + '\n')
+
+    def _write_issue_details(self, f, result: CheckResult):
+        """逐个文件写出详细问题列表
+
+        内容和问题行都相同的代码预览（复制的文件、重复的插件目录）只写出一次，之后的文件链接到第一份预览。
+        设置了片段缓存时，问题表格和代码预览按内容哈希复用上次生成的片段，只渲染变化的文件。
+        """
+        # 预览内容哈希 -> 第一次出现该预览的文件路径
+        written_previews = {}  # type: Dict[str, str]
+        for code_file in result.iter_code_files(with_issues_only=True):
+            issues = sorted(code_file.issues, key=lambda i: (i.line, i.column))
+            section_key = self._section_key(code_file.file_path, code_file.file_name, issues)
+            f.write(self._cached_fragment(section_key, lambda: self._render_section(code_file, issues)))
 
             # 添加代码预览
             if code_file.file_content:
-                issue_details.append('  <div class="code-preview">')
-                issue_details.append('    <h4>代码预览</h4>')
-                issue_details.append('    <pre><code class="csharp">')
-
-                # 处理代码，添加行号
-                lines = code_file.file_content.splitlines()
-                for i, line in enumerate(lines):
-                    line_number = i + 1
-                    line_content = self._html_escape(line)
-
-                    # 标记有问题的行
-                    issues_on_line = [i for i in code_file.issues if i.line == line_number]
-                    if issues_on_line:
-                        min_severity = min([i.severity for i in issues_on_line],
-                                          key=lambda s: {"info": 2, "warning": 1, "error": 0}[s])
-                        line_class = f"line-{min_severity}"
-                    else:
-                        line_class = ""
-
-                    issue_details.append(
-                        f'<span class="line-number">{line_number}</span><span class="{line_class}">{line_content}</span>')
-
-                issue_details.append('    </code></pre>')
-                issue_details.append('  </div>')
-
-            issue_details.append('</div>')
-
-        html = html.replace('{{ISSUE_DETAILS}}', '\n'.join(issue_details))
-
-        # 写入文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
-
-        print(f"HTML报告已生成: {output_path}")
+                # 每行最严重的问题级别
+                severity_order = {"info": 2, "warning": 1, "error": 0}
+                line_severities = {}
+                for issue in issues:
+                    current = line_severities.get(issue.line)
+                    if current is None or severity_order[issue.severity] < severity_order[current]:
+                        line_severities[issue.line] = issue.severity
+
+                preview_hash = self._preview_hash(code_file.file_content, line_severities)
+                first_path = written_previews.get(preview_hash)
+                if first_path is not None:
+                    f.write('\n'.join([
+                        '  <div class="code-preview">',
+                        '    <h4>代码预览</h4>',
+                        f'    <p>与 <a href="#preview-{preview_hash}">{first_path}</a> 的预览相同</p>',
+                        '  </div>',
+                    ]) + '\n')
+                else:
+                    written_previews[preview_hash] = code_file.file_path
+                    f.write(self._cached_fragment('p' + preview_hash, lambda: self._render_preview(
+                        code_file.file_content, line_severities, preview_hash)))
+
+            f.write('</div>\n')
+
+    def _cached_fragment(self, key: str, render) -> str:
+        """从片段缓存读取片段，未命中时渲染并写入缓存"""
+        if self.fragment_cache is None:
+            return render()
+        fragment = self.fragment_cache.get(key)
+        if fragment is None:
+            fragment = render()
+            self.fragment_cache.put(key, fragment)
+        return fragment
+
+    def _render_section(self, code_file, issues) -> str:
+        """渲染文件标题和问题表格"""
+        issue_details = []
+        issue_details.append(f'<div class="file-section" id="file-{self._anchor(code_file.file_path)}">')
+        issue_details.append(f'  <h3>{code_file.file_name}</h3>')
+        issue_details.append(f'  <div class="file-path">{code_file.file_path}</div>')
+
+        # 添加问题表格
+        issue_details.append('  <table class="issues-table">')
+        issue_details.append('    <tr><th>行</th><th>列</th><th>规则</th><th>严重性</th><th>消息</th></tr>')
+
+        for issue in issues:
+            severity_class = issue.severity.lower()
+            issue_details.append(f'    <tr class="{severity_class}-row">')
+            issue_details.append(f'      <td>{issue.line}</td>')
+            issue_details.append(f'      <td>{issue.column}</td>')
+            issue_details.append(f'      <td>{issue.rule_id}</td>')
+            issue_details.append(f'      <td>{issue.severity}</td>')
+            issue_details.append(f'      <td>{issue.message}</td>')
+            issue_details.append('    </tr>')
+
+        issue_details.append('  </table>')
+        return '\n'.join(issue_details) + '\n'
+
+    def _render_preview(self, content: str, line_severities: Dict[int, str], preview_hash: str) -> str:
+        """渲染带行号和问题行标记的代码预览"""
+        issue_details = []
+        issue_details.append(f'  <div class="code-preview" id="preview-{preview_hash}">')
+        issue_details.append('    <h4>代码预览</h4>')
+        issue_details.append('    <pre><code class="csharp">')
+
+        # 处理代码，添加行号
+        lines = content.splitlines()
+        for i, line in enumerate(lines):
+            line_number = i + 1
+            line_content = self._html_escape(line)
+
+            # 标记有问题的行
+            min_severity = line_severities.get(line_number)
+            line_class = f"line-{min_severity}" if min_severity else ""
+
+            issue_details.append(
+                f'<span class="line-number">{line_number}</span><span class="{line_class}">{line_content}</span>')
+
+        issue_details.append('    </code></pre>')
+        issue_details.append('  </div>')
+        return '\n'.join(issue_details) + '\n'
+
+    @staticmethod
+    def _anchor(file_path: str) -> str:
+        """文件的锚点：由路径计算，每次运行都相同"""
+        return hashlib.sha1(file_path.encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def _section_key(file_path: str, file_name: str, issues) -> str:
+        """问题表格片段的缓存键：路径和全部问题的指纹"""
+        digest = hashlib.sha1(f'{file_path}\0{file_name}'.encode('utf-8'))
+        for issue in issues:
+            digest.update(f'\0{issue.line}\0{issue.column}\0{issue.rule_id}\0{issue.severity}\0{issue.message}'
+                          .encode('utf-8'))
+        return 's' + digest.hexdigest()
+
+    @staticmethod
+    def _preview_hash(content: str, line_severities: Dict[int, str]) -> str:
+        """代码预览的内容哈希：源码相同且问题行的标记相同时预览完全一致"""
+        digest = hashlib.sha1(content.encode('utf-8'))
+        digest.update(repr(sorted(line_severities.items())).encode('utf-8'))
+        return digest.hexdigest()[:16]
 
     def _html_escape(self, text):
         """转义HTML特殊字符"""
@@ -169,6 +290,11 @@ class HtmlReporter:
             margin-top: 10px;
         }
 
+        .report-note {
+            margin-top: 10px;
+            color: #f9e79f;
+        }
+
         .summary {
             margin-bottom: 30px;
         }
@@ -303,7 +429,9 @@ class HtmlReporter:
             <div class="report-info">
                 <p>生成时间: {{REPORT_DATE}}</p>
                 <p>检查文件: {{TOTAL_FILES}} 个</p>
+                <p>跳过生成代码: {{SKIPPED_FILES}} 个</p>
             </div>
+            {{NOTES}}
         </header>
 
         <section class="summary">
@@ -327,6 +455,20 @@ class HtmlReporter:
                 </div>
             </div>
 
+            <h2>规则统计</h2>
+            <table class="summary-table">
+                <tr>
+                    <th>规则</th>
+                    <th>类别</th>
+                    <th>问题数</th>
+                </tr>
+                {{RULE_SUMMARY}}
+            </table>
+
+            {{ASSEMBLY_SUMMARY}}
+
+            {{ESTIMATE_SUMMARY}}
+
             <h2>文件摘要</h2>
             <table class="summary-table">
                 <tr>
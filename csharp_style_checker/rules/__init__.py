@@ -16,6 +16,7 @@ from csharp_style_checker.rules.naming_rules import (
 )
 from csharp_style_checker.rules.structure_rules import BraceOnNewLineRule
 from csharp_style_checker.rules.readability_rules import LineIsTooLongRule
+from csharp_style_checker.rules.custom_rules import DeclarativeRule, compile_custom_rules
 
 __all__ = [
     'BaseRule',
@@ -30,5 +31,7 @@ __all__ = [
     'InterfaceNamingRule',
     'StaticFieldNamingRule',
     'CollectionPluralNamingRule',
+    'DeclarativeRule',
+    'compile_custom_rules',
 ]
 
@@ -2,13 +2,28 @@
 
 """规则基类定义"""
 
-from typing import List
+from typing import Iterable, List, Tuple
 from csharp_style_checker.models.code_issue import CodeIssue
+from csharp_style_checker.core.source_context import SourceContext
+from csharp_style_checker.core.declaration_extractor import DeclarationTable
+
+
+# 合法的严重级别
+SEVERITIES = ('error', 'warning', 'info')
 
 
 class BaseRule:
     """规则基类"""
 
+    # 规则是否需要按行拆分的代码；为False时analyze收到的lines为None，直接扫描source_code
+    requires_lines = True
+
+    # 规则结果是否只取决于单行文本（见 LineRule）
+    line_local = False
+
+    # 规则适用的前提：文件中至少出现其中一个字面量，否则检查器直接跳过该规则；为空时总是执行
+    required_literals = ()  # type: Tuple[str, ...]
+
     def __init__(self, rule_id, name, description, category, severity):
         self.rule_id = rule_id
         self.name = name
@@ -21,3 +36,59 @@ class BaseRule:
         """分析代码并返回问题列表"""
         return []
 
+    def check(self, context: SourceContext) -> List[CodeIssue]:
+        """基于共享的源码上下文分析代码，只有需要时才生成行列表"""
+        lines = context.lines if self.requires_lines else None
+        return self.analyze(lines, context.source_code, context.file_path)
+
+
+class DeclarationRule(BaseRule):
+    """基于声明表的规则基类，只需过滤每个文件解析一次得到的声明表"""
+
+    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+        """分析代码并返回问题列表"""
+        return self.check(SourceContext(source_code, file_path, lines))
+
+    def check(self, context: SourceContext) -> List[CodeIssue]:
+        """过滤共享的声明表"""
+        return self.analyze_declarations(context.declarations, context.file_path)
+
+    def analyze_declarations(self, declarations: DeclarationTable, file_path: str) -> List[CodeIssue]:
+        """分析声明表并返回问题列表"""
+        return []
+
+
+class LineRule(BaseRule):
+    """逐行检查的规则基类：结果只取决于该行文本，检查器可以按行文本跨文件缓存结果"""
+
+    # 标记规则只依赖单行文本
+    line_local = True
+
+    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+        """分析代码并返回问题列表"""
+        return self._collect(enumerate(lines, 1), file_path)
+
+    def check(self, context: SourceContext) -> List[CodeIssue]:
+        """逐行检查；设置了时间预算时每行之前检查是否超时（见 SourceContext.iter_lines）"""
+        if context.deadline is None:
+            return super().check(context)
+        return self._collect(context.iter_lines(), context.file_path)
+
+    def _collect(self, numbered_lines: Iterable[Tuple[int, str]], file_path: str) -> List[CodeIssue]:
+        """对 (行号, 行) 逐行执行 analyze_line，汇总为问题列表"""
+        issues = []
+        for number, line in numbered_lines:
+            for column, message, severity in self.analyze_line(line):
+                issues.append(CodeIssue(
+                    line=number,
+                    column=column,
+                    message=message,
+                    rule_id=self.rule_id,
+                    severity=severity,
+                    file_path=file_path
+                ))
+        return issues
+
+    def analyze_line(self, line: str) -> List[Tuple[int, str, str]]:
+        """分析单行代码，返回与行号无关的问题 (列号, 消息, 严重级别)"""
+        return []
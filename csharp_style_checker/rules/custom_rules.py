@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""配置中声明的自定义规则：所有规则编译为一个组合匹配器，每行只需扫描一次"""
+
+import re
+import string
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from csharp_style_checker.models.code_issue import CodeIssue
+from csharp_style_checker.core.source_context import AnalysisTimeout, SourceContext
+from csharp_style_checker.rules.base_rule import SEVERITIES, LineRule
+
+
+# 用户模式中的命名分组及其引用，合并时需要加上规则前缀避免重名
+_GROUP_DEFINITION = re.compile(r'\(\?P<(\w+)>')
+_GROUP_REFERENCE = re.compile(r'\(\?P=(\w+)\)')
+# 编号反向引用在合并后编号会变化，要求使用命名分组
+_NUMBERED_BACKREFERENCE = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]')
+
+
+class CustomRuleSpec:
+    """一条声明式规则的编译结果"""
+
+    def __init__(self, rule_id: str, name: str, description: str, pattern: str, message: str, severity: str,
+                 conditions: Dict[str, Tuple[Optional[Any], Optional[Any]]], ignore_case: bool):
+        """初始化规则定义
+
+        conditions: {分组名: (必须匹配的正则, 不能匹配的正则)}
+        """
+        self.rule_id = rule_id
+        self.name = name
+        self.description = description
+        self.pattern = pattern
+        self.message = message
+        self.severity = severity
+        self.conditions = conditions
+        self.ignore_case = ignore_case
+        self.regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+    def find(self, line: str) -> List[Tuple[int, str]]:
+        """在一行中查找该规则的所有匹配，返回 (列号, 消息)"""
+        results = []
+        for match in self.regex.finditer(line):
+            groups = match.groupdict()
+            if not self._conditions_hold(groups):
+                continue
+            values = {key: value if value is not None else '' for key, value in groups.items()}
+            values['match'] = match.group(0)
+            results.append((match.start() + 1, self.message.format_map(values)))
+        return results
+
+    def _conditions_hold(self, groups: Dict[str, Optional[str]]) -> bool:
+        """检查捕获分组的附加条件"""
+        for group, (required, forbidden) in self.conditions.items():
+            value = groups.get(group) or ''
+            if required is not None and not required.search(value):
+                return False
+            if forbidden is not None and forbidden.search(value):
+                return False
+        return True
+
+
+class CombinedMatcher:
+    """把多条声明式规则合并为一个正则
+
+    合并后的正则作为预筛选：它在一行中找不到匹配时，说明任何一条规则都不会匹配，
+    绝大多数行只需这一次扫描；只有命中的行才逐条执行各规则的模式和条件。
+    """
+
+    def __init__(self, specs: List[CustomRuleSpec]):
+        """编译组合匹配器"""
+        self.specs = specs
+        alternatives = []
+        for index, spec in enumerate(specs):
+            prefix = f'_r{index}_'
+            pattern = _GROUP_DEFINITION.sub(lambda m: f'(?P<{prefix}{m.group(1)}>', spec.pattern)
+            pattern = _GROUP_REFERENCE.sub(lambda m: f'(?P={prefix}{m.group(1)})', pattern)
+            alternatives.append(f'(?i:{pattern})' if spec.ignore_case else f'(?:{pattern})')
+        self.regex = re.compile('|'.join(alternatives)) if alternatives else None
+
+        self._last_line = None  # type: Optional[str]
+        self._last_result = None  # type: Optional[List[List[Tuple[int, str]]]]
+        self._last_lines = None  # type: Optional[List[str]]
+        self._last_lines_result = None  # type: Optional[List[Optional[List[List[Tuple[int, str]]]]]]
+        self.lines_scanned = 0
+        self.lines_matched = 0
+
+    def __repr__(self):
+        return f"CombinedMatcher({[spec.pattern for spec in self.specs]!r})"
+
+    def match_line(self, line: str) -> Optional[List[List[Tuple[int, str]]]]:
+        """返回每条规则在该行的匹配结果；同一行连续查询（各规则依次查询）时只计算一次"""
+        if line is not self._last_line:
+            self._last_line = line
+            self._last_result = self._match(line)
+        return self._last_result
+
+    def match_lines(self, lines: List[str],
+                    deadline: Optional[float] = None) -> List[Optional[List[List[Tuple[int, str]]]]]:
+        """返回每一行的匹配结果；同一文件的行列表只计算一次
+
+        deadline: 截止时间（time.perf_counter()），每行之前检查一次，超时抛出 AnalysisTimeout
+        """
+        if lines is not self._last_lines:
+            if deadline is None:
+                results = [self._match(line) for line in lines]
+            else:
+                results = []
+                for line in lines:
+                    if time.perf_counter() > deadline:
+                        raise AnalysisTimeout()
+                    results.append(self._match(line))
+            # 只缓存完整的结果，超时中断的文件不会留下部分结果
+            self._last_lines = lines
+            self._last_lines_result = results
+        return self._last_lines_result
+
+    def _match(self, line: str) -> Optional[List[List[Tuple[int, str]]]]:
+        """对一行执行匹配，任何规则都不匹配时返回None"""
+        self.lines_scanned += 1
+        if self.regex is None or self.regex.search(line) is None:
+            return None
+        self.lines_matched += 1
+        return [spec.find(line) for spec in self.specs]
+
+
+class DeclarativeRule(LineRule):
+    """配置中声明的规则，共用同一个组合匹配器"""
+
+    def __init__(self, matcher: CombinedMatcher, index: int, severity: Optional[str] = None):
+        spec = matcher.specs[index]
+        super().__init__(
+            rule_id=spec.rule_id,
+            name=spec.name,
+            description=spec.description,
+            category="custom",
+            severity=severity or spec.severity
+        )
+        self.matcher = matcher
+        self.index = index
+
+    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+        """分析代码并返回问题列表；各条声明式规则共享同一次按行扫描"""
+        return self._issues(self.matcher.match_lines(lines), file_path)
+
+    def check(self, context: SourceContext) -> List[CodeIssue]:
+        """共享按行扫描；设置了时间预算时扫描每行之前检查是否超时"""
+        return self._issues(self.matcher.match_lines(context.lines, context.deadline), context.file_path)
+
+    def _issues(self, matches: List[Optional[List[List[Tuple[int, str]]]]], file_path: str) -> List[CodeIssue]:
+        """从组合匹配器的逐行结果中取出本规则的问题"""
+        issues = []
+        for i, line_matches in enumerate(matches):
+            if line_matches is None:
+                continue
+            for column, message in line_matches[self.index]:
+                issues.append(CodeIssue(
+                    line=i + 1,
+                    column=column,
+                    message=message,
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
+        return issues
+
+    def analyze_line(self, line: str) -> List[Tuple[int, str, str]]:
+        line_matches = self.matcher.match_line(line)
+        if line_matches is None:
+            return []
+        return [(column, message, self.severity) for column, message in line_matches[self.index]]
+
+    def with_severity(self, severity: str) -> 'DeclarativeRule':
+        """创建使用另一严重级别的同一规则"""
+        return DeclarativeRule(self.matcher, self.index, severity)
+
+
+def compile_custom_rules(config: List[Dict[str, Any]]) -> List[DeclarativeRule]:
+    """编译配置中的自定义规则
+
+    每条规则的配置：
+        {
+          "id": "CUS001",
+          "name": "NoDebugLog",
+          "pattern": "Debug\\\\.Log\\\\((?P<arg>[^)]*)\\\\)",
+          "conditions": {"arg": {"not_matches": "^\\\\s*$"}},
+          "message": "提交前请移除调试日志: {arg}",
+          "severity": "warning",
+          "ignore_case": false
+        }
+
+    message 中可以使用 {分组名} 和 {match}（整个匹配的文本）。
+    """
+    specs = []
+    for entry in config:
+        rule_id = entry.get('id')
+        pattern = entry.get('pattern')
+        if not rule_id or not pattern:
+            raise ValueError(f"自定义规则缺少 id 或 pattern: {entry}")
+        if _NUMBERED_BACKREFERENCE.search(pattern):
+            raise ValueError(f"自定义规则 {rule_id} 的模式不能使用编号反向引用，请改用命名分组 (?P=name)")
+
+        severity = entry.get('severity', 'warning')
+        if severity not in SEVERITIES:
+            raise ValueError(f"自定义规则 {rule_id} 的严重级别无效: {severity}")
+
+        message = entry.get('message', entry.get('description', rule_id))
+        try:
+            conditions = {}
+            for group, condition in entry.get('conditions', {}).items():
+                required = condition.get('matches')
+                forbidden = condition.get('not_matches')
+                conditions[group] = (re.compile(required) if required is not None else None,
+                                     re.compile(forbidden) if forbidden is not None else None)
+
+            spec = CustomRuleSpec(rule_id, entry.get('name', rule_id), entry.get('description', message),
+                                  pattern, message, severity, conditions, bool(entry.get('ignore_case', False)))
+        except re.error as e:
+            raise ValueError(f"自定义规则 {rule_id} 的模式无效: {e}")
+
+        groups = set(spec.regex.groupindex)
+        unknown = [group for group in conditions if group not in groups]
+        fields = [field for _, field, _, _ in string.Formatter().parse(message) if field]
+        unknown += [field for field in fields if field not in groups and field != 'match']
+        if unknown:
+            raise ValueError(f"自定义规则 {rule_id} 引用了不存在的分组: {', '.join(unknown)}")
+        specs.append(spec)
+
+    try:
+        matcher = CombinedMatcher(specs)
+    except re.error as e:
+        raise ValueError(f"自定义规则无法合并: {e}")
+    return [DeclarativeRule(matcher, index) for index in range(len(specs))]
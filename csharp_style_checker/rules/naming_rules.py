@@ -3,12 +3,29 @@
 """命名相关的规则实现"""
 
 import re
-from typing import List
-from csharp_style_checker.rules.base_rule import BaseRule
+from typing import List, Set, Tuple
+from csharp_style_checker.rules.base_rule import BaseRule, DeclarationRule, LineRule
+from csharp_style_checker.core.declaration_extractor import DeclarationTable, TYPE_DECLARATION_KINDS
+from csharp_style_checker.core.source_context import SourceContext
 from csharp_style_checker.models.code_issue import CodeIssue
 
 
-class ClassNamePascalCaseRule(BaseRule):
+def _strip_generic_and_array(type_name: str) -> str:
+    """去除类型中的泛型参数和数组符号，等价于 re.sub(r'<.*>|\\[.*\\]', '', type_name) 的线性实现"""
+    last_close = {'<': type_name.rfind('>'), '[': type_name.rfind(']')}
+    chars = []
+    i = 0
+    while i < len(type_name):
+        end = last_close.get(type_name[i], -1)
+        if end > i:
+            i = end + 1
+            continue
+        chars.append(type_name[i])
+        i += 1
+    return ''.join(chars).strip()
+
+
+class ClassNamePascalCaseRule(DeclarationRule):
     """检查类名是否符合PascalCase命名规范"""
 
     def __init__(self):
@@ -20,34 +37,32 @@ class ClassNamePascalCaseRule(BaseRule):
             severity="warning"
         )
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+    def analyze_declarations(self, declarations: DeclarationTable, file_path: str) -> List[CodeIssue]:
         issues = []
 
         # 查找类定义
-        class_pattern = re.compile(r'(public|private|protected|internal|abstract)?\s+class\s+([a-zA-Z0-9_]+)')
-
-        for i, line in enumerate(lines):
-            match = class_pattern.search(line)
-            if match:
-                class_name = match.group(2)
-
-                # 检查是否符合PascalCase（首字母大写）
-                if class_name and not class_name[0].isupper():
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(2) + 1,
-                        message=f"类名 '{class_name}' 应该使用PascalCase命名法（首字母大写）",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
+        for declaration in declarations.of_kind('class'):
+            class_name = declaration.name
+
+            # 检查是否符合PascalCase（首字母大写）
+            if class_name and not class_name[0].isupper():
+                issues.append(CodeIssue(
+                    line=declaration.line,
+                    column=declaration.column,
+                    message=f"类名 '{class_name}' 应该使用PascalCase命名法（首字母大写）",
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
 
         return issues
 
 
-class InterfaceNamingRule(BaseRule):
+class InterfaceNamingRule(DeclarationRule):
     """检查接口名称是否以I开头并符合PascalCase命名规范"""
 
+    required_literals = ('interface',)
+
     def __init__(self):
         super().__init__(
             rule_id="CS0002",
@@ -57,44 +72,42 @@ class InterfaceNamingRule(BaseRule):
             severity="warning"
         )
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+    def analyze_declarations(self, declarations: DeclarationTable, file_path: str) -> List[CodeIssue]:
         issues = []
 
         # 查找接口定义
-        interface_pattern = re.compile(r'(public|internal)?\s+interface\s+([a-zA-Z0-9_]+)')
-
-        for i, line in enumerate(lines):
-            match = interface_pattern.search(line)
-            if match:
-                interface_name = match.group(2)
-
-                # 检查是否以I开头
-                if not interface_name.startswith('I'):
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(2) + 1,
-                        message=f"接口名 '{interface_name}' 必须以'I'开头",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
-                # 检查首字母后的部分是否符合PascalCase
-                elif len(interface_name) > 1 and not interface_name[1].isupper():
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(2) + 1,
-                        message=f"接口名 '{interface_name}' 必须遵循PascalCase命名法(I后首字母大写)",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
+        for declaration in declarations.of_kind('interface'):
+            interface_name = declaration.name
+
+            # 检查是否以I开头
+            if not interface_name.startswith('I'):
+                issues.append(CodeIssue(
+                    line=declaration.line,
+                    column=declaration.column,
+                    message=f"接口名 '{interface_name}' 必须以'I'开头",
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
+            # 检查首字母后的部分是否符合PascalCase
+            elif len(interface_name) > 1 and not interface_name[1].isupper():
+                issues.append(CodeIssue(
+                    line=declaration.line,
+                    column=declaration.column,
+                    message=f"接口名 '{interface_name}' 必须遵循PascalCase命名法(I后首字母大写)",
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
 
         return issues
 
 
-class StructNamingRule(BaseRule):
+class StructNamingRule(DeclarationRule):
     """检查结构体名称是否以st开头并符合PascalCase命名规范"""
 
+    required_literals = ('struct',)
+
     def __init__(self):
         super().__init__(
             rule_id="CSN003",
@@ -104,37 +117,33 @@ class StructNamingRule(BaseRule):
             severity="warning"
         )
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+    def analyze_declarations(self, declarations: DeclarationTable, file_path: str) -> List[CodeIssue]:
         issues = []
 
         # 查找结构体定义
-        struct_pattern = re.compile(r'(public|internal|private)?\s+struct\s+([a-zA-Z0-9_]+)')
-
-        for i, line in enumerate(lines):
-            match = struct_pattern.search(line)
-            if match:
-                struct_name = match.group(2)
-
-                # 检查是否以st开头
-                if not struct_name.startswith('st'):
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(2) + 1,
-                        message=f"结构体名 '{struct_name}' 必须以'st'开头",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
-                # 检查是否符合PascalCase（st后首字母大写）
-                elif len(struct_name) > 2 and not struct_name[2].isupper():
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(2) + 1,
-                        message=f"结构体名 '{struct_name}' 必须遵循PascalCase命名法(st后首字母大写，如stMyStruct)",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
+        for declaration in declarations.of_kind('struct'):
+            struct_name = declaration.name
+
+            # 检查是否以st开头
+            if not struct_name.startswith('st'):
+                issues.append(CodeIssue(
+                    line=declaration.line,
+                    column=declaration.column,
+                    message=f"结构体名 '{struct_name}' 必须以'st'开头",
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
+            # 检查是否符合PascalCase（st后首字母大写）
+            elif len(struct_name) > 2 and not struct_name[2].isupper():
+                issues.append(CodeIssue(
+                    line=declaration.line,
+                    column=declaration.column,
+                    message=f"结构体名 '{struct_name}' 必须遵循PascalCase命名法(st后首字母大写，如stMyStruct)",
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
 
         return issues
 
@@ -150,42 +159,57 @@ class MethodNamePascalCaseRule(BaseRule):
             category="naming",
             severity="warning"
         )
+        # 方法定义（返回类型前必须有空白，用后向断言定位，保证线性匹配）
+        self.method_pattern = re.compile(r'(?<=\s)[a-zA-Z0-9_<>.\[\]]+\s+([a-zA-Z0-9_]+)\s*\(')
 
     def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+        return self.check(SourceContext(source_code, file_path, lines))
+
+    def check(self, context: SourceContext) -> List[CodeIssue]:
         issues = []
+        method_pattern = self.method_pattern
 
-        # 查找方法定义
-        method_pattern = re.compile(
-            r'(public|private|protected|internal|static|virtual|override|abstract)?\s+[a-zA-Z0-9_<>.\[\]]+\s+([a-zA-Z0-9_]+)\s*\(')
+        # 当前文件声明的类型名只从共享的声明表中收集一次
+        type_names = None
 
-        for i, line in enumerate(lines):
+        for i, line in enumerate(context.lines):
             match = method_pattern.search(line)
             if match:
-                method_name = match.group(2)
+                method_name = match.group(1)
+                if method_name in ["Dispose", "Main"]:
+                    continue
+
+                if type_names is None:
+                    type_names = self._collect_type_names(context.declarations)
 
                 # 跳过构造函数和特殊方法
-                if method_name not in ["Dispose", "Main"] and not self._is_constructor(method_name, source_code):
+                if not self._is_constructor(method_name, type_names, context.symbol_index):
                     # 检查是否符合PascalCase（首字母大写）
                     if method_name and not method_name[0].isupper():
                         issues.append(CodeIssue(
                             line=i + 1,
-                            column=match.start(2) + 1,
+                            column=match.start(1) + 1,
                             message=f"方法名 '{method_name}' 应该使用PascalCase命名法（首字母大写）",
                             rule_id=self.rule_id,
                             severity=self.severity,
-                            file_path=file_path
+                            file_path=context.file_path
                         ))
 
         return issues
 
-    def _is_constructor(self, method_name: str, source_code: str) -> bool:
-        """检查方法是否是构造函数"""
-        # 简单检查：查找类名与方法名相同的情况
-        class_pattern = re.compile(r'class\s+(' + method_name + r')\b')
-        return bool(class_pattern.search(source_code))
+    def _collect_type_names(self, declarations: DeclarationTable) -> Set[str]:
+        """收集文件中声明的所有类型名（包括嵌套类型和结构体）"""
+        return {declaration.name for declaration in declarations.of_kind(*TYPE_DECLARATION_KINDS)}
+
+    def _is_constructor(self, method_name: str, type_names: Set[str], symbol_index=None) -> bool:
+        """检查方法是否是构造函数（或对其他文件中声明的类型的构造调用）"""
+        if method_name in type_names:
+            return True
+        # 项目级索引覆盖partial类和其他文件中声明的类型，查询为O(1)
+        return symbol_index is not None and symbol_index.has_type(method_name)
 
 
-class PrivateFieldUnderscoreRule(BaseRule):
+class PrivateFieldUnderscoreRule(DeclarationRule):
     """检查私有字段是否使用下划线前缀"""
 
     def __init__(self):
@@ -197,34 +221,35 @@ class PrivateFieldUnderscoreRule(BaseRule):
             severity="warning"
         )
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+    def analyze_declarations(self, declarations: DeclarationTable, file_path: str) -> List[CodeIssue]:
         issues = []
 
-        # 查找私有字段定义
-        field_pattern = re.compile(r'private\s+[a-zA-Z0-9_<>.\[\]]+\s+([a-zA-Z0-9_]+)\s*[;=]')
-
-        for i, line in enumerate(lines):
-            match = field_pattern.search(line)
-            if match:
-                field_name = match.group(1)
-
-                # 检查是否以下划线开头
-                if field_name and not field_name.startswith('_'):
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(1) + 1,
-                        message=f"私有字段 '{field_name}' 应该使用下划线前缀",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
+        # 查找私有字段定义（静态字段和常量由各自的规则检查）
+        for declaration in declarations.of_kind('field'):
+            if (not declaration.has_modifier('private') or declaration.has_modifier('static')
+                    or declaration.has_modifier('const')):
+                continue
+            field_name = declaration.name
+
+            # 检查是否以下划线开头
+            if field_name and not field_name.startswith('_'):
+                issues.append(CodeIssue(
+                    line=declaration.line,
+                    column=declaration.column,
+                    message=f"私有字段 '{field_name}' 应该使用下划线前缀",
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
 
         return issues
 
 
-class StaticFieldNamingRule(BaseRule):
+class StaticFieldNamingRule(DeclarationRule):
     """检查静态字段命名是否符合 s_+[类型缩写]+变量名称 格式"""
 
+    required_literals = ('static',)
+
     def __init__(self):
         super().__init__(
             rule_id="CS0010",
@@ -254,68 +279,66 @@ class StaticFieldNamingRule(BaseRule):
             # 可以根据项目需要添加更多类型缩写
         }
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+    def analyze_declarations(self, declarations: DeclarationTable, file_path: str) -> List[CodeIssue]:
         issues = []
 
-        # 查找静态字段定义
-        # 匹配 static [类型] [名称] 的模式
-        static_field_pattern = re.compile(
-            r'(public|private|protected|internal)\s+static\s+([a-zA-Z0-9_<>.\[\]]+)\s+([a-zA-Z0-9_]+)\s*[;=]')
-
-        for i, line in enumerate(lines):
-            match = static_field_pattern.search(line)
-            if match:
-                access = match.group(1)  # 访问修饰符
-                type_name = match.group(2)  # 类型
-                field_name = match.group(3)  # 字段名
+        # 查找静态字段定义（static readonly 视同常量，不要求s_前缀）
+        for declaration in declarations.of_kind('field'):
+            if not declaration.has_modifier('static') or declaration.has_modifier('readonly'):
+                continue
+            type_name = declaration.type_name  # 类型
+            field_name = declaration.name  # 字段名
 
-                # 1. 检查是否以s_开头
-                if not field_name.startswith('s_'):
+            # 1. 对于const静态字段，应该使用全大写蛇形命名法而非s_前缀
+            if declaration.has_modifier('const'):
+                if not re.match(r'^[A-Z0-9_]+$', field_name):
                     issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(3) + 1,
-                        message=f"静态字段 '{field_name}' 应该以's_'开头",
+                        line=declaration.line,
+                        column=declaration.column,
+                        message=f"常量静态字段 '{field_name}' 应该使用全大写加下划线命名法，而非's_'前缀",
                         rule_id=self.rule_id,
                         severity=self.severity,
                         file_path=file_path
                     ))
-                    continue
+                continue
 
-                # 获取类型的基本名称（去除泛型部分和数组符号）
-                base_type = re.sub(r'<.*>|\[.*\]', '', type_name).strip()
+            # 2. 检查是否以s_开头
+            if not field_name.startswith('s_'):
+                issues.append(CodeIssue(
+                    line=declaration.line,
+                    column=declaration.column,
+                    message=f"静态字段 '{field_name}' 应该以's_'开头",
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
+                continue
 
-                # 2. 尝试检查类型缩写
-                # 对于常见类型，检查是否包含适当的类型缩写
-                if base_type in self.type_abbreviations:
-                    expected_prefix = f"s_{self.type_abbreviations[base_type]}"
-                    if not field_name.startswith(expected_prefix):
-                        issues.append(CodeIssue(
-                            line=i + 1,
-                            column=match.start(3) + 1,
-                            message=f"静态字段 '{field_name}' 应使用格式 's_{self.type_abbreviations[base_type]}变量名'，类型 {base_type} 的建议缩写为 '{self.type_abbreviations[base_type]}'",
-                            rule_id=self.rule_id,
-                            severity="info",  # 将这部分设为info级别，较为宽松
-                            file_path=file_path
-                        ))
+            # 获取类型的基本名称（去除泛型部分和数组符号）
+            base_type = _strip_generic_and_array(type_name)
 
-                # 3. 对于const静态字段，应该使用全大写蛇形命名法而非s_前缀
-                if "const" in line:
-                    if not re.match(r'^[A-Z0-9_]+$', field_name):
-                        issues.append(CodeIssue(
-                            line=i + 1,
-                            column=match.start(3) + 1,
-                            message=f"常量静态字段 '{field_name}' 应该使用全大写加下划线命名法，而非's_'前缀",
-                            rule_id=self.rule_id,
-                            severity=self.severity,
-                            file_path=file_path
-                        ))
+            # 3. 尝试检查类型缩写
+            # 对于常见类型，检查是否包含适当的类型缩写
+            if base_type in self.type_abbreviations:
+                expected_prefix = f"s_{self.type_abbreviations[base_type]}"
+                if not field_name.startswith(expected_prefix):
+                    issues.append(CodeIssue(
+                        line=declaration.line,
+                        column=declaration.column,
+                        message=f"静态字段 '{field_name}' 应使用格式 's_{self.type_abbreviations[base_type]}变量名'，类型 {base_type} 的建议缩写为 '{self.type_abbreviations[base_type]}'",
+                        rule_id=self.rule_id,
+                        severity="info",  # 将这部分设为info级别，较为宽松
+                        file_path=file_path
+                    ))
 
         return issues
 
 
-class ConstantNameAllCapsRule(BaseRule):
+class ConstantNameAllCapsRule(DeclarationRule):
     """检查常量命名是否全部大写"""
 
+    required_literals = ('const',)
+
     def __init__(self):
         super().__init__(
             rule_id="CS0007",
@@ -325,32 +348,30 @@ class ConstantNameAllCapsRule(BaseRule):
             severity="warning"
         )
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+    def analyze_declarations(self, declarations: DeclarationTable, file_path: str) -> List[CodeIssue]:
         issues = []
 
         # 查找常量定义 - 包含const关键字的成员
-        constant_pattern = re.compile(r'(public|private|protected|internal)\s+const\s+[a-zA-Z0-9_<>.\[\]]+\s+([a-zA-Z0-9_]+)\s*[=;]')
-
-        for i, line in enumerate(lines):
-            match = constant_pattern.search(line)
-            if match:
-                constant_name = match.group(2)
-
-                # 检查是否全部大写 (允许数字和下划线)
-                if not re.match(r'^[A-Z0-9_]+$', constant_name):
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(2) + 1,
-                        message=f"常量名 '{constant_name}' 应该全部大写并使用下划线分隔单词",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
+        for declaration in declarations.of_kind('field', 'local'):
+            if not declaration.has_modifier('const'):
+                continue
+            constant_name = declaration.name
+
+            # 检查是否全部大写 (允许数字和下划线)
+            if not re.match(r'^[A-Z0-9_]+$', constant_name):
+                issues.append(CodeIssue(
+                    line=declaration.line,
+                    column=declaration.column,
+                    message=f"常量名 '{constant_name}' 应该全部大写并使用下划线分隔单词",
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
 
         return issues
 
 
-class VariableCamelCaseRule(BaseRule):
+class VariableCamelCaseRule(LineRule):
     """检查局部变量是否使用camelCase命名规范"""
 
     def __init__(self):
@@ -362,38 +383,31 @@ class VariableCamelCaseRule(BaseRule):
             severity="warning"
         )
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
-        issues = []
-
         # 查找方法内的变量声明
         # 简化版：查找形如 "TypeName variableName" 的模式
-        variable_pattern = re.compile(r'\b([A-Z][a-zA-Z0-9_<>.\[\]]+)\s+([a-zA-Z][a-zA-Z0-9_]*)\s*[;=]')
+        self.variable_pattern = re.compile(
+            r'(?<![\w.<>\[\]])([A-Z][a-zA-Z0-9_<>.\[\]]+)\s+([a-zA-Z][a-zA-Z0-9_]*)\s*[;=]')
 
-        for i, line in enumerate(lines):
-            # 跳过可能的字段声明
-            if re.search(r'\b(public|private|protected|internal)\b', line):
-                continue
+    def analyze_line(self, line: str) -> List[Tuple[int, str, str]]:
+        issues = []
 
-            # 查找局部变量
-            for match in variable_pattern.finditer(line):
-                type_name = match.group(1)
-                variable_name = match.group(2)
+        # 跳过可能的字段声明
+        if re.search(r'\b(public|private|protected|internal)\b', line):
+            return issues
 
-                # 检查是否符合camelCase（首字母小写）
-                if variable_name and variable_name[0].isupper():
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(2) + 1,
-                        message=f"变量名 '{variable_name}' 应该使用camelCase命名法（首字母小写）",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
+        # 查找局部变量
+        for match in self.variable_pattern.finditer(line):
+            variable_name = match.group(2)
+
+            # 检查是否符合camelCase（首字母小写）
+            if variable_name and variable_name[0].isupper():
+                issues.append((match.start(2) + 1, f"变量名 '{variable_name}' 应该使用camelCase命名法（首字母小写）",
+                               self.severity))
 
         return issues
 
 
-class CollectionPluralNamingRule(BaseRule):
+class CollectionPluralNamingRule(DeclarationRule):
     """检查集合类型的变量名是否使用复数形式"""
 
     def __init__(self):
@@ -419,83 +433,26 @@ class CollectionPluralNamingRule(BaseRule):
             "access", "process", "progress", "success", "bus", "cache"
         ]
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+    def analyze_declarations(self, declarations: DeclarationTable, file_path: str) -> List[CodeIssue]:
         issues = []
 
-        # 1. 字段声明模式 - 查找包含访问修饰符的字段
-        field_pattern = re.compile(
-            r'(public|private|protected|internal|static)\s+([a-zA-Z0-9_<>\[\],\s\.]+)\s+([a-zA-Z0-9_]+)\s*[;=]'
-        )
-
-        # 2. 属性声明模式
-        property_pattern = re.compile(
-            r'(public|private|protected|internal)?\s+([a-zA-Z0-9_<>\[\],\s\.]+)\s+([a-zA-Z0-9_]+)\s*\{'
-        )
-
-        # 3. 局部变量声明模式 - 简化后不使用后向查找
-        local_var_pattern = re.compile(
-            r'\b([a-zA-Z0-9_<>\[\],\s\.]+)\s+([a-zA-Z0-9_]+)\s*[;=]'
-        )
-
-        # 分析每一行
-        for i, line in enumerate(lines):
-            # 检查字段声明
-            for match in field_pattern.finditer(line):
-                type_name = match.group(2).strip()
-                var_name = match.group(3)
-
-                if self._is_collection_type(type_name) and not self._is_plural_name(var_name):
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(3) + 1,
-                        message=f"集合类型字段 '{var_name}' 的命名建议使用复数形式",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
-
-            # 检查属性声明
-            for match in property_pattern.finditer(line):
-                if match.group(2):  # 确保匹配到了类型
-                    type_name = match.group(2).strip()
-                    prop_name = match.group(3)
-
-                    if self._is_collection_type(type_name) and not self._is_plural_name(prop_name):
-                        issues.append(CodeIssue(
-                            line=i + 1,
-                            column=match.start(3) + 1,
-                            message=f"集合类型属性 '{prop_name}' 的命名建议使用复数形式",
-                            rule_id=self.rule_id,
-                            severity=self.severity,
-                            file_path=file_path
-                        ))
-
-            # 检查局部变量声明
-            for match in local_var_pattern.finditer(line):
-                # 跳过类定义、方法定义、接口定义等
-                if "class " in line or "interface " in line or "struct " in line or "enum " in line:
-                    continue
-
-                # 跳过包含访问修饰符的行（这些会被前面的模式捕获）
-                if re.search(r'\b(public|private|protected|internal|static)\b', line):
-                    continue
-
-                type_name = match.group(1).strip()
-                var_name = match.group(2)
+        # 字段、属性和局部变量声明
+        messages = {
+            'field': "集合类型字段 '{}' 的命名建议使用复数形式",
+            'property': "集合类型属性 '{}' 的命名建议使用复数形式",
+            'local': "集合类型变量 '{}' 的命名建议使用复数形式",
+        }
 
-                # 跳过控制结构和关键字
-                if var_name in ["if", "for", "foreach", "while", "switch", "using", "try", "catch"]:
-                    continue
-
-                if self._is_collection_type(type_name) and not self._is_plural_name(var_name):
-                    issues.append(CodeIssue(
-                        line=i + 1,
-                        column=match.start(2) + 1,
-                        message=f"集合类型变量 '{var_name}' 的命名建议使用复数形式",
-                        rule_id=self.rule_id,
-                        severity=self.severity,
-                        file_path=file_path
-                    ))
+        for declaration in declarations.of_kind('field', 'property', 'local'):
+            if self._is_collection_type(declaration.type_name) and not self._is_plural_name(declaration.name):
+                issues.append(CodeIssue(
+                    line=declaration.line,
+                    column=declaration.column,
+                    message=messages[declaration.kind].format(declaration.name),
+                    rule_id=self.rule_id,
+                    severity=self.severity,
+                    file_path=file_path
+                ))
 
         return issues
 
@@ -544,9 +501,3 @@ class CollectionPluralNamingRule(BaseRule):
         return False
 
 
-
-
-
-
-
-
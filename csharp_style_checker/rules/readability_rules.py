@@ -2,14 +2,26 @@
 
 """可读性相关的规则实现"""
 
-from typing import List
+import re
+from typing import List, Optional
 from csharp_style_checker.rules.base_rule import BaseRule
 from csharp_style_checker.models.code_issue import CodeIssue
 
 
+# str.splitlines() 使用的换行符（\r\n 算一个换行），以正则字符类的形式表示
+_OTHER_LINE_BREAKS = r'\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+_LINE_BREAKS = r'\n' + _OTHER_LINE_BREAKS
+_LINE_BREAK = re.compile(r'\r\n|[%s]' % _LINE_BREAKS)
+# 逐个字符查找比字符类正则扫描整个文件更快
+_OTHER_LINE_BREAK_CHARS = '\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+
+
 class LineIsTooLongRule(BaseRule):
     """检查行长度是否过长"""
 
+    # 直接扫描整个源码缓冲区，不需要行列表
+    requires_lines = False
+
     def __init__(self, max_length=100):
         super().__init__(
             rule_id="CSR001",
@@ -19,20 +31,41 @@ class LineIsTooLongRule(BaseRule):
             severity="info"
         )
         self.max_length = max_length
+        # 只匹配超长的行：短行在第一个换行符处就失败，匹配全部在C层完成。
+        # 只有\n换行的源码用 re.MULTILINE 的行首定位；含其他换行符时按 str.splitlines() 的换行符拆分，
+        # 行号与其他规则和报告中的代码预览一致
+        self._long_line_pattern = re.compile(r'^[^\n]{%d,}' % (max_length + 1), re.MULTILINE)
+        self._long_line_any_break_pattern = re.compile(
+            r'(?:^|(?<=[%s]))[^%s]{%d,}' % (_LINE_BREAKS, _LINE_BREAKS, max_length + 1))
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
+    def analyze(self, lines: Optional[List[str]], source_code: str, file_path: str) -> List[CodeIssue]:
         issues = []
 
-        for i, line in enumerate(lines):
-            if len(line) > self.max_length:
-                issues.append(CodeIssue(
-                    line=i + 1,
-                    column=self.max_length + 1,
-                    message=f"行长度过长 ({len(line)} 字符，最大建议为 {self.max_length})",
-                    rule_id=self.rule_id,
-                    severity=self.severity,
-                    file_path=file_path
-                ))
+        # 整个文件都不超长时无需扫描
+        if len(source_code) <= self.max_length:
+            return issues
 
-        return issues
+        # 按换行符偏移量增量计算行号，不为每一行分配字符串
+        if not any(char in source_code for char in _OTHER_LINE_BREAK_CHARS):
+            pattern = self._long_line_pattern
+            count_breaks = lambda start, end: source_code.count('\n', start, end)
+        else:
+            pattern = self._long_line_any_break_pattern
+            count_breaks = lambda start, end: len(_LINE_BREAK.findall(source_code, start, end))
+        line_number = 1
+        counted_to = 0
+        for match in pattern.finditer(source_code):
+            start, end = match.span()
+            line_number += count_breaks(counted_to, start)
+            counted_to = start
+
+            issues.append(CodeIssue(
+                line=line_number,
+                column=self.max_length + 1,
+                message=f"行长度过长 ({end - start} 字符，最大建议为 {self.max_length})",
+                rule_id=self.rule_id,
+                severity=self.severity,
+                file_path=file_path
+            ))
 
+        return issues
@@ -3,12 +3,11 @@
 """结构相关的规则实现"""
 
 import re
-from typing import List
-from csharp_style_checker.rules.base_rule import BaseRule
-from csharp_style_checker.models.code_issue import CodeIssue
+from typing import List, Tuple
+from csharp_style_checker.rules.base_rule import LineRule
 
 
-class BraceOnNewLineRule(BaseRule):
+class BraceOnNewLineRule(LineRule):
     """检查花括号是否在新行"""
 
     def __init__(self):
@@ -20,29 +19,25 @@ class BraceOnNewLineRule(BaseRule):
             severity="warning"
         )
 
-    def analyze(self, lines: List[str], source_code: str, file_path: str) -> List[CodeIssue]:
-        issues = []
-
         # 检查方法、类、命名空间等后面的花括号是否在同一行
         keywords = ["class", "namespace", "if", "for", "foreach", "while", "do", "switch", "try", "catch", "finally",
                     "using"]
+        self.keyword_patterns = [(keyword, re.compile(r'\b' + keyword + r'\b')) for keyword in keywords]
+
+    def analyze_line(self, line: str) -> List[Tuple[int, str, str]]:
+        issues = []
 
-        for i, line in enumerate(lines):
-            line = line.strip()
-
-            for keyword in keywords:
-                # 匹配形如"keyword ... {"的模式
-                if re.search(r'\b' + keyword + r'\b.*{.*$', line):
-                    # 确保这不是多行语句的结束
-                    if not line.startswith("{"):
-                        issues.append(CodeIssue(
-                            line=i + 1,
-                            column=line.find('{') + 1,
-                            message=f"'{keyword}' 的开括号应该放在新行",
-                            rule_id=self.rule_id,
-                            severity=self.severity,
-                            file_path=file_path
-                        ))
+        line = line.strip()
+        if '{' not in line:
+            return issues
 
-        return issues
+        for keyword, keyword_pattern in self.keyword_patterns:
+            # 匹配形如"keyword ... {"的模式：只需第一次出现的关键字之后还有'{'，
+            # 不再使用 r'\bkw\b.*{.*$'，避免每个关键字出现位置都扫描到行尾
+            match = keyword_pattern.search(line)
+            if match and line.find('{', match.end()) != -1:
+                # 确保这不是多行语句的结束
+                if not line.startswith("{"):
+                    issues.append((line.find('{') + 1, f"'{keyword}' 的开括号应该放在新行", self.severity))
 
+        return issues
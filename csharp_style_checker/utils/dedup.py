@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""重复文件检测：硬链接、指向同一文件的符号链接以及内容完全相同的副本"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+
+def file_digest(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件内容的哈希值"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DuplicateIndex:
+    """一批文件的重复关系
+
+    先按 (设备号, inode) 归并硬链接和符号链接，这一步只需要 stat；
+    剩下的文件按大小分组，只有大小相同的文件才读取内容计算哈希。
+    每组保留第一个出现的文件作为代表，其余为它的副本。
+    """
+
+    def __init__(self, file_paths: List[str]):
+        """检测重复文件"""
+        self.unique_paths = []  # type: List[str]
+        # 代表文件 -> 副本路径
+        self.copies = OrderedDict()  # type: Dict[str, List[str]]
+        self.linked_files = 0
+        self.identical_files = 0
+        # 硬链接、符号链接（同一 inode）的字节数：这些副本完全不需要读取
+        self.linked_bytes = 0
+        # 内容相同的副本的字节数：为了计算哈希已经读取过，只是不再分析
+        self.identical_bytes = 0
+        self._detect(file_paths)
+
+    def _detect(self, file_paths: List[str]):
+        by_inode = OrderedDict()  # type: Dict[Tuple[int, int], str]
+        sizes = {}  # type: Dict[str, int]
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                # 无法访问的文件交给检查器报告
+                self.unique_paths.append(file_path)
+                continue
+            key = (stat.st_dev, stat.st_ino)
+            # Windows 上部分文件系统没有 inode，st_ino 为 0，只能比较内容
+            original = by_inode.get(key) if stat.st_ino else None
+            if original is not None:
+                self._add_copy(original, file_path)
+                self.linked_files += 1
+                self.linked_bytes += stat.st_size
+                continue
+            if stat.st_ino:
+                by_inode[key] = file_path
+            sizes[file_path] = stat.st_size
+            self.unique_paths.append(file_path)
+
+        by_size = {}  # type: Dict[int, List[str]]
+        for file_path in self.unique_paths:
+            if file_path in sizes:
+                by_size.setdefault(sizes[file_path], []).append(file_path)
+
+        duplicates = set()
+        for size, candidates in by_size.items():
+            if len(candidates) < 2:
+                continue
+            by_digest = {}  # type: Dict[str, str]
+            for file_path in candidates:
+                try:
+                    digest = file_digest(file_path)
+                except OSError:
+                    continue
+                original = by_digest.setdefault(digest, file_path)
+                if original != file_path:
+                    self._add_copy(original, file_path)
+                    self.identical_files += 1
+                    self.identical_bytes += size
+                    duplicates.add(file_path)
+                    # 该文件的硬链接也改为代表文件的副本
+                    self.copies[original].extend(self.copies.pop(file_path, ()))
+
+        if duplicates:
+            self.unique_paths = [file_path for file_path in self.unique_paths if file_path not in duplicates]
+
+    def _add_copy(self, original: str, file_path: str):
+        self.copies.setdefault(original, []).append(file_path)
+
+    @property
+    def duplicate_files(self) -> int:
+        """副本数量，即少分析的文件数"""
+        return self.linked_files + self.identical_files
+
+    @property
+    def duplicate_bytes(self) -> int:
+        """所有副本的字节数，即少分析的字节数"""
+        return self.linked_bytes + self.identical_bytes
+
+    def summary(self) -> str:
+        """节省情况的说明：链接的副本不读取，内容相同的副本读取一次计算哈希但不分析"""
+        return (f"{self.duplicate_files} 个文件与其他文件相同（硬链接或符号链接 {self.linked_files} 个，"
+                f"内容相同 {self.identical_files} 个），只分析一次；"
+                f"未读取 {self.linked_bytes / 1024 / 1024:.1f} MB，"
+                f"已读取但未重复分析 {self.identical_bytes / 1024 / 1024:.1f} MB")
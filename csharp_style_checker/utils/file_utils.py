@@ -2,8 +2,10 @@
 
 """文件处理工具函数"""
 
+import gzip
+import io
 import os
-from typing import List
+from typing import BinaryIO, Iterator, List, TextIO
 
 
 def find_csharp_files(directory_path: str) -> List[str]:
@@ -26,3 +28,45 @@ def read_file_content(file_path: str) -> str:
         with open(file_path, 'r', encoding='gbk') as f:
             return f.read()
 
+
+def open_text_output(output_path: str, compresslevel: int = 6) -> TextIO:
+    """以UTF-8文本方式打开输出文件，路径以 .gz 结尾时写入gzip流
+
+    gzip头中的时间戳固定为0，内容相同的报告压缩结果也相同，便于CI制品去重和缓存。
+    """
+    if output_path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.GzipFile(output_path, 'wb', compresslevel=compresslevel, mtime=0),
+                                encoding='utf-8')
+    return open(output_path, 'w', encoding='utf-8')
+
+
+def iter_file_list(stream: BinaryIO, null_delimited: bool = False, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """从二进制流中逐个读取文件路径，不预先读取整个列表
+
+    null_delimited: 路径以NUL字符分隔（如 git ls-files -z 的输出），否则按行分隔
+    """
+    separator = b'\0' if null_delimited else b'\n'
+    # read1 只返回当前可用的数据，管道上游每写出一条路径就能立即开始检查
+    read = getattr(stream, 'read1', stream.read)
+    pending = b''
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        *entries, pending = pending.split(separator)
+        for entry in entries:
+            path = _decode_path_entry(entry, null_delimited)
+            if path:
+                yield path
+
+    path = _decode_path_entry(pending, null_delimited)
+    if path:
+        yield path
+
+
+def _decode_path_entry(entry: bytes, null_delimited: bool) -> str:
+    """将一条路径记录解码为字符串"""
+    if not null_delimited:
+        entry = entry.rstrip(b'\r')
+    return os.fsdecode(entry)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""生成代码识别：在完整读取和分析文件之前跳过工具生成的代码"""
+
+import fnmatch
+import os
+from typing import Iterable, Optional
+
+
+# 常见的生成代码文件名模式（不区分大小写）
+DEFAULT_NAME_PATTERNS = (
+    '*.g.cs',
+    '*.g.i.cs',
+    '*.designer.cs',
+    '*.generated.cs',
+    '*.pb.cs',
+    '*.assemblyattributes.cs',
+)
+
+# 文件头中的生成代码标记（不区分大小写）
+DEFAULT_HEADER_MARKERS = (
+    b'<auto-generated',
+    b'<autogenerated',
+    b'generated by the protocol buffer compiler',
+    b'this code was generated by a tool',
+)
+
+
+class GeneratedCodeClassifier:
+    """生成代码分类器，依次检查文件名、文件大小和文件头"""
+
+    def __init__(self, name_patterns: Optional[Iterable[str]] = None,
+                 header_markers: Optional[Iterable[bytes]] = None,
+                 header_size: int = 4096,
+                 max_file_size: Optional[int] = 1024 * 1024):
+        """初始化分类器
+
+        header_size: 嗅探文件头的字节数
+        max_file_size: 文件大小上限（字节），超过时直接跳过；None表示不限制
+        """
+        self.name_patterns = [p.lower() for p in (name_patterns or DEFAULT_NAME_PATTERNS)]
+        self.header_markers = [m.lower() for m in (header_markers or DEFAULT_HEADER_MARKERS)]
+        self.header_size = header_size
+        self.max_file_size = max_file_size
+
+    def classify(self, file_path: str) -> Optional[str]:
+        """判断文件是否应跳过，返回跳过原因；应正常分析时返回None"""
+        reason = self.classify_name(file_path)
+        if reason:
+            return reason
+
+        try:
+            if self.max_file_size is not None and os.path.getsize(file_path) > self.max_file_size:
+                return f"文件大小超过上限 {self.max_file_size} 字节"
+
+            # 只读取文件头，不解码整个文件
+            with open(file_path, 'rb') as f:
+                header = f.read(self.header_size)
+        except OSError:
+            # 读取失败交给后续的检查流程报告
+            return None
+
+        return self.classify_header(header)
+
+    def classify_content(self, file_path: str, data: bytes) -> Optional[str]:
+        """对已读入内存的内容进行同样的判断（例如从git对象库读取的blob）"""
+        reason = self.classify_name(file_path)
+        if reason:
+            return reason
+        if self.max_file_size is not None and len(data) > self.max_file_size:
+            return f"文件大小超过上限 {self.max_file_size} 字节"
+        return self.classify_header(data[:self.header_size])
+
+    def classify_name(self, file_path: str) -> Optional[str]:
+        """按文件名模式判断"""
+        file_name = os.path.basename(file_path).lower()
+        for pattern in self.name_patterns:
+            if fnmatch.fnmatchcase(file_name, pattern):
+                return f"文件名匹配生成代码模式 {pattern}"
+        return None
+
+    def classify_header(self, header: bytes) -> Optional[str]:
+        """按文件头中的生成代码标记判断"""
+        header = header.lower()
+        for marker in self.header_markers:
+            if marker in header:
+                return "文件头包含生成代码标记"
+        return None
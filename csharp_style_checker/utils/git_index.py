@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""直接从git对象库读取暂存区中的文件内容（用于pre-commit检查）"""
+
+import os
+import subprocess
+from typing import Iterable, List, Optional, Tuple
+
+
+class GitError(Exception):
+    """git命令执行失败"""
+
+
+def _run_git(args: List[str], repo_dir: str) -> bytes:
+    """执行一次git命令并返回标准输出"""
+    process = subprocess.run(['git'] + args, cwd=repo_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if process.returncode != 0:
+        raise GitError(process.stderr.decode('utf-8', errors='replace').strip())
+    return process.stdout
+
+
+def git_dir(repo_dir: str = '.') -> str:
+    """获取仓库的.git目录"""
+    path = os.fsdecode(_run_git(['rev-parse', '--git-dir'], repo_dir).strip())
+    return os.path.join(repo_dir, path)
+
+
+def list_staged_blobs(repo_dir: str = '.', extensions: Iterable[str] = ('.cs',)) -> List[Tuple[str, str]]:
+    """一次git调用列出暂存区中新增或修改的文件，返回 (路径, blob哈希) 列表
+
+    仓库还没有提交时，暂存区中的全部文件都视为新增。
+    """
+    extensions = tuple(extensions)
+    try:
+        output = _run_git(['diff-index', '--cached', '-z', '--no-renames', '--diff-filter=ACM', 'HEAD', '--'],
+                          repo_dir)
+        blobs = _parse_diff_index(output)
+    except GitError:
+        output = _run_git(['ls-files', '--stage', '-z'], repo_dir)
+        blobs = _parse_ls_files(output)
+
+    return [(path, blob) for path, blob in blobs if path.endswith(extensions)]
+
+
+def _parse_diff_index(output: bytes) -> List[Tuple[str, str]]:
+    """解析 git diff-index -z 的输出：':旧模式 新模式 旧哈希 新哈希 状态\\0路径\\0'"""
+    blobs = []
+    fields = output.split(b'\0')
+    i = 0
+    while i + 1 < len(fields):
+        meta, path = fields[i], fields[i + 1]
+        i += 2
+        if not meta.startswith(b':'):
+            continue
+        parts = meta[1:].split(b' ')
+        new_mode, new_blob = parts[1], parts[3]
+        # 跳过子模块和符号链接
+        if not new_mode.startswith(b'100'):
+            continue
+        blobs.append((os.fsdecode(path), new_blob.decode('ascii')))
+    return blobs
+
+
+def _parse_ls_files(output: bytes) -> List[Tuple[str, str]]:
+    """解析 git ls-files --stage -z 的输出：'模式 哈希 阶段\\t路径\\0'"""
+    blobs = []
+    for entry in output.split(b'\0'):
+        if not entry:
+            continue
+        meta, path = entry.split(b'\t', 1)
+        mode, blob, _ = meta.split(b' ')
+        if mode.startswith(b'100'):
+            blobs.append((os.fsdecode(path), blob.decode('ascii')))
+    return blobs
+
+
+class GitBlobReader:
+    """通过单个 git cat-file --batch 进程按哈希读取blob内容"""
+
+    def __init__(self, repo_dir: str = '.'):
+        """初始化读取器"""
+        self.repo_dir = repo_dir
+        self._process = None  # type: Optional[subprocess.Popen]
+
+    def __enter__(self):
+        self._process = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=self.repo_dir,
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def read(self, blob: str) -> bytes:
+        """读取一个blob的内容"""
+        process = self._process
+        process.stdin.write(blob.encode('ascii') + b'\n')
+        process.stdin.flush()
+
+        header = process.stdout.readline()
+        parts = header.split()
+        if len(parts) != 3:
+            raise GitError(f"无法读取git对象: {header.decode('utf-8', errors='replace').strip()}")
+        size = int(parts[2])
+        data = process.stdout.read(size)
+        # 每个对象内容后面跟一个换行符
+        process.stdout.read(1)
+        return data
+
+    def close(self):
+        """结束cat-file进程"""
+        if self._process is None:
+            return
+        self._process.stdin.close()
+        self._process.wait()
+        self._process.stdout.close()
+        self._process = None
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""内存预算：跟踪各阶段的内存占用，接近上限时逐级降级"""
+
+import gc
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from csharp_style_checker.core.result_store import SqliteResultStore
+from csharp_style_checker.utils.metrics import peak_memory_bytes
+
+
+# 降级级别，只升不降，避免在阈值附近反复切换
+LEVEL_NORMAL = 0
+LEVEL_THROTTLE = 1       # 减少并行分析中同时处理的文件数
+LEVEL_DROP_CONTENTS = 2  # 检查结果不再保留源码，报告中不显示代码预览
+LEVEL_SPILL = 3          # 检查结果转存到磁盘
+
+LEVEL_NAMES = {
+    LEVEL_THROTTLE: "减少同时分析的文件数",
+    LEVEL_DROP_CONTENTS: "不再保留源码（报告不显示代码预览）",
+    LEVEL_SPILL: "检查结果转存到临时数据库",
+}
+
+# 各级别对应的内存占比阈值
+DEFAULT_THRESHOLDS = OrderedDict([
+    (LEVEL_THROTTLE, 0.6),
+    (LEVEL_DROP_CONTENTS, 0.75),
+    (LEVEL_SPILL, 0.9),
+])
+
+
+def current_rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """进程当前的常驻内存（字节）
+
+    Linux 读取 /proc/<pid>/statm；其他平台只能得到当前进程的内存峰值，作为保守的估计。
+    """
+    statm = f'/proc/{pid or "self"}/statm'
+    try:
+        with open(statm, 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    return peak_memory_bytes() if pid is None else None
+
+
+class MemoryBudget:
+    """内存预算
+
+    每次采样计算检查器进程和并行分析的工作进程的常驻内存之和，记录各阶段的峰值；
+    超过阈值时提升降级级别，由检查器和检查结果按级别调整行为。
+    """
+
+    def __init__(self, limit_bytes: int, thresholds: Optional[Dict[int, float]] = None):
+        """初始化内存预算
+
+        limit_bytes: 内存上限（字节）
+        thresholds: {降级级别: 内存占比}，默认为 DEFAULT_THRESHOLDS
+        """
+        self.limit_bytes = limit_bytes
+        self.thresholds = thresholds or DEFAULT_THRESHOLDS
+        self.level = LEVEL_NORMAL
+        self.phase_peaks = OrderedDict()  # type: Dict[str, int]
+        # 每次降级的说明，用于摘要和报告
+        self.degradations = []  # type: List[str]
+        self.samples = 0
+        self._worker_rss = {}  # type: Dict[int, int]
+        self._spill_store = None  # type: Optional[SqliteResultStore]
+        self._spill_path = None  # type: Optional[str]
+
+    def record_worker(self, pid: int, rss: Optional[int]):
+        """记录工作进程报告的常驻内存"""
+        if rss is not None:
+            self._worker_rss[pid] = rss
+
+    def forget_workers(self):
+        """工作进程退出后不再计入其内存"""
+        self._worker_rss.clear()
+
+    def sample(self, phase: str) -> int:
+        """采样当前内存占用，计入阶段峰值并按阈值调整降级级别；返回当前级别"""
+        self.samples += 1
+        rss = current_rss_bytes()
+        if rss is None:
+            return self.level
+        total = rss + sum(self._worker_rss.values())
+        if total > self.phase_peaks.get(phase, 0):
+            self.phase_peaks[phase] = total
+
+        for level, ratio in self.thresholds.items():
+            if level > self.level and total >= self.limit_bytes * ratio:
+                self.level = level
+                message = (f"{phase} 阶段内存达到 {total / 1024 / 1024:.0f} MB"
+                           f"（上限 {self.limit_bytes / 1024 / 1024:.0f} MB），{LEVEL_NAMES[level]}")
+                self.degradations.append(message)
+                print(f"警告: {message}", file=sys.stderr)
+        return self.level
+
+    def window(self, size: int) -> int:
+        """并行分析中同时处理的文件数：限流后减半，不再保留源码后减为四分之一"""
+        if self.level >= LEVEL_DROP_CONTENTS:
+            return max(1, size // 4)
+        if self.level >= LEVEL_THROTTLE:
+            return max(1, size // 2)
+        return size
+
+    @property
+    def keep_contents(self) -> bool:
+        """检查结果是否还应保留源码"""
+        return self.level < LEVEL_DROP_CONTENTS
+
+    @property
+    def should_spill(self) -> bool:
+        """检查结果是否应转存到磁盘"""
+        return self.level >= LEVEL_SPILL
+
+    def spill_store(self) -> SqliteResultStore:
+        """转存用的临时结果数据库，多个配置方案共用，首次调用时创建"""
+        if self._spill_store is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix='csharp_style_checker_', suffix='.db')
+            os.close(fd)
+            self._spill_store = SqliteResultStore(self._spill_path, store_content=False)
+        return self._spill_store
+
+    def release(self):
+        """释放已经不需要的对象占用的内存"""
+        gc.collect()
+
+    def close(self):
+        """关闭并删除转存用的临时数据库（报告生成之后调用）"""
+        if self._spill_store is not None:
+            self._spill_store.close()
+            self._spill_store = None
+            try:
+                os.remove(self._spill_path)
+            except OSError:
+                pass
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""检查器性能指标的收集，以及 Prometheus 文本格式导出"""
+
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_memory_bytes() -> Optional[int]:
+    """当前进程的内存占用峰值（字节），平台不支持时返回None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以KB为单位，macOS 以字节为单位
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _escape_label(value: str) -> str:
+    """转义标签值中的反斜杠、双引号和换行"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class CheckMetrics:
+    """一次检查的性能指标：各规则耗时和跳过的文件数、各阶段耗时、读取字节数"""
+
+    def __init__(self):
+        """初始化指标"""
+        self.started_at = time.perf_counter()
+        self.rule_seconds = {}  # type: Dict[str, float]
+        # 因源码中没有所需字面量而跳过规则的文件数
+        self.rule_skips = {}  # type: Dict[str, int]
+        self.phase_seconds = OrderedDict()  # type: Dict[str, float]
+        # 每个正在计时的阶段中已结束的内层阶段的耗时
+        self._nested_seconds = []  # type: List[float]
+        self.files_read = 0
+        self.bytes_read = 0
+
+    def add_rule_time(self, rule_id: str, seconds: float):
+        """累计一条规则的耗时"""
+        self.rule_seconds[rule_id] = self.rule_seconds.get(rule_id, 0.0) + seconds
+
+    def add_rule_skip(self, rule_id: str):
+        """记录一个文件跳过了一条规则"""
+        self.rule_skips[rule_id] = self.rule_skips.get(rule_id, 0) + 1
+
+    def add_phase_time(self, phase: str, seconds: float):
+        """累计一个阶段的耗时"""
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """统计代码块的耗时，计入指定阶段
+
+        阶段可以嵌套：内层阶段的耗时只计入内层阶段，从外层阶段中扣除，各阶段耗时互不重叠。
+        """
+        start = time.perf_counter()
+        self._nested_seconds.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add_phase_time(name, elapsed - self._nested_seconds.pop())
+            if self._nested_seconds:
+                self._nested_seconds[-1] += elapsed
+
+    def add_file(self, size: int):
+        """记录读取了一个文件"""
+        self.files_read += 1
+        self.bytes_read += size
+
+    def merge(self, other: 'CheckMetrics'):
+        """合并工作进程收集的规则耗时、跳过的规则和阶段耗时
+
+        读取的文件数和字节数由主进程根据返回的结果统计，不从工作进程合并，避免重复计数。
+        """
+        for rule_id, seconds in other.rule_seconds.items():
+            self.add_rule_time(rule_id, seconds)
+        for rule_id, count in other.rule_skips.items():
+            self.rule_skips[rule_id] = self.rule_skips.get(rule_id, 0) + count
+        for phase, seconds in other.phase_seconds.items():
+            self.add_phase_time(phase, seconds)
+
+    def write_prometheus(self, output_path: str, results, memory_budget=None,
+                         memo_stats: Optional[Dict[str, Dict]] = None):
+        """以 Prometheus 文本格式写出指标
+
+        results: {配置名称: CheckResult}，问题数量按配置方案、严重级别和规则分别导出
+        memory_budget: 设置了内存预算（MemoryBudget）时导出各阶段的内存峰值和降级级别
+        memo_stats: 检查器的行缓存统计（StyleChecker.memo_stats），导出各缓存的命中和未命中次数
+        """
+        lines = []  # type: List[str]
+
+        def metric(name: str, metric_type: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                if labels:
+                    label_text = ','.join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {value}")
+                else:
+                    lines.append(f"{name} {value}")
+
+        metric('csharp_style_checker_duration_seconds', 'gauge', 'Wall time of the whole check.',
+               [({}, round(time.perf_counter() - self.started_at, 6))])
+        metric('csharp_style_checker_phase_seconds', 'gauge',
+               'Time spent in each phase, excluding nested phases; phases run in worker processes are summed '
+               'across workers.',
+               [({'phase': phase}, round(seconds, 6)) for phase, seconds in self.phase_seconds.items()])
+        metric('csharp_style_checker_rule_seconds', 'gauge', 'Time spent in each rule, summed across workers.',
+               [({'rule': rule_id}, round(seconds, 6)) for rule_id, seconds in sorted(self.rule_seconds.items())])
+        metric('csharp_style_checker_rule_skipped_files', 'gauge',
+               'Number of files where a rule was skipped because none of its required literals occur.',
+               [({'rule': rule_id}, count) for rule_id, count in sorted(self.rule_skips.items())])
+        metric('csharp_style_checker_files_read', 'gauge', 'Number of source files read.',
+               [({}, self.files_read)])
+        metric('csharp_style_checker_bytes_read', 'gauge', 'Number of source bytes read.',
+               [({}, self.bytes_read)])
+
+        peak = peak_memory_bytes()
+        if peak is not None:
+            metric('csharp_style_checker_peak_memory_bytes', 'gauge', 'Peak resident memory of the checker process.',
+                   [({}, peak)])
+
+        if memory_budget is not None:
+            metric('csharp_style_checker_phase_peak_memory_bytes', 'gauge',
+                   'Peak resident memory of the checker and its workers in each phase.',
+                   [({'phase': phase}, peak) for phase, peak in memory_budget.phase_peaks.items()])
+            metric('csharp_style_checker_memory_limit_bytes', 'gauge', 'Configured memory limit.',
+                   [({}, memory_budget.limit_bytes)])
+            metric('csharp_style_checker_memory_degradation_level', 'gauge',
+                   'Degradation level reached to stay under the memory limit (0 = none).',
+                   [({}, memory_budget.level)])
+
+        if memo_stats:
+            metric('csharp_style_checker_memo_hits', 'gauge', 'Line memo hits, summed across workers.',
+                   [({'memo': name}, stats['hits']) for name, stats in memo_stats.items()])
+            metric('csharp_style_checker_memo_misses', 'gauge', 'Line memo misses, summed across workers.',
+                   [({'memo': name}, stats['misses']) for name, stats in memo_stats.items()])
+
+        files, skipped, severities, rules = [], [], [], []
+        for profile, result in results.items():
+            files.append(({'profile': profile}, result.total_files))
+            skipped.append(({'profile': profile}, result.skipped_count))
+            for severity, count in (('error', result.error_count), ('warning', result.warning_count),
+                                    ('info', result.info_count)):
+                severities.append(({'profile': profile, 'severity': severity}, count))
+
+            for rule_id, count in sorted(result.rule_counts().items()):
+                rules.append(({'profile': profile, 'rule': rule_id}, count))
+
+        metric('csharp_style_checker_files', 'gauge', 'Number of files checked.', files)
+        metric('csharp_style_checker_skipped_files', 'gauge', 'Number of files skipped before analysis.', skipped)
+        metric('csharp_style_checker_issues', 'gauge', 'Number of issues by severity.', severities)
+        metric('csharp_style_checker_rule_issues', 'gauge', 'Number of issues by rule.', rules)
+
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        # 先写临时文件再替换，node_exporter 等采集端不会读到写了一半的文件
+        temp_path = output_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, output_path)
+
+
+@contextmanager
+def measure_phase(metrics: Optional[CheckMetrics], name: str) -> Iterator[None]:
+    """metrics 不为None时统计代码块的耗时"""
+    if metrics is None:
+        yield
+        return
+    with metrics.phase(name):
+        yield
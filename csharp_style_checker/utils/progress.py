@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""检查进度显示：已完成文件数、吞吐量和预计剩余时间"""
+
+import sys
+import time
+from typing import Optional, TextIO
+
+
+def _format_duration(seconds: float) -> str:
+    """格式化为 时:分:秒"""
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class ProgressReporter:
+    """在标准错误输出上显示检查进度
+
+    输出到终端时原地刷新同一行；输出被重定向时按固定间隔逐行输出，避免日志刷屏。
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: Optional[float] = None):
+        """初始化进度显示
+
+        interval: 两次刷新之间的最短间隔（秒），默认终端0.2秒、其他输出10秒
+        """
+        self.stream = stream or sys.stderr
+        self.interactive = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.interval = interval if interval is not None else (0.2 if self.interactive else 10.0)
+        self.total = None  # type: Optional[int]
+        self.files_done = 0
+        self.bytes_done = 0
+        self._started_at = None  # type: Optional[float]
+        self._last_render = 0.0
+
+    def start(self, total: Optional[int] = None):
+        """开始计时；total 为待检查的文件总数，流式输入时为None（不显示剩余时间）"""
+        self.total = total
+        self.files_done = 0
+        self.bytes_done = 0
+        self._started_at = time.perf_counter()
+        self._last_render = 0.0
+
+    def advance(self, size: int = 0):
+        """完成一个文件，size 为该文件的字节数"""
+        if self._started_at is None:
+            self.start()
+        self.files_done += 1
+        self.bytes_done += size
+
+        now = time.perf_counter()
+        if now - self._last_render >= self.interval:
+            self._last_render = now
+            self._render(now)
+
+    def finish(self):
+        """输出最终进度"""
+        if self._started_at is None:
+            return
+        self._render(time.perf_counter())
+        if self.interactive:
+            self.stream.write('\n')
+            self.stream.flush()
+        self._started_at = None
+
+    def _render(self, now: float):
+        """输出一行进度"""
+        elapsed = max(now - self._started_at, 1e-9)
+        files_per_second = self.files_done / elapsed
+        megabytes_per_second = self.bytes_done / elapsed / (1024 * 1024)
+
+        if self.total:
+            text = f"已检查 {self.files_done}/{self.total} 个文件 ({self.files_done * 100.0 / self.total:.1f}%)"
+        else:
+            text = f"已检查 {self.files_done} 个文件"
+        text += f"  {files_per_second:.1f} 文件/秒  {megabytes_per_second:.2f} MB/秒"
+        if self.total and files_per_second > 0:
+            remaining = max(self.total - self.files_done, 0) / files_per_second
+            text += f"  剩余约 {_format_duration(remaining)}"
+        else:
+            text += f"  已用时 {_format_duration(elapsed)}"
+
+        if self.interactive:
+            # 原地刷新，并清除上一次较长输出的残留字符
+            self.stream.write('\r' + text + '\033[K')
+        else:
+            self.stream.write(text + '\n')
+        self.stream.flush()
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""根据项目文件确定参与编译的源文件：.csproj 的 Compile 项和 Unity .asmdef 程序集"""
+
+import fnmatch
+import glob
+import json
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+from csharp_style_checker.models.assembly import Assembly
+
+
+# 查找项目文件时跳过的目录：构建输出、Unity 缓存和版本库
+SKIPPED_DIRECTORIES = {'bin', 'obj', 'Library', 'Temp', 'Logs', 'UserSettings', '.git', '.vs', 'node_modules'}
+
+# SDK 风格项目默认排除的目录
+_SDK_DEFAULT_EXCLUDES = ('bin/**', 'obj/**')
+
+# Unity 中不在任何 .asmdef 下的脚本按所在目录编译进预定义程序集
+_FIRSTPASS_ROOTS = ('plugins', 'standard assets', 'pro standard assets')
+
+_GUID = re.compile(r'^guid:\s*([0-9a-f]+)', re.MULTILINE)
+
+
+def _local_name(tag: str) -> str:
+    """去掉 MSBuild XML 命名空间"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _expand_items(project_dir: str, spec: str) -> List[str]:
+    """展开 MSBuild 项的 Include/Remove 值：分号分隔，支持 * 和 ** 通配符
+
+    含 $(属性) 的项无法在不执行 MSBuild 的情况下求值，直接忽略。
+    """
+    paths = []
+    for item in spec.split(';'):
+        item = item.strip().replace('\\', '/')
+        if not item or '$(' in item or '@(' in item:
+            continue
+        pattern = os.path.join(project_dir, item)
+        if glob.has_magic(item):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    return [os.path.normpath(path) for path in paths]
+
+
+def parse_csproj(csproj_path: str) -> Assembly:
+    """读取 .csproj 中参与编译的源文件
+
+    同时支持旧式项目（Unity 生成的项目逐个列出 Compile 项）和 SDK 风格项目
+    （默认包含项目目录下的全部 *.cs，可以用 Compile Remove 排除，EnableDefaultCompileItems 关闭默认项）。
+    """
+    root = ElementTree.parse(csproj_path).getroot()
+    project_dir = os.path.dirname(os.path.abspath(csproj_path))
+    properties = {}  # type: Dict[str, str]
+    for element in root.iter():
+        if _local_name(element.tag) in ('AssemblyName', 'EnableDefaultCompileItems', 'IsTestProject') and element.text:
+            properties.setdefault(_local_name(element.tag), element.text.strip())
+
+    sdk_style = root.get('Sdk') is not None or any(_local_name(element.tag) == 'Sdk' for element in root)
+    files = OrderedDict()  # type: Dict[str, None]
+    removed = set()  # type: Set[str]
+    if sdk_style and properties.get('EnableDefaultCompileItems', 'true').lower() != 'false':
+        for path in _expand_items(project_dir, '**/*.cs'):
+            files[path] = None
+        for pattern in _SDK_DEFAULT_EXCLUDES:
+            removed.update(_expand_items(project_dir, pattern + '/*.cs'))
+
+    for element in root.iter():
+        if _local_name(element.tag) != 'Compile':
+            continue
+        if element.get('Include'):
+            excluded = set(_expand_items(project_dir, element.get('Exclude', '')))
+            for path in _expand_items(project_dir, element.get('Include')):
+                if path not in excluded:
+                    files[path] = None
+        if element.get('Remove'):
+            removed.update(_expand_items(project_dir, element.get('Remove')))
+
+    name = properties.get('AssemblyName') or os.path.splitext(os.path.basename(csproj_path))[0]
+    kind = Assembly.KIND_TEST if properties.get('IsTestProject', '').lower() == 'true' else Assembly.KIND_RUNTIME
+    return Assembly(name, csproj_path, kind, [path for path in files if path not in removed and os.path.isfile(path)])
+
+
+def _read_asmdef(asmdef_path: str) -> Dict:
+    """读取 .asmdef / .asmref（JSON，Unity 允许带 BOM）"""
+    with open(asmdef_path, 'r', encoding='utf-8-sig') as f:
+        return json.load(f)
+
+
+def _asmdef_kind(definition: Dict) -> str:
+    """按平台和编译条件判断 Unity 程序集的类型"""
+    if ('UNITY_INCLUDE_TESTS' in definition.get('defineConstraints', ())
+            or 'TestAssemblies' in definition.get('optionalUnityReferences', ())):
+        return Assembly.KIND_TEST
+    if definition.get('includePlatforms') == ['Editor']:
+        return Assembly.KIND_EDITOR
+    return Assembly.KIND_RUNTIME
+
+
+def _asset_guid(asset_path: str) -> Optional[str]:
+    """从 Unity 的 .meta 文件读取资源GUID"""
+    try:
+        with open(asset_path + '.meta', 'r', encoding='utf-8') as f:
+            match = _GUID.search(f.read())
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+
+def _predefined_assembly(relative_parts: List[str]) -> str:
+    """不在任何 .asmdef 下的脚本所属的 Unity 预定义程序集"""
+    parts = [part.lower() for part in relative_parts[:-1]]
+    firstpass = bool(parts) and parts[0] in _FIRSTPASS_ROOTS
+    editor = 'editor' in parts
+    return 'Assembly-CSharp' + ('-Editor' if editor else '') + ('-firstpass' if firstpass else '')
+
+
+def find_unity_assemblies(project_root: str) -> List[Assembly]:
+    """按 .asmdef / .asmref 划分 Unity 项目中的脚本
+
+    每个 .asmdef 包含所在目录及其子目录中的脚本，直到遇到另一个 .asmdef 或 .asmref；
+    Assets 下不属于任何 .asmdef 的脚本按 Unity 的规则归入 Assembly-CSharp 等预定义程序集，
+    Packages 下没有 .asmdef 的脚本不参与编译。
+    """
+    assets_dir = os.path.join(project_root, 'Assets')
+    packages_dir = os.path.join(project_root, 'Packages')
+    if os.path.isdir(assets_dir):
+        search_roots = [assets_dir] + ([packages_dir] if os.path.isdir(packages_dir) else [])
+    else:
+        # 不是完整的 Unity 项目时，把给定目录当作 Assets 处理
+        assets_dir = project_root
+        search_roots = [project_root]
+
+    assemblies = OrderedDict()  # type: Dict[str, Assembly]
+    by_guid = {}  # type: Dict[str, str]
+    # 目录 -> 所属程序集名称（None 表示使用预定义程序集或不参与编译）；.asmref 先记下引用，全部读取后再解析
+    directory_assembly = {}  # type: Dict[str, Optional[str]]
+    references = {}  # type: Dict[str, str]
+    sources = []  # type: List[tuple]
+
+    for search_root in search_roots:
+        for directory, dir_names, file_names in os.walk(search_root):
+            dir_names[:] = sorted(name for name in dir_names
+                                  if name not in SKIPPED_DIRECTORIES and not name.startswith('.') and not name.endswith('~'))
+            current = directory_assembly.get(os.path.dirname(directory))
+            for file_name in sorted(file_names):
+                path = os.path.join(directory, file_name)
+                if file_name.endswith('.asmdef'):
+                    definition = _read_asmdef(path)
+                    name = definition.get('name') or os.path.splitext(file_name)[0]
+                    assemblies[name] = Assembly(name, path, _asmdef_kind(definition))
+                    guid = _asset_guid(path)
+                    if guid:
+                        by_guid[guid] = name
+                    current = name
+                elif file_name.endswith('.asmref'):
+                    references[directory] = _read_asmdef(path).get('reference', '')
+                    current = '@' + directory
+            directory_assembly[directory] = current
+            for file_name in sorted(file_names):
+                if file_name.endswith('.cs'):
+                    sources.append((os.path.join(directory, file_name), current))
+
+    for path, owner in sources:
+        if owner is not None and owner.startswith('@'):
+            reference = references[owner[1:]]
+            owner = by_guid.get(reference[5:].lower()) if reference.lower().startswith('guid:') else reference
+            if owner not in assemblies:
+                continue
+        if owner is None:
+            relative = os.path.relpath(path, assets_dir)
+            if relative.startswith(os.pardir):
+                # Packages 下没有程序集定义的脚本
+                continue
+            owner = _predefined_assembly(relative.split(os.sep))
+            if owner not in assemblies:
+                kind = Assembly.KIND_EDITOR if '-Editor' in owner else Assembly.KIND_RUNTIME
+                assemblies[owner] = Assembly(owner, None, kind)
+        assemblies[owner].files.append(path)
+
+    return list(assemblies.values())
+
+
+def find_csproj_files(directory: str) -> List[str]:
+    """查找目录下的 .csproj 文件（跳过构建输出和缓存目录）"""
+    projects = []
+    for root, dir_names, file_names in os.walk(directory):
+        dir_names[:] = sorted(name for name in dir_names if name not in SKIPPED_DIRECTORIES)
+        projects.extend(os.path.join(root, name) for name in sorted(file_names) if name.endswith('.csproj'))
+    return projects
+
+
+def load_assemblies(path: str, exclude: Iterable[str] = ()) -> List[Assembly]:
+    """根据路径确定要检查的程序集
+
+    path 可以是 .csproj 文件、.asmdef 所在的 Unity 项目或任意目录：目录下有 .csproj 时使用 .csproj，
+    否则按 .asmdef 划分。exclude 中的模式（fnmatch）与程序集名称或类型（runtime/editor/test）匹配时排除。
+    """
+    if os.path.isfile(path):
+        if not path.endswith('.csproj'):
+            raise ValueError(f"不支持的项目文件: {path}")
+        assemblies = [parse_csproj(path)]
+    elif not os.path.isdir(path):
+        raise FileNotFoundError(f"路径不存在: {path}")
+    else:
+        projects = find_csproj_files(path)
+        assemblies = [parse_csproj(project) for project in projects] if projects else find_unity_assemblies(path)
+
+    patterns = list(exclude)
+    return [assembly for assembly in assemblies
+            if not any(fnmatch.fnmatchcase(assembly.name, pattern) or assembly.kind == pattern for pattern in patterns)]
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""分层抽样：只检查一部分文件，外推整个代码库的问题数量并给出置信区间"""
+
+import math
+import os
+import random
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# 按文件大小分层的边界（字节）：<4K、<16K、<64K、更大
+SIZE_BUCKETS = (4 * 1024, 16 * 1024, 64 * 1024)
+
+# 95% 置信水平对应的正态分位数
+Z_95 = 1.96
+
+TOTAL_LABELS = OrderedDict([("issues", "总问题数"), ("error", "错误"), ("warning", "警告"), ("info", "提示")])
+
+
+def _size_bucket(file_path: str) -> int:
+    """文件大小所在的层"""
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        return 0
+    for index, limit in enumerate(SIZE_BUCKETS):
+        if size < limit:
+            return index
+    return len(SIZE_BUCKETS)
+
+
+def _top_directory(file_path: str, root: str) -> str:
+    """文件在公共根目录下的第一级目录，直接位于根目录的文件为 '.'"""
+    parts = os.path.relpath(file_path, root).split(os.sep)
+    return parts[0] if len(parts) > 1 else '.'
+
+
+class Estimate:
+    """一个统计量的外推结果"""
+
+    def __init__(self, observed: int, total: float, margin: float):
+        """observed: 样本中的数量；total: 外推的总数；margin: 置信区间半宽"""
+        self.observed = observed
+        self.total = total
+        self.margin = margin
+
+    @property
+    def low(self) -> float:
+        """置信区间下限，不低于样本中已经观察到的数量"""
+        return max(self.observed, self.total - self.margin)
+
+    @property
+    def high(self) -> float:
+        """置信区间上限"""
+        return self.total + self.margin
+
+    def __repr__(self):
+        return f"Estimate({self.total:.0f} ± {self.margin:.0f})"
+
+
+class SampleEstimate:
+    """抽样检查的外推结果，附加在检查结果上供摘要和报告使用"""
+
+    def __init__(self, population: int, sample_size: int, strata: int, seed: int, confidence: float = 0.95):
+        """初始化外推结果"""
+        self.population = population
+        self.sample_size = sample_size
+        self.strata = strata
+        self.seed = seed
+        self.confidence = confidence
+        # 总问题数和各严重级别：{"issues"/"error"/"warning"/"info": Estimate}
+        self.totals = OrderedDict()  # type: Dict[str, Estimate]
+        self.by_rule = OrderedDict()  # type: Dict[str, Estimate]
+
+    def description(self) -> str:
+        """抽样方式的说明"""
+        return (f"从 {self.population} 个文件中分层抽样 {self.sample_size} 个（{self.strata} 层，随机种子 {self.seed}），"
+                f"问题数按 {self.confidence:.0%} 置信区间外推到全部文件")
+
+    def to_dict(self) -> Dict:
+        """转换为可序列化的字典（保存到结果文件）"""
+        return {
+            'population': self.population,
+            'sample_size': self.sample_size,
+            'strata': self.strata,
+            'seed': self.seed,
+            'confidence': self.confidence,
+            'totals': [[name, value.observed, value.total, value.margin] for name, value in self.totals.items()],
+            'by_rule': [[name, value.observed, value.total, value.margin] for name, value in self.by_rule.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SampleEstimate':
+        """从字典恢复外推结果"""
+        estimate = cls(data['population'], data['sample_size'], data['strata'], data['seed'], data['confidence'])
+        for name, observed, total, margin in data['totals']:
+            estimate.totals[name] = Estimate(observed, total, margin)
+        for name, observed, total, margin in data['by_rule']:
+            estimate.by_rule[name] = Estimate(observed, total, margin)
+        return estimate
+
+
+class StratifiedSample:
+    """按目录和文件大小分层的随机抽样
+
+    各层按文件数比例分配样本，每层至少抽取两个文件以便估计方差；样本量不足以覆盖全部层时，
+    依次改为只按目录、只按大小分层，最后不分层。相同的文件列表和随机种子得到相同的样本。
+    """
+
+    def __init__(self, file_paths: List[str], fraction: Optional[float] = None, count: Optional[int] = None,
+                 seed: int = 0):
+        """抽取样本
+
+        fraction: 抽样比例 (0, 1]；count: 抽样文件数，二者指定其一
+        """
+        self.population = len(file_paths)
+        if count is None:
+            count = int(math.ceil(self.population * (fraction or 1.0)))
+        self.seed = seed
+        self.sample_size = max(0, min(count, self.population))
+        # 层标识 -> 该层的全部文件 / 抽中的文件
+        self.strata = OrderedDict()  # type: Dict[Tuple, List[str]]
+        self.sampled = OrderedDict()  # type: Dict[Tuple, List[str]]
+        if file_paths:
+            self._draw(file_paths)
+
+    def _draw(self, file_paths: List[str]):
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in file_paths])
+        directories = [_top_directory(os.path.abspath(path), root) for path in file_paths]
+        sizes = [_size_bucket(path) for path in file_paths]
+        layouts = (
+            lambda i: (directories[i], sizes[i]),
+            lambda i: (directories[i],),
+            lambda i: (sizes[i],),
+            lambda i: (),
+        )
+        for layout in layouts:
+            self.strata = OrderedDict()
+            for index, path in enumerate(file_paths):
+                self.strata.setdefault(layout(index), []).append(path)
+            if self.sample_size >= 2 * len(self.strata):
+                break
+
+        rng = random.Random(self.seed)
+        for key, allocation in zip(self.strata, self._allocate()):
+            members = self.strata[key]
+            self.sampled[key] = rng.sample(members, allocation) if allocation < len(members) else list(members)
+
+    def _allocate(self) -> List[int]:
+        """按比例分配各层样本量（最大余数法），每层至少两个（层内文件不足时全取）"""
+        sizes = [len(members) for members in self.strata.values()]
+        minimum = [min(size, 2) if self.sample_size >= 2 * len(sizes) else 0 for size in sizes]
+        remaining = self.sample_size - sum(minimum)
+        capacity = [size - low for size, low in zip(sizes, minimum)]
+        total_capacity = sum(capacity)
+        if not total_capacity or remaining <= 0:
+            return minimum
+        quotas = [remaining * cap / total_capacity for cap in capacity]
+        allocation = [int(quota) for quota in quotas]
+        by_remainder = sorted(range(len(quotas)), key=lambda i: -(quotas[i] - allocation[i]))
+        for i in by_remainder[:remaining - sum(allocation)]:
+            allocation[i] += 1
+        return [low + extra for low, extra in zip(minimum, allocation)]
+
+    @property
+    def file_paths(self) -> List[str]:
+        """抽中的文件，保持原列表中的顺序"""
+        chosen = {path for members in self.sampled.values() for path in members}
+        return [path for members in self.strata.values() for path in members if path in chosen]
+
+    def estimate(self, result) -> SampleEstimate:
+        """根据样本的检查结果外推全部文件的问题数量
+
+        使用分层估计量 Σ N_h·ȳ_h，方差 Σ N_h²·(1 - n_h/N_h)·s_h²/n_h。抽中但被跳过的文件
+        （生成代码、超过大小上限）在完整检查中同样不产生问题，按 0 计入。
+        """
+        per_file = {}  # type: Dict[str, Dict[str, int]]
+        rule_ids = set()
+        for code_file in result.iter_code_files():
+            values = dict(code_file.severity_counts())
+            values["issues"] = len(code_file.issues)
+            for issue in code_file.issues:
+                key = "rule:" + issue.rule_id
+                values[key] = values.get(key, 0) + 1
+                rule_ids.add(issue.rule_id)
+            per_file[code_file.file_path] = values
+
+        estimate = SampleEstimate(self.population, self.sample_size, len(self.strata), self.seed)
+        for name in TOTAL_LABELS:
+            estimate.totals[name] = self._extrapolate(per_file, name)
+        rule_estimates = ((rule_id, self._extrapolate(per_file, "rule:" + rule_id)) for rule_id in rule_ids)
+        for rule_id, value in sorted(rule_estimates, key=lambda item: (-item[1].total, item[0])):
+            estimate.by_rule[rule_id] = value
+        return estimate
+
+    def _extrapolate(self, per_file: Dict[str, Dict[str, int]], name: str) -> Estimate:
+        observed = 0
+        total = 0.0
+        variance = 0.0
+        for key, members in self.sampled.items():
+            n = len(members)
+            if not n:
+                continue
+            population = len(self.strata[key])
+            values = [per_file.get(path, {}).get(name, 0) for path in members]
+            observed += sum(values)
+            mean = sum(values) / n
+            total += population * mean
+            if n > 1:
+                sample_variance = sum((value - mean) ** 2 for value in values) / (n - 1)
+                variance += population * population * (1 - n / population) * sample_variance / n
+        return Estimate(observed, total, Z_95 * math.sqrt(variance))
+
+
+def parse_sample(value: str) -> Tuple[Optional[float], Optional[int]]:
+    """解析 --sample：小于1的小数或百分数为抽样比例，整数为文件数；返回 (比例, 文件数)"""
+    text = value.strip()
+    if text.endswith('%'):
+        fraction = float(text[:-1]) / 100
+    elif '.' in text:
+        fraction = float(text)
+    else:
+        count = int(text)
+        if count <= 0:
+            raise ValueError(f"抽样文件数必须大于0: {value}")
+        return None, count
+    if not 0 < fraction <= 1:
+        raise ValueError(f"抽样比例必须在 (0, 1] 之间: {value}")
+    return fraction, None
+
+
+def iter_estimate_rows(estimate: SampleEstimate) -> Iterable[Tuple[str, Estimate]]:
+    """摘要和报告中的外推结果行：(名称, 估计)，先总数和严重级别，再按规则"""
+    for name, value in estimate.totals.items():
+        yield TOTAL_LABELS[name], value
+    for rule_id, value in estimate.by_rule.items():
+        yield rule_id, value
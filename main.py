@@ -6,41 +6,409 @@ C# 代码风格检查工具
 直接读取指定的C#文件或目录，检查代码风格问题并生成HTML报告
 """
 
+import argparse
 import os
 import sys
-from csharp_style_checker.core.style_checker import StyleChecker
+from collections import OrderedDict
+from csharp_style_checker.core.batch import load_manifest
+from csharp_style_checker.core.style_checker import DEFAULT_PROFILE, StyleChecker
+from csharp_style_checker.core.profiles import load_custom_rules, load_profiles, profile_output_path
+from csharp_style_checker.core.result_file import BinaryCheckResult, write_result_file
+from csharp_style_checker.core.result_store import SqliteResultStore
+from csharp_style_checker.lsp.server import JsonRpcStream, LanguageServer
+from csharp_style_checker.reporters.batch_index_reporter import BatchIndexReporter
+from csharp_style_checker.reporters.data_html_reporter import DataHtmlReporter
+from csharp_style_checker.reporters.fragment_cache import FragmentCache
 from csharp_style_checker.reporters.html_reporter import HtmlReporter
+from csharp_style_checker.utils.file_utils import iter_file_list
+from csharp_style_checker.utils.memory_budget import MemoryBudget
+from csharp_style_checker.utils.metrics import CheckMetrics, measure_phase
+from csharp_style_checker.utils.progress import ProgressReporter
+from csharp_style_checker.utils.project_files import load_assemblies
+from csharp_style_checker.utils.sampling import TOTAL_LABELS, StratifiedSample, parse_sample
+
+
+def parse_size(value: str) -> int:
+    """解析内存大小，支持 K/M/G 后缀，例如 512M、2G"""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = value.strip().upper().rstrip('B')
+    try:
+        if text and text[-1] in units:
+            return int(float(text[:-1]) * units[text[-1]])
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的内存大小: {value}")
+
+
+def parse_sample_option(value: str):
+    """解析 --sample 参数，返回 (比例, 文件数)"""
+    try:
+        return parse_sample(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="C# 代码风格检查工具")
+    parser.add_argument("path", nargs="?", help="要检查的文件或目录路径")
+    parser.add_argument("output", nargs="?", default=None, help="输出报告路径")
+    parser.add_argument("-o", "--output", dest="output_option", default=None, metavar="PATH",
+                        help="输出报告路径（与位置参数等价）")
+    parser.add_argument("--files-from", default=None, metavar="FILE",
+                        help="从文件读取要检查的路径列表，'-' 表示标准输入；路径边读边检查")
+    parser.add_argument("--null", action="store_true",
+                        help="--files-from 的路径以NUL字符分隔（配合 git ls-files -z 使用）")
+    parser.add_argument("--stdin-content", action="store_true",
+                        help="从标准输入读取单个文件的内容进行检查，不访问磁盘上的源文件")
+    parser.add_argument("--stdin-filename", default=None, metavar="NAME",
+                        help="--stdin-content 模式下报告中使用的文件名")
+    parser.add_argument("--git-index", action="store_true",
+                        help="检查git暂存区中新增或修改的文件（用于pre-commit钩子），路径参数为仓库目录，默认当前目录")
+    parser.add_argument("--git-cache", default=None, metavar="PATH",
+                        help="--git-index 模式下按blob哈希缓存检查结果的文件，默认位于.git目录下")
+    parser.add_argument("--lsp", action="store_true",
+                        help="以LSP服务方式运行（标准输入输出），在编辑器中实时显示检查结果")
+    parser.add_argument("--projects", action="store_true",
+                        help="按项目文件选择要检查的文件：路径为 .csproj 或目录（目录下的 .csproj，没有时按 Unity .asmdef 划分），"
+                             "报告中按程序集汇总")
+    parser.add_argument("--exclude-assembly", action="append", default=[], metavar="PATTERN",
+                        help="--projects 模式下排除名称匹配的程序集（支持通配符），也可以是类型 runtime/editor/test；可重复指定")
+    parser.add_argument("--batch", default=None, metavar="MANIFEST",
+                        help="按批量清单（JSON）检查多个根目录，每个根目录有自己的规则、选项和报告，共用一个进程池，"
+                             "另外生成汇总索引（-o 指定索引路径）")
+    parser.add_argument("--profiles", default=None, metavar="CONFIG",
+                        help="规则配置方案文件（JSON），一次扫描为每个配置方案分别生成报告 <报告名>.<配置名>.html")
+    parser.add_argument("--progress", dest="progress", action="store_true", default=None,
+                        help="在标准错误输出上显示检查进度（默认仅在终端上显示）")
+    parser.add_argument("--no-progress", dest="progress", action="store_false",
+                        help="不显示检查进度")
+    parser.add_argument("--metrics-file", default=None, metavar="PATH",
+                        help="以Prometheus文本格式写出性能指标（规则耗时、阶段耗时、内存峰值、问题数量）")
+    parser.add_argument("--custom-rules", default=None, metavar="CONFIG",
+                        help="从配置文件（JSON）的 custom_rules 加载自定义规则；使用 --profiles 时直接写在配置方案文件中")
+    parser.add_argument("--report-format", choices=("html", "data"), default="html",
+                        help="报告格式：html 为预先生成的静态页面；data 内嵌JSON数据，由页面按需渲染可见行，适合问题很多的仓库")
+    parser.add_argument("--report-cache", default=None, metavar="DIR",
+                        help="HTML报告片段缓存目录，重新生成报告时只渲染变化的文件")
+    parser.add_argument("--compress", action="store_true",
+                        help="以gzip压缩写出报告（文件名追加 .gz），内容相同的代码预览只保存一份")
+    parser.add_argument("--result-db", default=None, metavar="PATH",
+                        help="将逐文件的检查结果分批写入SQLite数据库，报告从数据库分页读取，内存占用与仓库规模无关；"
+                             "已有的结果数据库中上一次的结果会被替换，不是SQLite数据库的文件不会被覆盖")
+    parser.add_argument("--save-result", default=None, metavar="PATH",
+                        help="把检查结果保存为紧凑的二进制文件，之后可以用 --report-from 重新生成报告")
+    parser.add_argument("--report-from", default=None, metavar="PATH",
+                        help="从 --save-result 保存的结果文件生成报告，不重新检查、不读取源文件")
+    parser.add_argument("--memory-limit", type=parse_size, default=None, metavar="SIZE",
+                        help="内存上限（如 512M、2G），接近上限时减少并行分析的文件数、不再保留源码、把结果转存到磁盘")
+    parser.add_argument("--time-budget", type=float, default=None, metavar="SECONDS",
+                        help="单个文件的分析时间预算（秒），超出时报告TIMEOUT并跳过剩余规则；"
+                             "在规则之间和逐行检查的每一行之前检查，单次正则匹配无法中断")
+    parser.add_argument("--jobs", type=int, default=None, metavar="N",
+                        help="并行任务使用的进程数：符号索引默认使用CPU核数；大于1时文件分析也在进程池中并行")
+    parser.add_argument("--index-cache", default=None, metavar="PATH",
+                        help="项目级符号索引缓存文件，内容未变的文件在下次运行时直接复用")
+    parser.add_argument("--dedup", action="store_true",
+                        help="合并硬链接、符号链接和内容相同的重复文件，每种内容只分析一次，问题复制到每个路径")
+    parser.add_argument("--sample", type=parse_sample_option, default=None, metavar="N|FRACTION",
+                        help="只检查按目录和文件大小分层随机抽取的部分文件（如 500、0.1、10%%），外推全部文件的问题数并给出95%%置信区间")
+    parser.add_argument("--sample-seed", type=int, default=0, metavar="SEED",
+                        help="--sample 的随机种子，相同的文件和种子抽到相同的样本")
+    parser.add_argument("--include-generated", action="store_true",
+                        help="不跳过生成代码（*.g.cs、*.Designer.cs、<auto-generated> 等）")
+    parser.add_argument("--max-file-size", type=int, default=1024 * 1024, metavar="BYTES",
+                        help="文件大小上限（字节），超过时跳过，0表示不限制")
+    parser.add_argument("--line-memo-size", type=int, default=65536, metavar="N",
+                        help="跨文件按行文本缓存规则结果的LRU容量，0表示不缓存")
+    args = parser.parse_args(argv)
+
+    args.output = args.output_option or args.output or "csharp_style_report.html"
+    modes = (args.files_from, args.stdin_content, args.git_index, args.lsp, args.projects, args.batch,
+             args.report_from)
+    if sum(bool(mode) for mode in modes) > 1:
+        parser.error("--files-from、--stdin-content、--git-index、--lsp、--projects、--batch 与 --report-from 不能同时使用")
+    if args.report_from:
+        if args.path:
+            parser.error("使用 --report-from 时不能再指定路径参数，请用 -o 指定报告路径")
+        if args.profiles or args.sample or args.save_result:
+            parser.error("--report-from 不能与 --profiles、--sample 或 --save-result 一起使用")
+    elif args.batch:
+        if args.path:
+            parser.error("使用 --batch 时不能再指定路径参数，请用 -o 指定汇总索引路径")
+        for option, value in (("--profiles", args.profiles), ("--custom-rules", args.custom_rules),
+                              ("--include-generated", args.include_generated), ("--sample", args.sample),
+                              ("--index-cache", args.index_cache), ("--result-db", args.result_db)):
+            if value:
+                parser.error(f"--batch 不能与 {option} 一起使用，规则和选项请写在批量清单中")
+    elif args.lsp:
+        if args.path or args.profiles:
+            parser.error("--lsp 不能指定路径参数或 --profiles")
+    elif args.files_from or args.stdin_content:
+        if args.path:
+            parser.error("使用 --files-from 或 --stdin-content 时不能再指定路径参数，请用 -o 指定报告路径")
+    elif args.git_index:
+        args.path = args.path or "."
+    elif not args.path:
+        parser.error("需要指定文件或目录路径")
+    if args.stdin_content and not args.stdin_filename:
+        parser.error("--stdin-content 需要同时指定 --stdin-filename")
+    if args.null and not args.files_from:
+        parser.error("--null 只能与 --files-from 一起使用")
+    if args.sample and (args.stdin_content or args.git_index or args.lsp):
+        parser.error("--sample 不能与 --stdin-content、--git-index 或 --lsp 一起使用")
+    if args.profiles and (args.stdin_content or args.git_index):
+        parser.error("--profiles 不能与 --stdin-content 或 --git-index 一起使用")
+    if args.custom_rules and args.profiles:
+        parser.error("使用 --profiles 时请把自定义规则写在配置方案文件的 custom_rules 中")
+    if args.report_cache and args.report_format != "html":
+        parser.error("--report-cache 只能用于 html 格式的报告")
+    if args.exclude_assembly and not args.projects:
+        parser.error("--exclude-assembly 只能与 --projects 一起使用")
+    if args.git_cache and not args.git_index:
+        parser.error("--git-cache 只能与 --git-index 一起使用")
+    return args
+
+
+def iter_input_files(checker: StyleChecker, args):
+    """按命令行指定的输入方式产生待检查的文件路径"""
+    if args.files_from:
+        print(f"正在检查文件列表: {args.files_from}")
+        if args.files_from == '-':
+            yield from iter_file_list(sys.stdin.buffer, null_delimited=args.null)
+            return
+        with open(args.files_from, 'rb') as stream:
+            yield from iter_file_list(stream, null_delimited=args.null)
+        return
+
+    if os.path.isfile(args.path):
+        print(f"正在检查文件: {args.path}")
+        yield args.path
+        return
+
+    print(f"正在检查目录: {args.path}")
+    yield from checker.find_source_files(args.path)
+
+
+def input_file_paths(checker: StyleChecker, args):
+    """待检查的文件：目录和单个文件展开为列表，文件列表保持流式读取"""
+    file_paths = iter_input_files(checker, args)
+    return file_paths if args.files_from else list(file_paths)
+
+
+def draw_sample(args, file_paths) -> StratifiedSample:
+    """按 --sample 从待检查的文件中分层抽样"""
+    fraction, count = args.sample
+    sample = StratifiedSample(list(file_paths), fraction, count, seed=args.sample_seed)
+    print(f"抽样检查: 从 {sample.population} 个文件中抽取 {sample.sample_size} 个（{len(sample.strata)} 层）")
+    return sample
+
+
+def run_check(checker: StyleChecker, args):
+    """按命令行指定的输入方式执行检查"""
+    if args.stdin_content:
+        print(f"正在检查标准输入内容: {args.stdin_filename}")
+        source_code = sys.stdin.buffer.read().decode('utf-8')
+        return checker.check_source(source_code, args.stdin_filename)
+
+    if args.git_index:
+        print(f"正在检查git暂存区: {os.path.abspath(args.path)}")
+        return checker.check_git_index(args.path, cache_path=args.git_cache)
+
+    if not args.sample:
+        return checker.check_files(input_file_paths(checker, args))
+    sample = draw_sample(args, input_file_paths(checker, args))
+    result = checker.check_files(sample.file_paths)
+    result.estimate = sample.estimate(result)
+    return result
+
+
+def run_batch(checker: StyleChecker, roots):
+    """批量检查各根目录
+
+    返回 ({结果名称: 检查结果}, {结果名称: 报告路径}, {结果名称: 报告格式}, 汇总索引条目)，
+    结果名称为根目录名称，使用多套配置方案时为 <根目录名称>.<配置名>。
+    """
+    print(f"批量检查 {len(roots)} 个根目录:")
+    units = []
+    for root in roots:
+        file_paths = [root.path] if os.path.isfile(root.path) else checker.find_source_files(root.path)
+        print(f"  {root.name}: {root.path} ({len(file_paths)} 个文件)")
+        units.append(root.create_unit(file_paths))
+    checker.check_units(units)
+
+    results, outputs, report_formats = OrderedDict(), {}, {}
+    index_entries = []
+    for root, unit in zip(roots, units):
+        root_outputs = root.output_paths(list(unit.sinks))
+        reports = OrderedDict()
+        for profile_name, result in unit.sinks.items():
+            name = root.name if profile_name == DEFAULT_PROFILE else f"{root.name}.{profile_name}"
+            results[name] = result
+            outputs[name] = root_outputs[profile_name]
+            report_formats[name] = root.report_format
+            reports[profile_name] = (result, outputs[name])
+            os.makedirs(os.path.dirname(os.path.abspath(outputs[name])), exist_ok=True)
+        index_entries.append((root.name, root.path, reports))
+    return results, outputs, report_formats, index_entries
+
+
+def print_summary(result, output):
+    """输出检查摘要"""
+    print(f"检查完成! 共检查 {result.total_files} 个文件，发现 {result.total_issues} 个问题.")
+    print(f"错误: {result.error_count}, 警告: {result.warning_count}, 提示: {result.info_count}")
+    if result.by_category:
+        categories = sorted(result.by_category.items(), key=lambda item: -item[1])
+        print("按类别: " + ", ".join(f"{category} {count}" for category, count in categories))
+    if result.skipped_count:
+        print(f"跳过生成代码: {result.skipped_count} 个文件")
+    if result.by_assembly:
+        print("按程序集:")
+        for name, summary in sorted(result.by_assembly.items(), key=lambda item: (-item[1]["issues"], item[0])):
+            print(f"  {name}: {summary['files']} 个文件, {summary['issues']} 个问题 "
+                  f"(错误 {summary['error']}, 警告 {summary['warning']}, 提示 {summary['info']})")
+    if result.estimate is not None:
+        print(result.estimate.description() + ":")
+        for name, value in result.estimate.totals.items():
+            print(f"  {TOTAL_LABELS[name]}: 约 {value.total:.0f} (95% 置信区间 {value.low:.0f} - {value.high:.0f})")
+    print(f"HTML报告已生成: {os.path.abspath(output)}")
+
+
+def print_memory_summary(budget: MemoryBudget):
+    """输出各阶段的内存峰值和降级情况"""
+    peaks = ", ".join(f"{phase} {peak / 1024 / 1024:.0f} MB" for phase, peak in budget.phase_peaks.items())
+    print(f"\n内存峰值（上限 {budget.limit_bytes / 1024 / 1024:.0f} MB）: {peaks or '无法测量'}")
+    for message in budget.degradations:
+        print(f"内存降级: {message}")
+
+
+def print_memo_summary(memo_stats):
+    """输出行缓存的命中情况，没有分析任何行时不输出"""
+    labels = {'line_rules': '逐行规则', 'declarations': '声明提取'}
+    parts = [f"{labels.get(name, name)} 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次 ({stats['hit_rate']:.0%})"
+             for name, stats in memo_stats.items() if stats['hits'] or stats['misses']]
+    if parts:
+        print("\n行缓存: " + "; ".join(parts))
 
 
 def main():
     """主程序入口"""
-    if len(sys.argv) < 2:
-        print("用法: python main.py <文件或目录路径> [输出报告路径]")
-        return 1
+    args = parse_args()
 
-    path = sys.argv[1]
-    output = sys.argv[2] if len(sys.argv) > 2 else "csharp_style_report.html"
+    output = args.output
     try:
         # 初始化检查器
-        checker = StyleChecker()
+        checker = StyleChecker(time_budget=args.time_budget, workers=args.jobs,
+                               symbol_index_cache=args.index_cache,
+                               skip_generated=not args.include_generated,
+                               max_file_size=args.max_file_size or None,
+                               line_memo_size=args.line_memo_size)
+
+        if args.custom_rules:
+            checker.rules.extend(load_custom_rules(args.custom_rules))
+        if args.lsp:
+            # 标准输出用于协议消息，不输出进度和摘要
+            checker.symbol_index = checker.load_symbol_index()
+            return LanguageServer(checker, JsonRpcStream(sys.stdin.buffer.raw, sys.stdout.buffer)).serve()
+        if args.progress if args.progress is not None else sys.stderr.isatty():
+            checker.progress = ProgressReporter()
+        if args.metrics_file:
+            checker.metrics = CheckMetrics()
+        if args.result_db:
+            checker.result_store = SqliteResultStore(args.result_db)
+        if args.memory_limit:
+            checker.memory_budget = MemoryBudget(args.memory_limit)
+        checker.deduplicate = args.dedup
 
         # 执行检查
-        if os.path.isfile(path):
-            print(f"正在检查文件: {path}")
-            result = checker.check_files([path])
+        report_formats = {}
+        index_entries = None
+        if args.report_from:
+            print(f"正在读取检查结果: {args.report_from}")
+            results = {DEFAULT_PROFILE: BinaryCheckResult(args.report_from)}
+            outputs = {DEFAULT_PROFILE: output}
+        elif args.batch:
+            batch_roots, index_path = load_manifest(args.batch, args.output_option)
+            results, outputs, report_formats, index_entries = run_batch(checker, batch_roots)
+        elif args.projects:
+            print(f"正在按项目文件检查: {args.path}")
+            assemblies = load_assemblies(args.path, args.exclude_assembly)
+            print(f"共 {len(assemblies)} 个程序集, {sum(len(assembly.files) for assembly in assemblies)} 个源文件")
+            sample = None
+            if args.sample:
+                sample = draw_sample(args, OrderedDict.fromkeys(path for assembly in assemblies for path in assembly.files))
+                chosen = set(sample.file_paths)
+                for assembly in assemblies:
+                    assembly.files = [path for path in assembly.files if path in chosen]
+            profiles = load_profiles(args.profiles) if args.profiles else None
+            results = checker.check_assemblies(assemblies, profiles)
+            if sample is not None:
+                for result in results.values():
+                    result.estimate = sample.estimate(result)
+            outputs = {name: profile_output_path(output, name) if args.profiles else output for name in results}
+        elif args.profiles:
+            # 一次扫描，按每个配置方案分别生成报告
+            profiles = load_profiles(args.profiles)
+            file_paths = input_file_paths(checker, args)
+            sample = draw_sample(args, file_paths) if args.sample else None
+            results = checker.check_profiles(profiles, sample.file_paths if sample is not None else file_paths)
+            if sample is not None:
+                for result in results.values():
+                    result.estimate = sample.estimate(result)
+            outputs = {name: profile_output_path(output, name) for name in results}
         else:
-            print(f"正在检查目录: {path}")
-            result = checker.check_directory(path)
+            results = {DEFAULT_PROFILE: run_check(checker, args)}
+            outputs = {DEFAULT_PROFILE: output}
+        if args.compress:
+            outputs = {name: path if path.endswith('.gz') else path + '.gz' for name, path in outputs.items()}
+
+        if args.save_result:
+            with measure_phase(checker.metrics, 'save_result'):
+                for name, result in results.items():
+                    result_path = args.save_result if len(results) == 1 else profile_output_path(args.save_result, name)
+                    write_result_file(result, result_path)
+                    print(f"检查结果已保存: {result_path}")
 
         # 生成报告
-        reporter = HtmlReporter()
-        reporter.generate_report(result, output)
+        fragment_cache = None
+        if args.report_cache:
+            fragment_cache = FragmentCache(args.report_cache, HtmlReporter.fragment_fingerprint())
+        reporters = {"html": HtmlReporter(fragment_cache), "data": DataHtmlReporter()}
+        with measure_phase(checker.metrics, 'report'):
+            for name, result in results.items():
+                reporters[report_formats.get(name, args.report_format)].generate_report(result, outputs[name])
+                if checker.memory_budget is not None:
+                    checker.memory_budget.sample('report')
+            if index_entries is not None:
+                BatchIndexReporter().generate_index(index_entries, index_path)
+        if fragment_cache is not None:
+            fragment_cache.prune()
+
+        if args.metrics_file:
+            checker.metrics.write_prometheus(args.metrics_file, results, checker.memory_budget,
+                                             checker.memo_stats())
 
         # 输出摘要
         print("\n检查摘要:")
-        print(f"检查完成! 共检查 {result.total_files} 个文件，发现 {result.total_issues} 个问题.")
-        print(f"错误: {result.error_count}, 警告: {result.warning_count}, 提示: {result.info_count}")
-        print(f"HTML报告已生成: {os.path.abspath(output)}")
+        for name, result in results.items():
+            if args.profiles or args.batch:
+                print(f"\n[{name}]")
+            print_summary(result, outputs[name])
+        if checker.duplicate_index is not None and checker.duplicate_index.duplicate_files:
+            print(f"\n重复文件: {checker.duplicate_index.summary()}")
+        if checker.memory_budget is not None:
+            print_memory_summary(checker.memory_budget)
+            checker.memory_budget.close()
+        if fragment_cache is not None:
+            print(f"\n报告片段缓存: 复用 {fragment_cache.hits} 个, 重新渲染 {fragment_cache.misses} 个")
+        print_memo_summary(checker.memo_stats())
+        if args.report_from:
+            results[DEFAULT_PROFILE].close()
+        if index_entries is not None:
+            print(f"\n汇总索引: {os.path.abspath(index_path)}")
+        if args.result_db:
+            checker.result_store.close()
+            print(f"检查结果数据库: {os.path.abspath(args.result_db)}")
 
         return 0
     except Exception as e:
@@ -50,4 +418,3 @@ def main():
 
 if __name__ == "__main__":
     sys.exit(main())
-
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""按程序集检查：被多个项目包含的文件只分析一次，结果计入每一个程序集"""
+
+import os
+
+from csharp_style_checker.core.result_file import BinaryCheckResult, write_result_file
+from csharp_style_checker.core.style_checker import StyleChecker
+from csharp_style_checker.utils.project_files import load_assemblies
+
+
+SHARED = '''class shared
+{
+    private int value;
+}
+'''
+
+OWN = '''class {name}
+{{
+    void run() {{ }}
+}}
+'''
+
+PROJECT = '''<Project ToolsVersion="15.0">
+  <PropertyGroup><AssemblyName>{name}</AssemblyName></PropertyGroup>
+  <ItemGroup>
+    <Compile Include="{name}.cs" />
+    <Compile Include="..\\Shared\\Shared.cs" />
+  </ItemGroup>
+</Project>
+'''
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _make_projects(root):
+    _write(os.path.join(root, 'Shared', 'Shared.cs'), SHARED)
+    for name in ('Game', 'Tools'):
+        _write(os.path.join(root, name, f'{name}.cs'), OWN.format(name=name.lower()))
+        _write(os.path.join(root, name, f'{name}.csproj'), PROJECT.format(name=name))
+    return load_assemblies(root)
+
+
+def test_shared_file_counts_toward_every_assembly(tmp_path):
+    assemblies = _make_projects(str(tmp_path))
+    assert [assembly.name for assembly in assemblies] == ['Game', 'Tools']
+
+    result = StyleChecker().check_assemblies(assemblies)['default']
+    # 共享文件只分析一次
+    assert result.total_files == 3
+    shared = [code_file for code_file in result.code_files if code_file.file_name == 'Shared.cs']
+    assert len(shared) == 1
+    assert shared[0].assemblies == ['Game', 'Tools']
+    assert shared[0].assembly == 'Game'
+
+    shared_issues = len(shared[0].issues)
+    for name in ('Game', 'Tools'):
+        own = next(code_file for code_file in result.code_files if code_file.file_name == f'{name}.cs')
+        summary = result.by_assembly[name]
+        assert summary['files'] == 2
+        assert summary['issues'] == shared_issues + len(own.issues)
+
+
+def test_assemblies_survive_result_file(tmp_path):
+    assemblies = _make_projects(str(tmp_path / 'src'))
+    result = StyleChecker().check_assemblies(assemblies)['default']
+    result_path = str(tmp_path / 'r.cscr')
+    write_result_file(result, result_path)
+
+    loaded = BinaryCheckResult(result_path)
+    try:
+        assert loaded.by_assembly == result.by_assembly
+        assert [code_file.assemblies for code_file in loaded.iter_code_files()] == \
+            [code_file.assemblies for code_file in result.code_files]
+    finally:
+        loaded.close()
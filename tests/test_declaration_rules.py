@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""声明表驱动的命名规则：固定每种声明形式的检测结果，包括改用声明提取器后新增或去掉的检测"""
+
+import pytest
+
+from csharp_style_checker.core.style_checker import StyleChecker
+
+
+NAMING_RULES = ('CSN001', 'CS0002', 'CSN003', 'CSN005', 'CS0010', 'CS0007', 'CS0009')
+
+
+def _member(line):
+    return 'class A\n{\n    ' + line + '\n}\n'
+
+
+# (源码, 期望的 (行, 列, 规则) 集合)
+DECLARATION_SHAPES = {
+    # 位于行首的类型声明
+    'interface_at_line_start': ('interface foo\n{\n}\n', {(1, 11, 'CS0002')}),
+    'generic_interface_at_line_start': ('interface Foo<T>\n{\n}\n', {(1, 11, 'CS0002')}),
+    'struct_at_line_start': ('struct bar\n{\n}\n', {(1, 8, 'CSN003')}),
+    'class_at_line_start': ('class baz\n{\n}\n', {(1, 7, 'CSN001')}),
+    'generic_class_at_line_start': ('class a<T>\n{\n}\n', {(1, 7, 'CSN001')}),
+    # 紧跟在特性或花括号之后的类型声明
+    'class_after_attribute': ('[Serializable]class foo\n{\n}\n', {(1, 21, 'CSN001')}),
+    'struct_after_brace': ('class A{struct b{}}\n', {(1, 16, 'CSN003')}),
+    # 私有字段：私有修饰符后还有其他修饰符
+    'private_readonly_field': (_member('private readonly int Count;'), {(3, 26, 'CSN005')}),
+    'private_volatile_field': (_member('private volatile int count;'), {(3, 26, 'CSN005')}),
+    'private_event_field': (_member('private event Action onDone;'), {(3, 26, 'CSN005')}),
+    'private_readonly_generic_field': (_member('private readonly Dictionary<int, string[]> lookup;'),
+                                       {(3, 48, 'CSN005'), (3, 48, 'CS0009')}),
+    # 私有字段：泛型参数含空格、可空类型、多维数组
+    'generic_arguments_with_spaces': (_member('private Dictionary<string, int> scoreMap;'), {(3, 37, 'CSN005')}),
+    'nested_generic_arguments': (_member('private Dictionary<string, List<int>> scoreMap;'), {(3, 43, 'CSN005')}),
+    'nullable_field': (_member('private int? maybe;'), {(3, 18, 'CSN005')}),
+    'multidimensional_array_field': (_member('private int[,] grid;'), {(3, 20, 'CSN005')}),
+    'generic_collection_field': (_member('private List<string> playerNames;'), {(3, 26, 'CSN005')}),
+    # 没有访问修饰符的静态字段和常量
+    'static_field_without_access': (_member('static int Other;'), {(3, 16, 'CS0010')}),
+    'static_field_with_initializer': (_member('static int Other = 1;'), {(3, 16, 'CS0010')}),
+    'static_generic_field': (_member('static List<int> Others;'), {(3, 22, 'CS0010')}),
+    'const_without_access': (_member('const int other = 1;'), {(3, 15, 'CS0007')}),
+    'string_const_without_access': (_member('const string other = "x";'), {(3, 18, 'CS0007')}),
+    # 修饰符不变的写法保持原有结果
+    'private_field': (_member('private int count;'), {(3, 17, 'CSN005')}),
+    'public_static_field': (_member('public static int other;'), {(3, 23, 'CS0010')}),
+    'private_const': (_member('private const int maxValue = 1;'), {(3, 23, 'CS0007')}),
+    # 字符串字面量中的声明文本不报告
+    'class_in_string': (_member('string s = "class foo";'), set()),
+    'interface_in_string': (_member('string s = "interface foo";'), set()),
+    'private_field_in_string': (_member('string s = "private int count;";'), set()),
+    'static_field_in_string': (_member('void R() { Console.WriteLine("static int other;"); }'), set()),
+}
+
+
+@pytest.mark.parametrize('name', sorted(DECLARATION_SHAPES))
+def test_declaration_shape(name):
+    source, expected = DECLARATION_SHAPES[name]
+    code_file = StyleChecker().analyze_source(source, f'{name}.cs')
+    found = {(issue.line, issue.column, issue.rule_id) for issue in code_file.issues if issue.rule_id in NAMING_RULES}
+    assert found == expected
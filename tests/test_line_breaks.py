@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""行号与 str.splitlines() 一致：各规则和报告中的代码预览使用同一套换行符"""
+
+import random
+import re
+
+import pytest
+
+from csharp_style_checker.core.style_checker import StyleChecker
+from csharp_style_checker.reporters.data_html_reporter import DataHtmlReporter
+from csharp_style_checker.rules.readability_rules import LineIsTooLongRule
+
+
+LINE_BREAKS = ['\n', '\r\n', '\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e', '\x85', '\u2028', '\u2029']
+
+
+def _expected_long_lines(source, max_length=100):
+    return [(number, len(line)) for number, line in enumerate(source.splitlines(), 1) if len(line) > max_length]
+
+
+def _long_lines(source):
+    rule = LineIsTooLongRule()
+    return [(issue.line, int(issue.message.split('(')[1].split()[0])) for issue in rule.analyze(None, source, 'a.cs')]
+
+
+@pytest.mark.parametrize('line_break', LINE_BREAKS)
+def test_long_line_numbers_follow_splitlines(line_break):
+    source = line_break.join(['int a = 1;', 'string s = "a\u2028b";', '// ' + 'z' * 300, 'x' * 101, ''])
+    assert _long_lines(source) == _expected_long_lines(source)
+
+
+def test_lone_carriage_returns_are_line_breaks():
+    # git 暂存区中的 blob 不做换行符转换，只用 \r 换行的文件不应被当成一整行
+    assert _long_lines('// a\r' * 40) == []
+    code_file = StyleChecker().analyze_source('// a\r' * 40, 'a.cs')
+    assert all(issue.rule_id != 'CSR001' for issue in code_file.issues)
+
+
+def test_random_line_breaks():
+    rng = random.Random(1)
+    for _ in range(2000):
+        parts = []
+        for _ in range(rng.randint(0, 8)):
+            parts.append('x' * rng.choice([0, 5, 100, 101, 150]))
+            parts.append(rng.choice(LINE_BREAKS))
+        source = ''.join(parts)
+        assert _long_lines(source) == _expected_long_lines(source), repr(source)
+
+
+def test_report_preview_splits_like_splitlines(tmp_path):
+    path = str(tmp_path / 'report.html')
+    DataHtmlReporter().generate_report(StyleChecker().check_files([]), path)
+    with open(path, encoding='utf-8') as f:
+        # 页面脚本中的正则表达式只用到 Python 也支持的语法
+        line_break = re.compile(re.search(r'var LINE_BREAK = /(.+)/;', f.read()).group(1))
+    for line_break_char in LINE_BREAKS:
+        source = line_break_char.join(['a', '', 'b' + line_break_char + 'c', 'd'])
+        assert line_break.split(source) == source.splitlines()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""编辑器文档的增量编辑：行内容、逐行结果和文件级问题随编辑正确移动，位置按 UTF-16 码元换算"""
+
+import random
+
+import pytest
+
+from csharp_style_checker.lsp.document import TextDocument, index_to_utf16, split_lines, utf16_to_index
+from csharp_style_checker.models.code_issue import CodeIssue
+
+
+SOURCE = 'class A\n{\n    int a;\n    int b;\n}'
+
+# 表情符号在 UTF-16 中是代理对，占两个码元
+EMOJI = '\U0001F600'
+
+
+def _change(start_line, start_character, end_line, end_character, text):
+    return {
+        'range': {
+            'start': {'line': start_line, 'character': start_character},
+            'end': {'line': end_line, 'character': end_character},
+        },
+        'text': text,
+    }
+
+
+def _document(text=SOURCE):
+    document = TextDocument('file:///a.cs', 'a.cs', text)
+    # 模拟已经计算过的逐行结果，便于检查哪些行失效
+    document.line_results = [('line', index) for index in range(len(document.lines))]
+    return document
+
+
+def _issue(line, rule_id='CSN001'):
+    return CodeIssue(line=line, column=1, message='m', rule_id=rule_id, severity='warning', file_path='a.cs')
+
+
+def _utf16_offset(lines, line, character):
+    """参考实现：按UTF-16编码后的码元数定位"""
+    offset = sum(len(text) + 1 for text in lines[:line])
+    return offset + len(lines[line].encode('utf-16-le')[:character * 2].decode('utf-16-le'))
+
+
+def test_utf16_positions_with_surrogate_pairs():
+    line = 'a' + EMOJI + 'b' + EMOJI
+    assert [index_to_utf16(line, index) for index in range(len(line) + 1)] == [0, 1, 3, 4, 6]
+    assert [utf16_to_index(line, units) for units in (0, 1, 3, 4, 6)] == [0, 1, 2, 3, 4]
+    # 超出行尾的位置落在行尾
+    assert utf16_to_index(line, 100) == len(line)
+    assert utf16_to_index('abc', 100) == 3
+    assert index_to_utf16('中文', 1) == 1
+
+
+def test_insert_within_line_keeps_other_results():
+    document = _document()
+    document.apply_change(_change(2, 8, 2, 9, 'count'))
+    assert document.lines == ['class A', '{', '    int count;', '    int b;', '}']
+    assert document.line_results == [('line', 0), ('line', 1), None, ('line', 3), ('line', 4)]
+    assert document.file_issues_stale
+
+
+def test_multi_line_replacement():
+    document = _document()
+    document.apply_change(_change(2, 4, 3, 9, 'string s;\n    float f;\n    bool c'))
+    assert document.text == 'class A\n{\n    string s;\n    float f;\n    bool c;\n}'
+    assert document.line_results == [('line', 0), ('line', 1), None, None, None, ('line', 4)]
+
+
+def test_delete_across_lines():
+    document = _document()
+    document.apply_change(_change(1, 1, 3, 10, ''))
+    assert document.lines == ['class A', '{', '}']
+    assert document.line_results == [('line', 0), None, ('line', 4)]
+
+
+def test_insert_line_breaks_of_every_kind():
+    document = _document()
+    document.apply_change(_change(2, 10, 2, 10, '\r\n    int c;\r    int d;\n'))
+    assert document.lines == ['class A', '{', '    int a;', '    int c;', '    int d;', '', '    int b;', '}']
+
+
+def test_edit_at_end_of_file():
+    document = _document()
+    document.apply_change(_change(4, 1, 4, 1, '\n// end'))
+    assert document.text == SOURCE + '\n// end'
+    assert document.line_results[:4] == [('line', 0), ('line', 1), ('line', 2), ('line', 3)]
+    assert document.line_results[4:] == [None, None]
+
+
+def test_range_ending_past_last_line_replaces_to_end_of_file():
+    # 编辑器用下一行的第0列表示文件末尾
+    document = _document()
+    document.apply_change(_change(3, 0, 5, 0, '}'))
+    assert document.lines == ['class A', '{', '    int a;', '}']
+    document.apply_change(_change(4, 0, 4, 0, '\n'))
+    assert document.lines == ['class A', '{', '    int a;', '}', '']
+
+
+def test_edit_after_surrogate_pair():
+    document = _document('// ' + EMOJI + 'x\nint a;')
+    # 'x' 位于第 5 个码元（下标 4 的字符）
+    document.apply_change(_change(0, 5, 0, 6, 'y'))
+    assert document.lines[0] == '// ' + EMOJI + 'y'
+    document.apply_change(_change(0, 3, 1, 3, ''))
+    assert document.lines == ['//  a;']
+
+
+def test_full_replacement_resets_results():
+    document = _document()
+    document.file_issues = [_issue(1)]
+    document.apply_change({'text': 'class B\r\n{\r\n}'})
+    assert document.lines == ['class B', '{', '}']
+    assert document.line_results == [None, None, None]
+    assert document.file_issues == []
+
+
+def test_file_issues_shift_with_edits():
+    document = _document()
+    document.file_issues = [_issue(1), _issue(3, 'CSN005'), _issue(4, 'CSN004'), _issue(5, 'CSN003')]
+    document.file_issues_stale = False
+
+    # 第 2 行之后插入两行：之后的问题下移两行
+    document.apply_change(_change(1, 1, 1, 1, '\n    int x;\n    int y;'))
+    assert document.file_issues_stale
+    assert [(issue.line, issue.rule_id) for issue in document.file_issues] == \
+        [(1, 'CSN001'), (5, 'CSN005'), (6, 'CSN004'), (7, 'CSN003')]
+
+    # 删除第 5、6 行（从第 4 行行尾到第 6 行行尾）：范围内的问题丢弃，之后的问题上移
+    document.apply_change(_change(3, 10, 5, 10, ''))
+    assert document.lines == ['class A', '{', '    int x;', '    int y;', '}']
+    assert [(issue.line, issue.rule_id) for issue in document.file_issues] == [(1, 'CSN001'), (5, 'CSN003')]
+    assert all(issue.file_path == 'a.cs' and issue.severity == 'warning' for issue in document.file_issues)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_edits_match_reference(seed):
+    rng = random.Random(seed)
+    alphabet = ['a', ' ', ';', '\n', '\r\n', '中', EMOJI]
+    text = SOURCE
+    document = TextDocument('file:///a.cs', 'a.cs', text)
+    for _ in range(200):
+        lines = split_lines(text)
+        positions = sorted(
+            (line, index_to_utf16(lines[line], rng.randint(0, len(lines[line]))))
+            for line in (rng.randrange(len(lines)), rng.randrange(len(lines)))
+        )
+        (start_line, start_character), (end_line, end_character) = positions
+        new_text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+        document.apply_change(_change(start_line, start_character, end_line, end_character, new_text))
+
+        flat = '\n'.join(lines)
+        start = _utf16_offset(lines, start_line, start_character)
+        end = _utf16_offset(lines, end_line, end_character)
+        text = '\n'.join(split_lines(flat[:start] + new_text + flat[end:]))
+        assert document.text == text
+        assert len(document.line_results) == len(document.lines)
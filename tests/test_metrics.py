@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""阶段耗时：内层阶段从外层阶段中扣除，各阶段耗时之和不超过总耗时"""
+
+import time
+
+from csharp_style_checker.core.style_checker import StyleChecker
+from csharp_style_checker.utils.metrics import CheckMetrics, measure_phase
+
+
+def test_nested_phase_is_not_counted_twice():
+    metrics = CheckMetrics()
+    start = time.perf_counter()
+    with metrics.phase('analyze'):
+        time.sleep(0.02)
+        with metrics.phase('declarations'):
+            time.sleep(0.05)
+        with measure_phase(metrics, 'declarations'):
+            time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+
+    assert metrics.phase_seconds['declarations'] >= 0.1
+    assert 0.02 <= metrics.phase_seconds['analyze'] < 0.06
+    assert sum(metrics.phase_seconds.values()) <= elapsed
+
+
+def test_check_phases_do_not_overlap(tmp_path):
+    paths = []
+    for index in range(20):
+        path = tmp_path / f'File{index}.cs'
+        path.write_text('class foo%d\n{\n    private int count;\n    static int Total;\n}\n' % index, encoding='utf-8')
+        paths.append(str(path))
+
+    checker = StyleChecker()
+    checker.metrics = CheckMetrics()
+    start = time.perf_counter()
+    checker.check_files(paths)
+    elapsed = time.perf_counter() - start
+
+    phases = checker.metrics.phase_seconds
+    assert {'read', 'analyze', 'declarations'} <= set(phases)
+    assert sum(phases.values()) <= elapsed
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""对抗性输入的回归测试：规则模式在超长行上保持线性，时间预算能中断逐行规则"""
+
+import time
+
+import pytest
+
+from csharp_style_checker.core.style_checker import StyleChecker
+from csharp_style_checker.rules.custom_rules import compile_custom_rules
+
+
+# 每个对抗性文件允许的分析时间（秒），旧的回溯模式在 1K 字符的行上就无法结束
+TIME_LIMIT = 5.0
+
+ADVERSARIAL_SOURCES = {
+    'generic_arguments': 'private List<' + 'a, ' * 20000,
+    'modifier_run': 'public static ' * 20000,
+    'minified': 'class A{' + 'int a=1;void f(){if(a>0){a--;}}' * 3300 + '}',
+    'unclosed_generic': 'public Dictionary<' * 10000 + 'int x;',
+    'whitespace': 'class' + ' ' * 100000 + 'Foo',
+    'brace_keywords': 'if (x) { ' * 20000,
+}
+
+
+@pytest.mark.parametrize('name', sorted(ADVERSARIAL_SOURCES))
+@pytest.mark.parametrize('line_memo_size', [65536, 0])
+def test_adversarial_line_is_linear(name, line_memo_size):
+    checker = StyleChecker(line_memo_size=line_memo_size)
+    source = ADVERSARIAL_SOURCES[name]
+    start = time.perf_counter()
+    code_file = checker.analyze_source(source, f'{name}.cs')
+    elapsed = time.perf_counter() - start
+    assert elapsed < TIME_LIMIT, f"{name}: {elapsed:.2f}s"
+    assert all(issue.rule_id != 'ANALYSIS_ERROR' for issue in code_file.issues)
+
+
+def _slow_custom_rules():
+    # 每行都要指数级回溯：单行只需几十毫秒，但整个文件远超时间预算
+    return compile_custom_rules([{
+        'id': 'CUS900',
+        'pattern': '(a|aa)+b',
+        'message': 'slow',
+    }])
+
+
+@pytest.mark.parametrize('line_memo_size', [65536, 0])
+def test_time_budget_interrupts_line_rules(line_memo_size):
+    checker = StyleChecker(time_budget=0.2, line_memo_size=line_memo_size)
+    # 各行内容不同，行缓存无法命中
+    source = '\n'.join('a' * 22 + ' ' * (i % 50) + str(i) for i in range(400))
+    start = time.perf_counter()
+    code_file = checker.analyze_source(source, 'slow.cs', rules=_slow_custom_rules())
+    elapsed = time.perf_counter() - start
+    timeouts = [issue for issue in code_file.issues if issue.rule_id == 'TIMEOUT']
+    assert len(timeouts) == 1
+    assert 'CUS900' in timeouts[0].message
+    # 不中断时全部400行需要数秒；逐行检查截止时间后只多出一行的耗时
+    assert elapsed < 1.5, f"{elapsed:.2f}s"
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""二进制结果文件的写入和读取：汇总、问题、源码和抽样外推结果都能原样恢复"""
+
+import os
+import re
+
+from csharp_style_checker.core.result_file import BinaryCheckResult, join_message, split_message, write_result_file
+from csharp_style_checker.core.style_checker import StyleChecker
+from csharp_style_checker.reporters.html_reporter import HtmlReporter
+from csharp_style_checker.utils.sampling import StratifiedSample
+
+
+SOURCE = '''using System;
+
+class foo
+{
+    private int count;
+    public static int Total;
+    const int maxValue = 10;
+    void run() { }
+}
+'''
+
+
+def _write_sources(directory, count):
+    paths = []
+    for index in range(count):
+        sub = os.path.join(str(directory), f'dir{index % 3}')
+        os.makedirs(sub, exist_ok=True)
+        path = os.path.join(sub, f'File{index}.cs')
+        # 每隔几个文件放一份内容相同的副本，结果文件中源码只保存一次
+        body = SOURCE if index % 4 else SOURCE.replace('foo', f'foo{index}')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(body + '\n' * (index % 5))
+        paths.append(path)
+    return paths
+
+
+def _issues(result):
+    return [(code_file.file_path, code_file.file_name, code_file.assemblies, code_file.file_content,
+             [(issue.line, issue.column, issue.rule_id, issue.severity, issue.message, issue.file_path)
+              for issue in code_file.issues])
+            for code_file in result.iter_code_files()]
+
+
+def _report(result, path):
+    HtmlReporter().generate_report(result, path)
+    with open(path, encoding='utf-8') as f:
+        # 报告生成时间不同
+        return re.sub(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', '', f.read())
+
+
+def test_round_trip(tmp_path):
+    paths = _write_sources(tmp_path / 'src', 12)
+    result = StyleChecker().check_files(paths)
+    for code_file in result.code_files[:5]:
+        code_file.assemblies = ['Game']
+    result.code_files[0].assemblies.append('Tools')
+    result_path = str(tmp_path / 'r.cscr')
+    write_result_file(result, result_path)
+
+    loaded = BinaryCheckResult(result_path)
+    try:
+        assert loaded.total_files == result.total_files
+        assert loaded.total_issues == result.total_issues
+        assert loaded.by_severity == result.by_severity
+        assert loaded.by_rule == result.by_rule
+        assert loaded.by_category == result.by_category
+        assert loaded.estimate is None
+        assert _issues(loaded) == _issues(result)
+        assert list(loaded.iter_file_summaries()) == list(result.iter_file_summaries())
+    finally:
+        loaded.close()
+
+
+def test_round_trip_keeps_sample_estimate(tmp_path):
+    paths = _write_sources(tmp_path / 'src', 40)
+    sample = StratifiedSample(paths, count=10, seed=3)
+    result = StyleChecker().check_files(sample.file_paths)
+    result.estimate = sample.estimate(result)
+    result_path = str(tmp_path / 's.cscr')
+    write_result_file(result, result_path)
+
+    loaded = BinaryCheckResult(result_path)
+    try:
+        estimate = loaded.estimate
+        assert estimate is not None
+        assert estimate.description() == result.estimate.description()
+        for name in ('totals', 'by_rule'):
+            original = getattr(result.estimate, name)
+            restored = getattr(estimate, name)
+            assert list(restored) == list(original)
+            for key, value in original.items():
+                assert (restored[key].observed, restored[key].total, restored[key].margin) == \
+                    (value.observed, value.total, value.margin)
+        # 由结果文件生成的报告与直接生成的报告相同，包括抽样估计部分
+        direct = _report(result, str(tmp_path / 'direct.html'))
+        assert '抽样估计' in direct
+        assert _report(loaded, str(tmp_path / 'loaded.html')) == direct
+    finally:
+        loaded.close()
+
+
+def test_message_templates():
+    for message in ["类名 'foo' 应该使用PascalCase", "第 12 行超过 120 个字符", "没有参数", "'' 空名称"]:
+        template, arguments = split_message(message)
+        assert join_message(template, arguments) == message
+    template, arguments = split_message("含有\x1f占位符的 'x'")
+    assert arguments == []